@@ -0,0 +1,224 @@
+"""
+Route benchmarks: seeds a fixed-seed scaled dataset (see src/seeder_scale.py)
+into a temporary SQLite file and times the heavy pages through the Flask test
+client. For every endpoint it records the median wall time, the query count
+and the peak Python memory of one request, and compares them with a JSON
+baseline.
+
+    python -m benchmarks.routes                  # compare with benchmarks/baseline.json
+    python -m benchmarks.routes --update         # record a new baseline
+    python -m benchmarks.routes --only reports   # just the matching endpoints
+
+Exits with status 1 when an endpoint regressed beyond --tolerance. Timings
+depend on the machine: record the baseline on the one you compare on.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_FACTOR = 10
+DEFAULT_SEED = 0
+DEFAULT_REPEAT = 5
+# Allowed slowdown (and memory growth) before an endpoint counts as a regression
+DEFAULT_TOLERANCE = 0.25
+# Differences below these are noise, whatever the ratio
+MIN_DELTA_MS = 5.0
+MIN_DELTA_KIB = 256.0
+
+ADMIN_EMAIL = 'benchmark@example.com'
+ADMIN_PASSWORD = 'benchmark'
+
+
+def endpoints(app):
+    """(name, url) of the benchmarked requests."""
+    today = date.today()
+    urls = [('dashboard period=' + period, f'/?period={period}')
+            for period in ('7', '30', '90', 'current_month', 'next_month')]
+    urls += [
+        ('search q=dell', '/api/search?q=dell'),
+        ('search q=sl', '/api/search?q=sl'),
+        ('tree-view root=users', '/tree-view/?root=users'),
+    ]
+    # Every report page, including the ones added later
+    for rule in sorted(app.url_map.iter_rules(), key=lambda rule: rule.rule):
+        if rule.rule.startswith('/reports/') and 'GET' in rule.methods and not rule.arguments:
+            urls.append((rule.rule, rule.rule))
+    urls += [
+        ('compliance dashboard', '/compliance/dashboard'),
+        ('compliance policy-report', '/compliance/policy-report'),
+        # A month view of the calendar, as FullCalendar requests it
+        ('calendar-events', f'/subscriptions/api/calendar-events?start={today.isoformat()}'
+                            f'&end={(today + timedelta(days=42)).isoformat()}'),
+    ]
+    return urls
+
+
+def _query_count(response):
+    timing = response.headers.get('Server-Timing', '')
+    if 'desc="' not in timing:
+        return None
+    return int(timing.split('desc="')[1].split(' queries')[0])
+
+
+def measure(client, url, repeat):
+    """Times one URL: a warm-up request, `repeat` timed ones and one under tracemalloc."""
+    response = client.get(url)
+    if response.status_code != 200:
+        raise RuntimeError(f"GET {url} returned {response.status_code}")
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(url)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    # Separate request: tracemalloc slows everything down
+    tracemalloc.start()
+    try:
+        client.get(url)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'url': url,
+        'median_ms': round(statistics.median(timings), 2),
+        'min_ms': round(min(timings), 2),
+        'queries': _query_count(response),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(client, urls, repeat=DEFAULT_REPEAT, log=print):
+    """{name: measurement} for the given (name, url) pairs."""
+    results = {}
+    for name, url in urls:
+        results[name] = measure(client, url, repeat)
+        result = results[name]
+        log(f"  {name:<40} {result['median_ms']:>9.1f} ms {result['queries'] or 0:>5} queries "
+            f"{result['peak_kib']:>10.1f} KiB")
+    return results
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Regressions of `results` against `baseline` (both {name: measurement}):
+    a list of (name, metric, baseline value, current value). Time and memory
+    may grow by `tolerance` (a fraction); any extra query is a regression, as
+    the dataset is the same on every run.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if (current['median_ms'] > previous['median_ms'] * (1 + tolerance)
+                and current['median_ms'] - previous['median_ms'] >= MIN_DELTA_MS):
+            regressions.append((name, 'median_ms', previous['median_ms'], current['median_ms']))
+        if (current['peak_kib'] > previous['peak_kib'] * (1 + tolerance)
+                and current['peak_kib'] - previous['peak_kib'] >= MIN_DELTA_KIB):
+            regressions.append((name, 'peak_kib', previous['peak_kib'], current['peak_kib']))
+        if current['queries'] is not None and previous['queries'] is not None and current['queries'] > previous['queries']:
+            regressions.append((name, 'queries', previous['queries'], current['queries']))
+    return regressions
+
+
+def build_app(database_path, factor, seed, log=print):
+    """An app on a fresh SQLite file seeded with seed_scale(factor, seed), and a logged-in client."""
+    os.environ['DATABASE_URL'] = f"sqlite:///{database_path}"
+    os.environ['SCHEDULER_ENABLED'] = 'false'
+    # The query counts come from the Server-Timing header
+    os.environ['INSTRUMENTATION_ENABLED'] = 'true'
+    os.environ.setdefault('SLOW_QUERY_MS', '60000')
+    from src import create_app, db
+    from src.models import User
+    from src.seeder_scale import seed_scale
+
+    app = create_app()
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.app_context():
+        db.create_all()
+        started = time.perf_counter()
+        counts = seed_scale(factor, seed=seed)
+        log(f"Seeded {sum(counts.values())} rows (factor {factor}, seed {seed}) "
+            f"in {time.perf_counter() - started:.1f}s")
+        admin = User(name='Benchmark Admin', email=ADMIN_EMAIL, role='admin')
+        admin.set_password(ADMIN_PASSWORD)
+        db.session.add(admin)
+        db.session.commit()
+
+    client = app.test_client()
+    client.post('/login', data={'email': ADMIN_EMAIL, 'password': ADMIN_PASSWORD})
+    return app, client
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks the heavy pages on a scaled dataset.')
+    parser.add_argument('--factor', type=int, default=DEFAULT_FACTOR, help='seed-scale factor (about 8,000 rows each)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='timed requests per endpoint')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed growth of time and memory, as a fraction (0.25 = 25%%)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON file')
+    parser.add_argument('--update', action='store_true', help='write the results as the new baseline')
+    parser.add_argument('--only', help='only endpoints whose name contains this text')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app, client = build_app(os.path.join(tmpdir, 'benchmark.db'), args.factor, args.seed)
+        with app.app_context():
+            urls = [(name, url) for name, url in endpoints(app) if not args.only or args.only in name]
+            results = run_benchmarks(client, urls, args.repeat)
+        # Release the SQLite file before the directory goes away
+        with app.app_context():
+            from src import db
+            db.engine.dispose()
+
+    report = {
+        'meta': {
+            'factor': args.factor, 'seed': args.seed, 'repeat': args.repeat,
+            'python': platform.python_version(), 'machine': platform.machine(),
+            'recorded_at': datetime.now().isoformat(timespec='seconds'),
+        },
+        'results': results,
+    }
+    if args.update:
+        if args.only and os.path.exists(args.baseline):
+            # Keep the endpoints that were not run this time
+            with open(args.baseline) as f:
+                previous = json.load(f)
+            report['results'] = {**previous.get('results', {}), **results}
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update to record one.")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    meta = baseline.get('meta', {})
+    if (meta.get('factor'), meta.get('seed')) != (args.factor, args.seed):
+        print(f"The baseline was recorded with factor {meta.get('factor')}, seed {meta.get('seed')}: not comparable.")
+        return 1
+
+    regressions = compare(results, baseline['results'], args.tolerance)
+    for name, metric, previous, current in regressions:
+        print(f"REGRESSION {name}: {metric} {previous} -> {current}")
+    if not regressions:
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}.")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
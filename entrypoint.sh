@@ -20,11 +20,19 @@ if [ ! -f "$DB_FILE" ]; then
     echo "Database initialized."
     # Add initial frameworks and controls
     flask seed-db-prod
+    # Build the full-text search structures (migrations only create the plain table)
+    flask rebuild-search-index
+    flask snapshot-book-values
 else
     echo "Database found. Applying any pending migrations..."
     # If the database already exists, just apply any new migrations
     flask db upgrade
     echo "Migrations applied."
+    # Refresh derived data in case the schema just gained new columns/tables
+    flask backfill-warranty-dates
+    flask rebuild-renewals
+    flask rebuild-search-index
+    flask snapshot-book-values
 fi
 
 # Start the application using gunicorn
@@ -2,12 +2,20 @@
 
 import os
 import atexit
-from flask import Flask, session
-from apscheduler.schedulers.background import BackgroundScheduler
+import time
+from flask import Flask, g
+from apscheduler.schedulers.blocking import BlockingScheduler
+from sqlalchemy import update
 
 from .extensions import db, migrate
-from .models import User
-from . import notifications # Added the missing import
+from .models import User, Asset, Peripheral, compute_warranty_end_date
+from . import renewal_index
+from . import search_index
+from . import book_values
+from . import scheduler
+from . import instrumentation
+from . import profiling
+import click
 import markdown
 from markupsafe import Markup
 from .seeder_prod import seed_production_frameworks
@@ -38,11 +46,41 @@ def create_app():
     app.config['SMTP_PORT'] = int(os.environ.get('SMTP_PORT', '587'))
     app.config['EMAIL_USERNAME'] = os.environ.get('EMAIL_USERNAME', '')
     app.config['EMAIL_PASSWORD'] = os.environ.get('EMAIL_PASSWORD', '')
+    app.config['SMTP_USE_TLS'] = os.environ.get('SMTP_USE_TLS', 'true').lower() != 'false'
     app.config['WEBHOOK_URL'] = os.environ.get('WEBHOOK_URL', '')
 
+    # Scheduled jobs (see src/scheduler.py)
+    app.config['SCHEDULER_ENABLED'] = os.environ.get('SCHEDULER_ENABLED', 'true').lower() != 'false'
+
+    # Background PDF rendering (see src/pdf_jobs.py)
+    # Renderer processes per web process: every gunicorn worker starts its own pool
+    app.config['PDF_WORKERS'] = int(os.environ.get('PDF_WORKERS', min(2, os.cpu_count() or 1)))
+    app.config['PDF_CACHE_FOLDER'] = os.path.join(project_root, 'data', 'pdf_cache')
+    app.config['PDF_CACHE_MAX_FILES'] = int(os.environ.get('PDF_CACHE_MAX_FILES', '500'))
+    # How long a request waits for its PDF before handing over to the polling page
+    app.config['PDF_JOB_WAIT_SECONDS'] = float(os.environ.get('PDF_JOB_WAIT_SECONDS', '2'))
+    # Jobs whose process stopped sending heartbeats this long ago were lost with it
+    app.config['PDF_JOB_TIMEOUT_SECONDS'] = int(os.environ.get('PDF_JOB_TIMEOUT_SECONDS', '120'))
+    os.makedirs(app.config['PDF_CACHE_FOLDER'], exist_ok=True)
+
+    # Request instrumentation (see src/instrumentation.py)
+    app.config['INSTRUMENTATION_ENABLED'] = os.environ.get('INSTRUMENTATION_ENABLED', 'true').lower() != 'false'
+    app.config['SLOW_QUERY_MS'] = float(os.environ.get('SLOW_QUERY_MS', '200'))
+    app.config['ROUTE_STATS_SAMPLES'] = int(os.environ.get('ROUTE_STATS_SAMPLES', '1000'))
+    # N+1 detector: 'warn' logs, 'raise' fails the request; unset = warn in debug mode only
+    app.config['NPLUSONE_MODE'] = os.environ.get('NPLUSONE_MODE', '')
+    app.config['NPLUSONE_THRESHOLD'] = int(os.environ.get('NPLUSONE_THRESHOLD', '5'))
+
+    # Opt-in request profiler for admins (see src/profiling.py)
+    app.config['PROFILER_ENABLED'] = os.environ.get('PROFILER_ENABLED', 'true').lower() != 'false'
+    app.config['PROFILE_FOLDER'] = os.path.join(project_root, 'data', 'profiles')
+    app.config['PROFILE_MAX_FILES'] = int(os.environ.get('PROFILE_MAX_FILES', '50'))
+
     # --- Initialize Extensions ---
     db.init_app(app)
-    migrate.init_app(app, db)
+    migrate.init_app(app, db, include_object=search_index.include_object)
+    instrumentation.init_app(app)
+    profiling.init_app(app)
     
     # --- REGISTER THE CUSTOM MARKDOWN FILTER ---
     @app.template_filter('markdown')
@@ -85,6 +123,8 @@ def create_app():
     from .routes.documentation import documentation_bp
     from .routes.frameworks import frameworks_bp
     from .routes.links import links_bp
+    from .routes.exports import exports_bp
+    from .routes.pdf_jobs import pdf_jobs_bp
 
     app.register_blueprint(main_bp)
     app.register_blueprint(assets_bp, url_prefix='/assets')
@@ -116,35 +156,34 @@ def create_app():
     app.register_blueprint(documentation_bp, url_prefix='/documentation')
     app.register_blueprint(frameworks_bp)
     app.register_blueprint(links_bp, url_prefix='/links')
+    app.register_blueprint(exports_bp, url_prefix='/exports')
+    app.register_blueprint(pdf_jobs_bp, url_prefix='/pdf-jobs')
 
 
     # --- Make user role available in all templates ---
+    from .routes.main import current_user, password_change_required
     @app.context_processor
     def inject_user_role():
-        user_id = session.get('user_id')
-        if user_id:
-            user = User.query.get(user_id)
-            if user:
-                return dict(current_user_role=user.role)
-        return dict(current_user_role=None)
+        user = current_user()
+        return dict(current_user_role=user.role if user else None)
 
     # --- Force admin to change the default password ---
-    from .routes.main import password_change_required
     @app.before_request
     def before_request_hook():
+        # g outlives the request when an app context was already pushed (tests, CLI)
+        g.pop('current_user', None)
         # This now correctly calls the updated password_change_required decorator
         password_change_required(lambda: None)()
 
     # --- Scheduler and Notifications ---
-    scheduler = BackgroundScheduler()
-    scheduler.add_job(
-        func=notifications.check_upcoming_renewals,
-        args=[app],
-        trigger="interval",
-        days=1
-    )
-    scheduler.start()
-    atexit.register(lambda: scheduler.shutdown())
+    # Every process schedules the jobs, but only the holder of the database lease
+    # runs them (see src/scheduler.py). With SCHEDULER_ENABLED=false the web
+    # workers leave scheduling to a dedicated `flask run-scheduler` process.
+    if app.config['SCHEDULER_ENABLED']:
+        background_scheduler = scheduler.build_scheduler(app)
+        background_scheduler.start()
+        app.extensions['scheduler'] = background_scheduler
+        atexit.register(scheduler.shutdown_scheduler, app, background_scheduler)
 
     # --- CLI Commands ---
     @app.cli.command("init-db")
@@ -159,6 +198,57 @@ def create_app():
                 db.session.commit()
                 print("Database initialized and admin user created.")
     
+    @app.cli.command("backfill-warranty-dates")
+    def backfill_warranty_dates_command():
+        """Fills the stored warranty_end_date of existing assets and peripherals."""
+        with app.app_context():
+            updated = 0
+            for model in (Asset, Peripheral):
+                rows = db.session.query(
+                    model.id, model.purchase_date, model.warranty_length, model.warranty_end_date
+                ).all()
+                changes = []
+                for row in rows:
+                    end_date = compute_warranty_end_date(row.purchase_date, row.warranty_length)
+                    if end_date != row.warranty_end_date:
+                        changes.append({'id': row.id, 'warranty_end_date': end_date})
+                if changes:
+                    db.session.execute(update(model), changes)
+                updated += len(changes)
+            db.session.commit()
+            print(f"Backfilled warranty end dates for {updated} items.")
+
+    @app.cli.command("rebuild-renewals")
+    def rebuild_renewals_command():
+        """Regenerates the materialized subscription renewal occurrences."""
+        with app.app_context():
+            count = renewal_index.rebuild_renewal_occurrences()
+            print(f"Materialized {count} renewal occurrences.")
+
+    @app.cli.command("rebuild-search-index")
+    def rebuild_search_index_command():
+        """Rebuilds the global full-text search index."""
+        with app.app_context():
+            count = search_index.rebuild_search_index()
+            print(f"Indexed {count} records for search.")
+
+    @app.cli.command("snapshot-book-values")
+    @click.option('--full', is_flag=True, help='Recompute every item instead of only the changed ones.')
+    def snapshot_book_values_command(full):
+        """Refreshes the monthly book value snapshots behind the depreciation trend charts."""
+        with app.app_context():
+            count = book_values.refresh_book_value_snapshots(full=full)
+            print(f"Recomputed book value snapshots for {count} items.")
+
+    @app.cli.command("run-scheduler")
+    def run_scheduler_command():
+        """Runs the scheduled jobs in the foreground (for a dedicated scheduler process)."""
+        embedded = app.extensions.pop('scheduler', None)
+        if embedded is not None:
+            embedded.shutdown(wait=False)
+        print(f"Scheduler running as {scheduler.HOLDER}. Jobs run while this process holds the lease.")
+        scheduler.build_scheduler(app, BlockingScheduler).start()
+
     # --- Seed the db with fake demo data ---
     @app.cli.command("seed-db-demodata")
     def seed_db_command():
@@ -166,6 +256,20 @@ def create_app():
         from .seeder import seed_data
         seed_data()
 
+    @app.cli.command("seed-scale")
+    @click.option('--factor', type=click.IntRange(min=1), default=1, show_default=True,
+                  help='Dataset size: about 8,000 rows per unit (125 is a million rows).')
+    @click.option('--seed', type=int, default=0, show_default=True, help='Random seed, for reproducible datasets.')
+    def seed_scale_command(factor, seed):
+        """Adds a large synthetic dataset for performance testing."""
+        from .seeder_scale import seed_scale
+        with app.app_context():
+            started = time.perf_counter()
+            counts = seed_scale(factor, seed=seed)
+            for table, count in counts.items():
+                print(f"  {table}: {count}")
+            print(f"Inserted {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s.")
+
 
 
     @app.cli.command('seed-db-prod')
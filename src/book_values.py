@@ -0,0 +1,182 @@
+from datetime import date, datetime
+import numpy as np
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import func, select, and_, update
+
+from .extensions import db
+from .models import Asset, Peripheral, BookValueSnapshot, LocationValueSnapshot, BookValueSnapshotRun
+from .depreciation import DepreciationBook
+
+# Months kept in the snapshot tables, current month included
+SNAPSHOT_MONTHS = 36
+# Depreciation period (years) the snapshots are computed with
+SNAPSHOT_PERIOD_YEARS = 5
+
+# (type label, model, location column or None)
+SNAPSHOT_MODELS = (
+    ('Asset', Asset, Asset.location_id),
+    ('Peripheral', Peripheral, None),
+)
+
+
+def snapshot_window(today=None):
+    """Returns the first and last month (as first-of-month dates) of the snapshot window."""
+    today = today or date.today()
+    end = today.replace(day=1)
+    return end - relativedelta(months=SNAPSHOT_MONTHS - 1), end
+
+
+def _eligible(model):
+    # Same population as the depreciation report
+    return and_(model.is_archived == False, model.cost.isnot(None), model.purchase_date.isnot(None))
+
+
+def _backfill_updated_at(model, now):
+    """
+    Rows written before updated_at existed have it NULL: they get their
+    creation time (or now), so they count as changed only until their first
+    snapshot instead of on every run.
+    """
+    db.session.execute(
+        update(model).where(model.updated_at.is_(None))
+        .values(updated_at=func.coalesce(model.created_at, now))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _snapshot_rows(type_label, rows, start, end):
+    """
+    Snapshot rows for the given items and inclusive month range. Months that
+    start before an item was bought are left out rather than stored as zeros.
+    """
+    if not rows or start > end:
+        return []
+    book = DepreciationBook(
+        [row.cost for row in rows], [row.purchase_date for row in rows], [row.currency for row in rows]
+    )
+    months, linear = book.monthly_schedule(start, end, SNAPSHOT_PERIOD_YEARS, 'linear')
+    _, declining = book.monthly_schedule(start, end, SNAPSHOT_PERIOD_YEARS, 'declining_balance')
+    month_starts = months.astype('datetime64[D]')
+    owned = month_starts[None, :] >= book.purchase_dates[:, None]
+    month_dates = month_starts.astype(object)
+    costs_eur = book.costs_eur
+
+    snapshot = []
+    for i, j in zip(*np.nonzero(owned)):
+        snapshot.append({
+            'month': month_dates[j],
+            'item_type': type_label,
+            'item_id': rows[i].id,
+            'location_id': rows[i].location_id,
+            'original_eur': float(costs_eur[i]),
+            'linear_eur': float(linear[i, j]),
+            'declining_eur': float(declining[i, j]),
+        })
+    return snapshot
+
+
+def _aggregate_locations(start):
+    """Recomputes the per-location totals from the item snapshots (one INSERT ... SELECT)."""
+    items = BookValueSnapshot.__table__
+    locations = LocationValueSnapshot.__table__
+    db.session.execute(locations.delete())
+    db.session.execute(locations.insert().from_select(
+        ['month', 'location_id', 'original_eur', 'linear_eur', 'declining_eur'],
+        select(
+            items.c.month, items.c.location_id,
+            func.sum(items.c.original_eur), func.sum(items.c.linear_eur), func.sum(items.c.declining_eur)
+        ).where(items.c.month >= start).group_by(items.c.month, items.c.location_id)
+    ))
+
+
+def refresh_book_value_snapshots(full=False, today=None):
+    """
+    Brings the snapshot tables up to date. Returns the number of items whose
+    history was (re)computed.
+
+    Items changed since the previous run (or never snapshotted) get their
+    whole window recomputed; the others only get the months that entered the
+    window since then. Rows of archived or deleted items are dropped.
+    """
+    started_at = datetime.utcnow()
+    start, end = snapshot_window(today)
+    table = BookValueSnapshot.__table__
+    last_run = db.session.query(func.max(BookValueSnapshotRun.started_at)).scalar()
+    if full:
+        db.session.execute(table.delete())
+    else:
+        db.session.execute(table.delete().where(table.c.month < start))
+    last_month = db.session.query(func.max(BookValueSnapshot.month)).scalar()
+
+    processed = 0
+    new_rows = []
+    for type_label, model, location_column in SNAPSHOT_MODELS:
+        location = location_column if location_column is not None else db.null()
+        _backfill_updated_at(model, started_at)
+        rows = db.session.query(
+            model.id, model.cost, model.currency, model.purchase_date, model.updated_at,
+            location.label('location_id')
+        ).filter(_eligible(model)).all()
+
+        # Drop items that are no longer part of the report
+        eligible_ids = select(model.id).where(_eligible(model))
+        db.session.execute(table.delete().where(table.c.item_type == type_label, table.c.item_id.not_in(eligible_ids)))
+
+        snapshotted = {
+            item_id for item_id, in db.session.query(BookValueSnapshot.item_id)
+            .filter(BookValueSnapshot.item_type == type_label).distinct()
+        }
+        changed, unchanged = [], []
+        for row in rows:
+            is_changed = full or last_run is None or row.id not in snapshotted or row.updated_at >= last_run
+            (changed if is_changed else unchanged).append(row)
+
+        if changed:
+            changed_ids = [row.id for row in changed]
+            for offset in range(0, len(changed_ids), 500):
+                db.session.execute(table.delete().where(
+                    table.c.item_type == type_label, table.c.item_id.in_(changed_ids[offset:offset + 500])
+                ))
+            new_rows.extend(_snapshot_rows(type_label, changed, start, end))
+            processed += len(changed)
+        if unchanged and last_month and last_month < end:
+            first_new = max(last_month + relativedelta(months=+1), start)
+            new_rows.extend(_snapshot_rows(type_label, unchanged, first_new, end))
+
+    for offset in range(0, len(new_rows), 5000):
+        db.session.execute(table.insert(), new_rows[offset:offset + 5000])
+    _aggregate_locations(start)
+    db.session.add(BookValueSnapshotRun(started_at=started_at, items_processed=processed))
+    db.session.commit()
+    return processed
+
+
+def snapshot_book_values(app):
+    """Nightly job: refreshes the book value snapshots. Returns the number of items recomputed."""
+    with app.app_context():
+        processed = refresh_book_value_snapshots()
+        app.logger.info(f"Book value snapshots refreshed: {processed} items recomputed.")
+        return processed
+
+
+def portfolio_trend(algorithm='linear', location_id=None, today=None):
+    """
+    Returns (month_starts, original_eur, book_value_eur) for the snapshot
+    window, summed over all locations or for a single one. Months without
+    snapshots come back as zeros.
+    """
+    start, end = snapshot_window(today)
+    value_column = LocationValueSnapshot.declining_eur if algorithm == 'declining_balance' else LocationValueSnapshot.linear_eur
+    query = db.session.query(
+        LocationValueSnapshot.month, func.sum(LocationValueSnapshot.original_eur), func.sum(value_column)
+    ).filter(LocationValueSnapshot.month.between(start, end))
+    if location_id:
+        query = query.filter(LocationValueSnapshot.location_id == location_id)
+    totals = {month: (original, value) for month, original, value in query.group_by(LocationValueSnapshot.month)}
+
+    months = [start + relativedelta(months=+i) for i in range(SNAPSHOT_MONTHS)]
+    return (
+        months,
+        [round(totals.get(month, (0.0, 0.0))[0], 2) for month in months],
+        [round(totals.get(month, (0.0, 0.0))[1], 2) for month in months],
+    )
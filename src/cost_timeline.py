@@ -0,0 +1,93 @@
+from bisect import bisect_right
+from datetime import date
+import numpy as np
+
+from .extensions import db
+from .models import CostHistory, CURRENCY_RATES
+
+# Days are packed below the row index in the lookup keys (row << 32 | day + _DAY_OFFSET)
+_DAY_OFFSET = 1 << 31
+
+
+class CostTimeline:
+    """
+    Effective-dated EUR costs for a set of subscriptions, from CostHistory.
+
+    Each row (subscription) holds its cost changes sorted by date; the cost on
+    a given day is the last change on or before it, found by binary search.
+    The first known cost also applies before its date, and rows without any
+    history have a single entry with their current cost. All rows share flat
+    arrays so a whole matrix of renewal dates is resolved with one
+    np.searchsorted call over (row, day) keys.
+    """
+
+    def __init__(self, row_dates, row_costs):
+        """row_dates / row_costs: one sorted, non-empty sequence per row."""
+        counts = np.array([len(dates) for dates in row_dates], dtype=np.int64)
+        self.starts = np.concatenate(([0], np.cumsum(counts)))
+        self.dates = np.array([d for dates in row_dates for d in dates], dtype='datetime64[D]')
+        self.costs_eur = np.array([c for costs in row_costs for c in costs], dtype=np.float64)
+        rows = np.repeat(np.arange(len(counts), dtype=np.int64), counts)
+        days = self.dates.astype(np.int64)
+        # The first entry of every row applies from the beginning of time
+        days[self.starts[:-1]] = -_DAY_OFFSET
+        self.keys = (rows << 32) | (days + _DAY_OFFSET)
+        self._row_days = [days[start:end].tolist() for start, end in zip(self.starts[:-1], self.starts[1:])]
+
+    @classmethod
+    def constant(cls, costs_eur):
+        """A timeline where every row keeps a single cost."""
+        return cls([[date.min]] * len(costs_eur), [[cost] for cost in costs_eur])
+
+    @classmethod
+    def load(cls, subscription_ids, current_costs_eur):
+        """Loads the cost history of the given subscriptions (rows, in that order) in one query."""
+        positions = {subscription_id: i for i, subscription_id in enumerate(subscription_ids)}
+        row_dates = [[] for _ in positions]
+        row_costs = [[] for _ in positions]
+        history = db.session.query(
+            CostHistory.subscription_id, CostHistory.changed_date, CostHistory.cost, CostHistory.currency
+        ).order_by(CostHistory.subscription_id, CostHistory.changed_date, CostHistory.id)
+        for subscription_id, changed_date, cost, currency in history:
+            row = positions.get(subscription_id)
+            if row is None:
+                continue
+            cost_eur = cost * CURRENCY_RATES.get(currency, 1.0)
+            if row_dates[row] and row_dates[row][-1] == changed_date:
+                row_costs[row][-1] = cost_eur  # Several changes on one day: the last one wins
+            else:
+                row_dates[row].append(changed_date)
+                row_costs[row].append(cost_eur)
+        for row, current_cost in enumerate(current_costs_eur):
+            if not row_dates[row]:
+                row_dates[row].append(date.min)
+                row_costs[row].append(current_cost)
+        return cls(row_dates, row_costs)
+
+    def __len__(self):
+        return len(self.starts) - 1
+
+    def cost_at(self, row, day):
+        """EUR cost of one row on `day`."""
+        start = int(self.starts[row])
+        position = bisect_right(self._row_days[row], int(np.datetime64(day, 'D').astype(np.int64)), lo=1)
+        return float(self.costs_eur[start + position - 1])
+
+    def costs_at(self, rows, days):
+        """EUR costs for broadcastable arrays of rows and datetime64[D] days."""
+        rows = np.asarray(rows, dtype=np.int64)
+        days = np.asarray(days, dtype='datetime64[D]').astype(np.int64)
+        keys = (rows << 32) | (days + _DAY_OFFSET)
+        return self.costs_eur[np.searchsorted(self.keys, keys, side='right') - 1]
+
+    def changes(self, rows):
+        """
+        Yields (change_number, row_mask, change_dates, cost_deltas) for the
+        cost changes of `rows` after their first entry, change by change.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        counts = self.starts[rows + 1] - self.starts[rows]
+        for change in range(1, int(counts.max()) if len(rows) else 1):
+            mask = counts > change
+            positions = self.starts[rows[mask]] + change
+            yield change, mask, self.dates[positions], self.costs_eur[positions] - self.costs_eur[positions - 1]
@@ -0,0 +1,73 @@
+import calendar
+from datetime import timedelta
+from sqlalchemy import select, func, extract
+
+from .extensions import db
+from .models import (
+    Subscription, Asset, Peripheral, Supplier, User, Location, Contact, PaymentMethod
+)
+
+# Stat card name -> model counted by it (non-archived rows only)
+STAT_CARD_MODELS = {
+    'subscriptions': Subscription,
+    'assets': Asset,
+    'peripherals': Peripheral,
+    'suppliers': Supplier,
+    'users': User,
+    'locations': Location,
+    'contacts': Contact,
+    'payment_methods': PaymentMethod,
+}
+
+
+def _month_index(column):
+    """Months since year 0 for a date column, portable across SQLite and Postgres."""
+    return extract('year', column) * 12 + extract('month', column)
+
+
+def _month_number(day):
+    return day.year * 12 + day.month
+
+
+def stat_counts():
+    """Counts every stat card in a single statement of scalar subqueries."""
+    columns = [
+        select(func.count(model.id)).where(model.is_archived == False).scalar_subquery().label(name)
+        for name, model in STAT_CARD_MODELS.items()
+    ]
+    return dict(db.session.execute(select(*columns)).one()._mapping)
+
+
+def expiring_warranties(today, days=30):
+    """
+    Returns non-archived assets and peripherals whose warranty ends within
+    [today, today + days], sorted by end date (indexed range scan).
+    """
+    window_end = today + timedelta(days=days)
+    items = []
+    for model in (Asset, Peripheral):
+        items.extend(model.query.filter(
+            model.is_archived == False,
+            model.warranty_end_date.between(today, window_end)
+        ).all())
+    items.sort(key=lambda item: item.warranty_end_date)
+    return items
+
+
+def expiring_payment_methods(today, days=90):
+    """
+    Returns non-archived payment methods whose expiry month ends within
+    [today, today + days]. Cards expire at the end of their month, so the
+    window translates exactly into a range of month numbers.
+    """
+    window_end = today + timedelta(days=days)
+    last_month = _month_number(window_end)
+    # The window's last month only counts if the window reaches its final day
+    if window_end.day != calendar.monthrange(window_end.year, window_end.month)[1]:
+        last_month -= 1
+
+    return PaymentMethod.query.filter(
+        PaymentMethod.is_archived == False,
+        PaymentMethod.expiry_date.isnot(None),
+        _month_index(PaymentMethod.expiry_date).between(_month_number(today), last_month)
+    ).order_by(PaymentMethod.expiry_date).all()
@@ -0,0 +1,137 @@
+from collections import namedtuple
+from datetime import timedelta
+from sqlalchemy.orm import contains_eager
+
+from .extensions import db
+from .models import (
+    Asset, Peripheral, License, Software, PaymentMethod, Course, CourseAssignment, CourseCompletion, User
+)
+from . import renewal_index
+
+# One dated event found by the scanner. `recipients` lists the addresses that
+# get it in their personal digest on top of the configured recipient, and
+# `details` is what the webhook payload carries for it.
+ExpiryEvent = namedtuple('ExpiryEvent', 'kind name due_date days_until recipients details')
+
+# Digest sections, in display order: kind -> heading
+SECTIONS = {
+    'subscription': 'Subscription Renewals',
+    'license': 'License Expiries',
+    'asset_warranty': 'Asset Warranty Expiries',
+    'peripheral_warranty': 'Peripheral Warranty Expiries',
+    'payment_method': 'Payment Method Expiries',
+    'course_assignment': 'Training Due Dates',
+}
+
+
+def _subscriptions(dates, today):
+    # Served by the materialized renewal occurrences (indexed on renewal_date)
+    for renewal_date, subscription in renewal_index.renewals_on(dates):
+        yield ExpiryEvent('subscription', subscription.name, renewal_date, (renewal_date - today).days, (), {
+            'type': subscription.subscription_type,
+            'cost_eur': subscription.cost_eur,
+        })
+
+
+def _licenses(dates, today):
+    rows = (
+        db.session.query(License.id, License.name, License.expiry_date, Software.name.label('software'))
+        .outerjoin(Software, License.software_id == Software.id)
+        .filter(License.expiry_date.in_(dates), License.is_archived == False)
+        .order_by(License.expiry_date, License.name)
+    )
+    for row in rows:
+        yield ExpiryEvent('license', row.name, row.expiry_date, (row.expiry_date - today).days, (), {
+            'software': row.software,
+        })
+
+
+def _warranties(kind, model):
+    def scan(dates, today):
+        rows = (
+            db.session.query(model.id, model.name, model.brand, model.serial_number, model.warranty_end_date)
+            .filter(model.warranty_end_date.in_(dates), model.is_archived == False)
+            .order_by(model.warranty_end_date, model.name)
+        )
+        for row in rows:
+            yield ExpiryEvent(kind, row.name, row.warranty_end_date, (row.warranty_end_date - today).days, (), {
+                'brand': row.brand,
+                'serial_number': row.serial_number,
+            })
+    return scan
+
+
+def _payment_methods(dates, today):
+    rows = (
+        db.session.query(PaymentMethod.name, PaymentMethod.method_type, PaymentMethod.details, PaymentMethod.expiry_date)
+        .filter(PaymentMethod.expiry_date.in_(dates), PaymentMethod.is_archived == False)
+        .order_by(PaymentMethod.expiry_date, PaymentMethod.name)
+    )
+    for row in rows:
+        yield ExpiryEvent('payment_method', row.name, row.expiry_date, (row.expiry_date - today).days, (), {
+            'type': row.method_type,
+            'details': row.details,
+        })
+
+
+def _course_assignments(dates, today):
+    # Only open assignments; the assignee gets them in a digest of their own
+    assignments = (
+        CourseAssignment.query
+        .join(CourseAssignment.course)
+        .join(User, CourseAssignment.user_id == User.id)
+        .outerjoin(CourseCompletion, CourseCompletion.assignment_id == CourseAssignment.id)
+        .filter(CourseAssignment.due_date.in_(dates), CourseCompletion.id.is_(None), User.is_archived == False)
+        .options(contains_eager(CourseAssignment.course))
+        .add_columns(User.name, User.email)
+        .order_by(CourseAssignment.due_date, Course.title)
+    )
+    for assignment, user_name, user_email in assignments:
+        yield ExpiryEvent(
+            'course_assignment', assignment.course.title, assignment.due_date, (assignment.due_date - today).days,
+            (user_email,) if user_email else (), {'user': user_name}
+        )
+
+
+# (kind, scanner(dates, today)); each scanner runs one equality query on an indexed date column
+SOURCES = (
+    ('subscription', _subscriptions),
+    ('license', _licenses),
+    ('asset_warranty', _warranties('asset_warranty', Asset)),
+    ('peripheral_warranty', _warranties('peripheral_warranty', Peripheral)),
+    ('payment_method', _payment_methods),
+    ('course_assignment', _course_assignments),
+)
+
+
+def scan(today, days_before):
+    """
+    Returns the events due exactly `days_before` days from `today` (for
+    every offset), across all sources, ordered by date. The work done is
+    proportional to the number of due items, not to the size of each table.
+    """
+    dates = sorted({today + timedelta(days=days) for days in days_before})
+    if not dates:
+        return []
+    events = []
+    for _, scanner in SOURCES:
+        events.extend(scanner(dates, today))
+    events.sort(key=lambda event: (event.due_date, list(SECTIONS).index(event.kind), event.name))
+    return events
+
+
+def digests(events, recipient=None):
+    """
+    Groups events into one digest per recipient: the configured recipient gets
+    every event, and anyone named on an event (e.g. a course assignee) gets
+    the events that concern them. Returns {address: [events]}.
+    """
+    grouped = {}
+    if recipient:
+        grouped[recipient] = list(events)
+    for event in events:
+        for address in event.recipients:
+            if address == recipient:
+                continue
+            grouped.setdefault(address, []).append(event)
+    return grouped
@@ -0,0 +1,299 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from sqlalchemy import select
+from .spend_analysis import SpendFilters, spend_items
+from .models import (
+    db, Asset, AssetHistory, Peripheral, License, Software, Subscription, CostHistory,
+    Purchase, PurchaseCostHistory, PaymentMethod, Budget, Supplier, User, Location
+)
+
+# Rows fetched per query while streaming an export
+EXPORT_BATCH_SIZE = 1000
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class Export:
+    """
+    A streamable export of one table.
+
+    `columns` is a list of (header, expression) pairs; related names come from
+    outer joins so every row is a flat tuple and no ORM objects are built.
+    `scopes` maps query arguments (e.g. asset_id) to the columns they filter,
+    and `archivable` exports either live or archived rows (`archived=1`).
+    """
+
+    def __init__(self, model, columns, joins=(), scopes=None, archivable=False):
+        self.model = model
+        self.columns = columns
+        self.joins = joins
+        self.scopes = scopes or {}
+        self.archivable = archivable
+
+    @property
+    def headers(self):
+        return [header for header, _ in self.columns]
+
+    def statement(self, args):
+        stmt = select(self.model.id, *[expression for _, expression in self.columns]).select_from(self.model)
+        for target, onclause in self.joins:
+            stmt = stmt.outerjoin(target, onclause)
+        if self.archivable:
+            stmt = stmt.where(self.model.is_archived == (args.get('archived') == '1'))
+        for key, column in self.scopes.items():
+            value = args.get(key, type=int)
+            if value is not None:
+                stmt = stmt.where(column == value)
+        return stmt
+
+    def batches(self, args):
+        """
+        Yields lists of row tuples, EXPORT_BATCH_SIZE at a time. Each batch is a
+        keyset query on id, so no cursor stays open while the client downloads.
+        """
+        stmt = self.statement(args).order_by(self.model.id).limit(EXPORT_BATCH_SIZE)
+        last_id = None
+        while True:
+            batch_stmt = stmt if last_id is None else stmt.where(self.model.id > last_id)
+            rows = db.session.execute(batch_stmt).all()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield [row[1:] for row in rows]
+            if len(rows) < EXPORT_BATCH_SIZE:
+                return
+
+
+class SpendExport:
+    """
+    Export of the spend analysis: the same UNION ALL projection as the report,
+    filtered by the report's query arguments and batched on its row_key.
+    """
+
+    columns = [
+        ('Type', 'type'),
+        ('ID', 'id'),
+        ('Name', 'name'),
+        ('Brand/Software', 'detail'),
+        ('Purchase Date', 'purchase_date'),
+        ('Cost', 'cost'),
+        ('Currency', 'currency'),
+        ('Supplier', 'supplier'),
+        ('User', 'user'),
+        ('Location', 'location'),
+    ]
+
+    @property
+    def headers(self):
+        return [header for header, _ in self.columns]
+
+    def batches(self, args):
+        items = spend_items(SpendFilters(args))
+        stmt = select(items.c.row_key, *[items.c[key] for _, key in self.columns]).order_by(items.c.row_key).limit(EXPORT_BATCH_SIZE)
+        last_key = None
+        while True:
+            batch_stmt = stmt if last_key is None else stmt.where(items.c.row_key > last_key)
+            rows = db.session.execute(batch_stmt).all()
+            if not rows:
+                return
+            last_key = rows[-1][0]
+            yield [row[1:] for row in rows]
+            if len(rows) < EXPORT_BATCH_SIZE:
+                return
+
+
+def _json_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def stream_csv(export, args):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(export.headers)
+    yield buffer.getvalue()
+    for rows in export.batches(args):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+
+def stream_ndjson(export, args):
+    headers = export.headers
+    for rows in export.batches(args):
+        yield ''.join(
+            json.dumps({header: _json_value(value) for header, value in zip(headers, row)}) + '\n'
+            for row in rows
+        )
+
+
+STREAMS = {
+    'csv': stream_csv,
+    'ndjson': stream_ndjson,
+}
+
+
+EXPORTS = {
+    'assets': Export(Asset, [
+        ('ID', Asset.id),
+        ('Internal ID', Asset.internal_id),
+        ('Name', Asset.name),
+        ('Model', Asset.model),
+        ('Brand', Asset.brand),
+        ('Serial Number', Asset.serial_number),
+        ('Status', Asset.status),
+        ('User', User.name),
+        ('Location', Location.name),
+        ('Supplier', Supplier.name),
+        ('Purchase', Purchase.description),
+        ('Purchase Date', Asset.purchase_date),
+        ('Cost', Asset.cost),
+        ('Currency', Asset.currency),
+        ('Warranty (months)', Asset.warranty_length),
+        ('Warranty End Date', Asset.warranty_end_date),
+        ('Comments', Asset.comments),
+        ('Created At', Asset.created_at),
+    ], joins=(
+        (User, Asset.user_id == User.id),
+        (Location, Asset.location_id == Location.id),
+        (Supplier, Asset.supplier_id == Supplier.id),
+        (Purchase, Asset.purchase_id == Purchase.id),
+    ), archivable=True),
+
+    'peripherals': Export(Peripheral, [
+        ('ID', Peripheral.id),
+        ('Name', Peripheral.name),
+        ('Type', Peripheral.type),
+        ('Brand', Peripheral.brand),
+        ('Serial Number', Peripheral.serial_number),
+        ('Status', Peripheral.status),
+        ('User', User.name),
+        ('Asset', Asset.name),
+        ('Supplier', Supplier.name),
+        ('Purchase', Purchase.description),
+        ('Purchase Date', Peripheral.purchase_date),
+        ('Cost', Peripheral.cost),
+        ('Currency', Peripheral.currency),
+        ('Warranty (months)', Peripheral.warranty_length),
+        ('Warranty End Date', Peripheral.warranty_end_date),
+    ], joins=(
+        (User, Peripheral.user_id == User.id),
+        (Asset, Peripheral.asset_id == Asset.id),
+        (Supplier, Peripheral.supplier_id == Supplier.id),
+        (Purchase, Peripheral.purchase_id == Purchase.id),
+    ), archivable=True),
+
+    # License keys are left out on purpose
+    'licenses': Export(License, [
+        ('ID', License.id),
+        ('Name', License.name),
+        ('Software', Software.name),
+        ('Subscription', Subscription.name),
+        ('User', User.name),
+        ('Purchase', Purchase.description),
+        ('Purchase Date', License.purchase_date),
+        ('Expiry Date', License.expiry_date),
+        ('Cost', License.cost),
+        ('Currency', License.currency),
+        ('Created At', License.created_at),
+    ], joins=(
+        (Software, License.software_id == Software.id),
+        (Subscription, License.subscription_id == Subscription.id),
+        (User, License.user_id == User.id),
+        (Purchase, License.purchase_id == Purchase.id),
+    ), archivable=True),
+
+    'subscriptions': Export(Subscription, [
+        ('ID', Subscription.id),
+        ('Name', Subscription.name),
+        ('Type', Subscription.subscription_type),
+        ('Supplier', Supplier.name),
+        ('Software', Software.name),
+        ('Renewal Date', Subscription.renewal_date),
+        ('Renewal Period', Subscription.renewal_period_type),
+        ('Renewal Period Value', Subscription.renewal_period_value),
+        ('Auto Renew', Subscription.auto_renew),
+        ('Cost', Subscription.cost),
+        ('Currency', Subscription.currency),
+        ('Description', Subscription.description),
+        ('Created At', Subscription.created_at),
+    ], joins=(
+        (Supplier, Subscription.supplier_id == Supplier.id),
+        (Software, Subscription.software_id == Software.id),
+    ), archivable=True),
+
+    'purchases': Export(Purchase, [
+        ('ID', Purchase.id),
+        ('Internal ID', Purchase.internal_id),
+        ('Description', Purchase.description),
+        ('Invoice Number', Purchase.invoice_number),
+        ('Purchase Date', Purchase.purchase_date),
+        ('Supplier', Supplier.name),
+        ('Payment Method', PaymentMethod.name),
+        ('Budget', Budget.name),
+        ('Validated Cost', Purchase.validated_cost),
+        ('Total Cost', Purchase.total_cost),
+        ('Comments', Purchase.comments),
+        ('Created At', Purchase.created_at),
+    ], joins=(
+        (Supplier, Purchase.supplier_id == Supplier.id),
+        (PaymentMethod, Purchase.payment_method_id == PaymentMethod.id),
+        (Budget, Purchase.budget_id == Budget.id),
+    )),
+
+    'budgets': Export(Budget, [
+        ('ID', Budget.id),
+        ('Name', Budget.name),
+        ('Category', Budget.category),
+        ('Amount', Budget.amount),
+        ('Currency', Budget.currency),
+        ('Period', Budget.period),
+        ('Spent', Budget.spent),
+        ('Remaining', Budget.remaining),
+    ]),
+
+    'spend-analysis': SpendExport(),
+
+    'asset-history': Export(AssetHistory, [
+        ('ID', AssetHistory.id),
+        ('Asset ID', AssetHistory.asset_id),
+        ('Asset', Asset.name),
+        ('Field', AssetHistory.field_changed),
+        ('Old Value', AssetHistory.old_value),
+        ('New Value', AssetHistory.new_value),
+        ('Changed At', AssetHistory.changed_at),
+    ], joins=(
+        (Asset, AssetHistory.asset_id == Asset.id),
+    ), scopes={'asset_id': AssetHistory.asset_id}),
+
+    'subscription-cost-history': Export(CostHistory, [
+        ('ID', CostHistory.id),
+        ('Subscription ID', CostHistory.subscription_id),
+        ('Subscription', Subscription.name),
+        ('Cost', CostHistory.cost),
+        ('Currency', CostHistory.currency),
+        ('Effective Date', CostHistory.changed_date),
+    ], joins=(
+        (Subscription, CostHistory.subscription_id == Subscription.id),
+    ), scopes={'subscription_id': CostHistory.subscription_id}),
+
+    'purchase-cost-history': Export(PurchaseCostHistory, [
+        ('ID', PurchaseCostHistory.id),
+        ('Purchase ID', PurchaseCostHistory.purchase_id),
+        ('Purchase', Purchase.description),
+        ('Action', PurchaseCostHistory.action),
+        ('Cost', PurchaseCostHistory.cost),
+        ('User', User.name),
+        ('Timestamp', PurchaseCostHistory.timestamp),
+    ], joins=(
+        (Purchase, PurchaseCostHistory.purchase_id == Purchase.id),
+        (User, PurchaseCostHistory.user_id == User.id),
+    ), scopes={'purchase_id': PurchaseCostHistory.purchase_id}),
+}
@@ -0,0 +1,194 @@
+from datetime import date
+import numpy as np
+
+from .extensions import db
+from .models import Subscription, CURRENCY_RATES
+from .cost_timeline import CostTimeline
+
+
+def _month_starts(months):
+    """Converts a datetime64[M] array into a list of first-of-month dates."""
+    return [date(int(m) // 12 + 1970, int(m) % 12 + 1, 1) for m in months.astype(int)]
+
+
+class SpendForecast:
+    """
+    Column-oriented view of subscription schedules for spend charts.
+
+    Schedules are loaded once into NumPy arrays and renewal occurrences are
+    counted for every (subscription, month) cell of a window in one pass,
+    instead of expanding each subscription's renewals in Python. Renewals are
+    priced with `timeline` (a CostTimeline), so past renewals use the cost
+    that was effective on their date; without one every renewal costs the
+    current `costs_eur`.
+    """
+
+    def __init__(self, ids, supplier_ids, anchors, period_types, period_values, monthly_days, costs_eur, timeline=None):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.supplier_ids = np.asarray(supplier_ids, dtype=np.int64)
+        self.anchors = np.asarray(anchors, dtype='datetime64[D]')
+        self.costs_eur = np.asarray(costs_eur, dtype=np.float64)
+        self.timeline = timeline if timeline is not None else CostTimeline.constant(self.costs_eur)
+        values = np.maximum(np.asarray(period_values, dtype=np.int64), 1)
+        period_types = np.asarray(period_types, dtype=object)
+
+        self.is_custom = (period_types != 'monthly') & (period_types != 'yearly')
+        self.is_yearly = period_types == 'yearly'
+        # Yearly schedules are monthly schedules with a 12*N month period
+        self.period_values = np.where(self.is_yearly, values * 12, values)
+
+        self.anchor_months = self.anchors.astype('datetime64[M]')
+        self.anchor_days = (self.anchors - self.anchor_months.astype('datetime64[D]')).astype(np.int64) + 1
+        # 'last' is encoded as 31 and then clamped to the month length
+        rule_days = self.anchor_days.copy()
+        for i, (is_monthly, day_rule) in enumerate(zip(period_types == 'monthly', monthly_days)):
+            if not is_monthly or not day_rule:
+                continue
+            if day_rule == 'first':
+                rule_days[i] = 1
+            elif day_rule == 'last':
+                rule_days[i] = 31
+            else:
+                try:
+                    rule_days[i] = int(day_rule)
+                except (ValueError, TypeError):
+                    pass # Fallback to the anchor day if invalid
+        self.rule_days = rule_days
+
+    @classmethod
+    def load(cls, include_archived=False):
+        """
+        Loads the schedule columns of every (active) subscription in a single
+        query, and their cost history in a second one.
+        """
+        query = db.session.query(
+            Subscription.id, Subscription.supplier_id, Subscription.renewal_date,
+            Subscription.renewal_period_type, Subscription.renewal_period_value,
+            Subscription.monthly_renewal_day, Subscription.cost, Subscription.currency
+        )
+        if not include_archived:
+            query = query.filter(Subscription.is_archived == False)
+        rows = query.all()
+
+        ids = [row.id for row in rows]
+        costs_eur = [row.cost * CURRENCY_RATES.get(row.currency, 1.0) for row in rows]
+        return cls(
+            ids,
+            [row.supplier_id or 0 for row in rows],
+            [row.renewal_date for row in rows],
+            [row.renewal_period_type for row in rows],
+            [row.renewal_period_value or 1 for row in rows],
+            [row.monthly_renewal_day for row in rows],
+            costs_eur,
+            timeline=CostTimeline.load(ids, costs_eur)
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _window(self, start_date, end_date):
+        start = np.datetime64(start_date, 'D')
+        end = np.datetime64(end_date, 'D')
+        months = np.arange(start.astype('datetime64[M]'), end.astype('datetime64[M]') + 1)
+        month_first = months.astype('datetime64[D]')
+        month_length = ((months + 1).astype('datetime64[D]') - month_first).astype(np.int64)
+        # First and last day of every month, clipped to the window
+        low = np.maximum(month_first, start)
+        high = np.minimum(month_first + (month_length - 1), end)
+        return months, month_first, month_length, low, high
+
+    def _month_based_renewals(self, rows, month_first, month_length, low, high):
+        """
+        Month-based schedules (monthly and yearly) renew at most once per month.
+        Returns (renews, renewal_dates) for the given rows and months.
+        """
+        elapsed = (month_first.astype('datetime64[M]')[None, :] - self.anchor_months[rows, None]).astype(np.int64)
+        hit = (elapsed >= 0) & (elapsed % self.period_values[rows, None] == 0)
+        day = np.where(
+            elapsed == 0,
+            self.anchor_days[rows, None],
+            np.minimum(self.rule_days[rows, None], month_length[None, :])
+        )
+        renewal = month_first[None, :] + (day - 1)
+        return hit & (renewal >= low[None, :]) & (renewal <= high[None, :]), renewal
+
+    def _day_based_counts(self, rows, low, high):
+        """Day-based schedules: counts k >= 0 with anchor + k*N inside [low, high] (broadcast per row)."""
+        step = self.period_values[rows, None]
+        low_offset = (low - self.anchors[rows, None]).astype(np.int64)
+        high_offset = (high - self.anchors[rows, None]).astype(np.int64)
+        first_k = np.maximum(-(-low_offset // step), 0)
+        last_k = high_offset // step
+        return np.maximum(last_k - first_k + 1, 0)
+
+    def occurrence_counts(self, start_date, end_date):
+        """
+        Counts renewals per subscription and calendar month inside the
+        inclusive [start_date, end_date] window.
+
+        Returns (months, counts) where months is a datetime64[M] array and
+        counts has one row per subscription and one column per month.
+        """
+        months, month_first, month_length, low, high = self._window(start_date, end_date)
+        counts = np.zeros((len(self), len(months)), dtype=np.int64)
+
+        rows = np.flatnonzero(~self.is_custom)
+        if len(rows):
+            counts[rows], _ = self._month_based_renewals(rows, month_first, month_length, low, high)
+
+        rows = np.flatnonzero(self.is_custom)
+        if len(rows):
+            counts[rows] = self._day_based_counts(rows, low[None, :], high[None, :])
+
+        return months, counts
+
+    def spend(self, start_date, end_date):
+        """
+        EUR spend per subscription and calendar month inside the window, with
+        every renewal priced at the cost effective on its date.
+
+        Returns (months, spend) shaped like occurrence_counts.
+        """
+        months, month_first, month_length, low, high = self._window(start_date, end_date)
+        spend = np.zeros((len(self), len(months)), dtype=np.float64)
+
+        # One renewal per month at most: look up the cost on each renewal date
+        rows = np.flatnonzero(~self.is_custom)
+        if len(rows):
+            renews, renewal = self._month_based_renewals(rows, month_first, month_length, low, high)
+            spend[rows] = np.where(renews, self.timeline.costs_at(rows[:, None], renewal), 0.0)
+
+        # Possibly several renewals per month: price them all at the first cost,
+        # then add each later change for the renewals on or after its date
+        rows = np.flatnonzero(self.is_custom)
+        if len(rows):
+            first_costs = self.timeline.costs_eur[self.timeline.starts[rows]]
+            spend[rows] = self._day_based_counts(rows, low[None, :], high[None, :]) * first_costs[:, None]
+            for _, changed, change_dates, deltas in self.timeline.changes(rows):
+                changed_rows = rows[changed]
+                after_change = np.maximum(low[None, :], change_dates[:, None])
+                spend[changed_rows] += self._day_based_counts(changed_rows, after_change, high[None, :]) * deltas[:, None]
+
+        return months, spend
+
+    def monthly_totals(self, start_date, end_date):
+        """Returns (month_starts, eur_totals) for every month of the window."""
+        months, spend = self.spend(start_date, end_date)
+        return _month_starts(months), spend.sum(axis=0).tolist()
+
+    def yearly_totals(self, start_date, end_date):
+        """Returns (years, eur_totals) for every calendar year of the window."""
+        months, spend = self.spend(start_date, end_date)
+        monthly = spend.sum(axis=0)
+        year_index = months.astype('datetime64[Y]').astype(np.int64)
+        year_index -= year_index[0] if len(year_index) else 0
+        totals = np.bincount(year_index, weights=monthly)
+        return list(range(start_date.year, start_date.year + len(totals))), totals.tolist()
+
+    def supplier_totals(self, start_date, end_date):
+        """Returns {supplier_id: eur_total} for renewals inside the window."""
+        _, spend = self.spend(start_date, end_date)
+        spend = spend.sum(axis=1)
+        supplier_ids, positions = np.unique(self.supplier_ids, return_inverse=True)
+        totals = np.bincount(positions, weights=spend, minlength=len(supplier_ids))
+        return {int(sid): float(total) for sid, total in zip(supplier_ids, totals) if total}
@@ -0,0 +1,238 @@
+import hashlib
+import heapq
+import json
+import re
+import threading
+import time
+from collections import Counter, deque
+import numpy as np
+from flask import g, has_request_context, request, request_started, request_finished, before_render_template, template_rendered
+from sqlalchemy import event
+
+from .extensions import db
+
+# Statements kept per request for the log line (the slowest ones)
+SLOWEST_STATEMENTS = 3
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETER = re.compile(r"%\(\w+\)s|%s|\$\d+|:\w+|\?")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement):
+    """
+    Returns (normalized statement, fingerprint): literals and bound parameters
+    become '?', IN lists of any length collapse to '(?+)', and whitespace is
+    squeezed, so every execution of the same query shares one fingerprint.
+    """
+    normalized = _STRING.sub('?', statement)
+    normalized = _NUMBER.sub('?', normalized)
+    normalized = _PARAMETER.sub('?', normalized)
+    normalized = _PARAMETER_LIST.sub('(?+)', normalized)
+    normalized = _WHITESPACE.sub(' ', normalized).strip()
+    return normalized, hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:12]
+
+
+class NPlusOneError(Exception):
+    """A request ran the same SELECT more times than NPLUSONE_THRESHOLD allows."""
+
+    def __init__(self, endpoint, repeated):
+        self.endpoint = endpoint
+        self.repeated = repeated
+        details = '; '.join(f"{count}x {statement}" for statement, count in repeated)
+        super().__init__(f"N+1 queries in {endpoint}: {details}")
+
+
+class RequestStats:
+    """What one request spent: queries, database time and template rendering time."""
+
+    def __init__(self, track_shapes=False):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.slowest = []  # Min-heap of (ms, statement)
+        # SELECTs by normalized statement, for the N+1 detector
+        self.shapes = Counter() if track_shapes else None
+        self._template_starts = []
+
+    def add_query(self, statement, ms):
+        self.query_count += 1
+        self.db_ms += ms
+        if self.shapes is not None and statement.lstrip()[:6].upper().startswith(('SELECT', 'WITH')):
+            self.shapes[fingerprint(statement)[0]] += 1
+        if len(self.slowest) < SLOWEST_STATEMENTS:
+            heapq.heappush(self.slowest, (ms, statement))
+        elif ms > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (ms, statement))
+
+    def repeated(self, threshold):
+        """[(normalized statement, count)] of the SELECTs run more than `threshold` times."""
+        if self.shapes is None:
+            return []
+        return [(statement, count) for statement, count in self.shapes.most_common() if count > threshold]
+
+    def server_timing(self, total_ms):
+        return (f'db;dur={self.db_ms:.1f};desc="{self.query_count} queries", '
+                f'tpl;dur={self.template_ms:.1f};desc="Templates", '
+                f'app;dur={total_ms:.1f};desc="Total"')
+
+
+class RouteStats:
+    """
+    Latency and query counts of the last `samples` requests of every route,
+    in this process. Behind the admin performance page.
+    """
+
+    def __init__(self, samples):
+        self.samples = samples
+        self._routes = {}
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, total_ms, query_count, db_ms):
+        with self._lock:
+            if endpoint not in self._routes:
+                self._routes[endpoint] = deque(maxlen=self.samples)
+                self._totals[endpoint] = 0
+            self._routes[endpoint].append((total_ms, query_count, db_ms))
+            self._totals[endpoint] += 1
+
+    def summary(self):
+        """One dict per route: requests, p50/p95 latency, mean/p95/max queries and mean DB time."""
+        with self._lock:
+            routes = {endpoint: (np.array(samples), self._totals[endpoint]) for endpoint, samples in self._routes.items()}
+        rows = []
+        for endpoint, (samples, total) in routes.items():
+            latency, queries, db_ms = samples[:, 0], samples[:, 1], samples[:, 2]
+            rows.append({
+                'endpoint': endpoint,
+                'requests': total,
+                'samples': len(samples),
+                'p50_ms': float(np.percentile(latency, 50)),
+                'p95_ms': float(np.percentile(latency, 95)),
+                'mean_queries': float(queries.mean()),
+                'p95_queries': float(np.percentile(queries, 95)),
+                'max_queries': int(queries.max()),
+                'mean_db_ms': float(db_ms.mean()),
+            })
+        return rows
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+            self._totals.clear()
+
+
+def _current_stats():
+    return g.get('request_stats') if has_request_context() else None
+
+
+def nplusone_mode(app):
+    """'raise', 'warn' or 'off'; unless NPLUSONE_MODE says otherwise, debug mode warns."""
+    mode = app.config.get('NPLUSONE_MODE')
+    if mode:
+        return mode
+    return 'warn' if app.debug else 'off'
+
+
+def init_app(app):
+    """
+    Instruments the app: every request gets a RequestStats (query count, DB
+    time, template time), reported in a Server-Timing header and a JSON log
+    line and added to the per-route statistics. Queries slower than
+    SLOW_QUERY_MS are logged with their fingerprint, inside a request or not.
+    The N+1 detector (see nplusone_mode) flags requests that run the same
+    SELECT more than NPLUSONE_THRESHOLD times, typically a lazy relationship
+    loaded once per row of a list.
+    """
+    if not app.config['INSTRUMENTATION_ENABLED']:
+        return
+    route_stats = RouteStats(app.config['ROUTE_STATS_SAMPLES'])
+    app.extensions['route_stats'] = route_stats
+    logger = app.logger.getChild('requests')
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['query_started'].pop()
+        ms = (time.perf_counter() - started) * 1000
+        stats = _current_stats()
+        if stats is not None:
+            stats.add_query(statement, ms)
+        if ms >= app.config['SLOW_QUERY_MS']:
+            normalized, digest = fingerprint(statement)
+            app.logger.warning(json.dumps({
+                'event': 'slow_query',
+                'fingerprint': digest,
+                'duration_ms': round(ms, 1),
+                'endpoint': request.endpoint if has_request_context() else None,
+                'statement': normalized,
+            }))
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+
+    def on_request_started(sender, **extra):
+        g.request_stats = RequestStats(track_shapes=nplusone_mode(app) != 'off')
+
+    def on_before_render_template(sender, template, context, **extra):
+        stats = _current_stats()
+        if stats is not None:
+            stats._template_starts.append(time.perf_counter())
+
+    def on_template_rendered(sender, template, context, **extra):
+        stats = _current_stats()
+        if stats is not None and stats._template_starts:
+            stats.template_ms += (time.perf_counter() - stats._template_starts.pop()) * 1000
+
+    def on_request_finished(sender, response, **extra):
+        # g outlives the request when an app context was already pushed (tests, CLI)
+        stats = g.pop('request_stats', None)
+        if stats is None:
+            return
+        total_ms = (time.perf_counter() - stats.started) * 1000
+        response.headers['Server-Timing'] = stats.server_timing(total_ms)
+        endpoint = request.endpoint or 'unmatched'
+        if endpoint != 'static':
+            route_stats.record(endpoint, total_ms, stats.query_count, stats.db_ms)
+        logger.info(json.dumps({
+            'event': 'request',
+            'method': request.method,
+            'path': request.path,
+            'endpoint': endpoint,
+            'status': response.status_code,
+            'duration_ms': round(total_ms, 1),
+            'queries': stats.query_count,
+            'db_ms': round(stats.db_ms, 1),
+            'template_ms': round(stats.template_ms, 1),
+            'slowest': [
+                {'duration_ms': round(ms, 1), 'fingerprint': fingerprint(statement)[1]}
+                for ms, statement in sorted(stats.slowest, reverse=True)
+            ],
+        }))
+
+        repeated = stats.repeated(app.config['NPLUSONE_THRESHOLD'])
+        if repeated:
+            mode = nplusone_mode(app)
+            if mode == 'raise':
+                raise NPlusOneError(endpoint, repeated)
+            for statement, count in repeated:
+                app.logger.warning(json.dumps({
+                    'event': 'n_plus_one',
+                    'endpoint': endpoint,
+                    'count': count,
+                    'fingerprint': fingerprint(statement)[1],
+                    'statement': statement,
+                }))
+
+    # weak=False: the handlers are closures that would otherwise be garbage collected
+    request_started.connect(on_request_started, app, weak=False)
+    before_render_template.connect(on_before_render_template, app, weak=False)
+    template_rendered.connect(on_template_rendered, app, weak=False)
+    request_finished.connect(on_request_finished, app, weak=False)
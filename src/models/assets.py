@@ -1,11 +1,17 @@
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
-from sqlalchemy.orm import foreign
+from sqlalchemy.orm import foreign, validates
 from sqlalchemy import and_
 from ..extensions import db
 from .core import Attachment
 from .auth import User, Group
 
+def compute_warranty_end_date(purchase_date, warranty_length):
+    """Warranty end for a purchase date and a length in months (None if either is missing)."""
+    if purchase_date and warranty_length:
+        return purchase_date + relativedelta(months=+warranty_length)
+    return None
+
 class Location(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False, unique=True)
@@ -15,7 +21,7 @@ class Location(db.Model):
 
 class Asset(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
+    name = db.Column(db.String(100), nullable=False, index=True)
     model = db.Column(db.String(100))
     brand = db.Column(db.String(100))
     serial_number = db.Column(db.String(100), unique=True)
@@ -29,13 +35,15 @@ class Asset(db.Model):
     currency = db.Column(db.String(3), default='EUR')
     
     warranty_length = db.Column(db.Integer) # in months
+    # Derived from purchase_date + warranty_length; stored so expiry queries can use the index
+    warranty_end_date = db.Column(db.Date, index=True)
     is_archived = db.Column(db.Boolean, default=False, nullable=False)
     
     # Relationships
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     location_id = db.Column(db.Integer, db.ForeignKey('location.id'))
     supplier_id = db.Column(db.Integer, db.ForeignKey('supplier.id'))
-    purchase_id = db.Column(db.Integer, db.ForeignKey('purchase.id'))
+    purchase_id = db.Column(db.Integer, db.ForeignKey('purchase.id'), index=True)
     attachments = db.relationship('Attachment',
                             primaryjoin="and_(Asset.id==foreign(Attachment.linkable_id), "
                                         "Attachment.linkable_type=='Asset')",
@@ -55,12 +63,15 @@ class Asset(db.Model):
     disposal_record = db.relationship('DisposalRecord', backref='asset', uselist=False, cascade='all, delete-orphan')
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Lets incremental jobs (e.g. book value snapshots) pick up changed rows
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
-    @property
-    def warranty_end_date(self):
-        if self.purchase_date and self.warranty_length:
-            return self.purchase_date + relativedelta(months=+self.warranty_length)
-        return None
+    @validates('purchase_date', 'warranty_length')
+    def _sync_warranty_end_date(self, key, value):
+        # Keep the stored warranty_end_date in step with its inputs
+        values = {'purchase_date': self.purchase_date, 'warranty_length': self.warranty_length, key: value}
+        self.warranty_end_date = compute_warranty_end_date(values['purchase_date'], values['warranty_length'])
+        return value
 
 class AssetAssignment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -90,7 +101,7 @@ class PeripheralAssignment(db.Model):
 
 class Peripheral(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
+    name = db.Column(db.String(100), nullable=False, index=True)
     type = db.Column(db.String(50))
     serial_number = db.Column(db.String(100), unique=True)
     status = db.Column(db.String(50), nullable=False, default='In Use')
@@ -102,6 +113,8 @@ class Peripheral(db.Model):
     brand = db.Column(db.String(100))
     purchase_date = db.Column(db.Date)
     warranty_length = db.Column(db.Integer) # in months
+    # Derived from purchase_date + warranty_length; stored so expiry queries can use the index
+    warranty_end_date = db.Column(db.Date, index=True)
     
     # --- COSTS ---
     cost = db.Column(db.Float)
@@ -111,7 +124,7 @@ class Peripheral(db.Model):
     
     # Relationships
     asset_id = db.Column(db.Integer, db.ForeignKey('asset.id'))
-    purchase_id = db.Column(db.Integer, db.ForeignKey('purchase.id'))
+    purchase_id = db.Column(db.Integer, db.ForeignKey('purchase.id'), index=True)
     supplier_id = db.Column(db.Integer, db.ForeignKey('supplier.id'))
     
     assignments = db.relationship('PeripheralAssignment', backref='peripheral', lazy=True, cascade='all, delete-orphan', order_by='PeripheralAssignment.checked_out_date.desc()')
@@ -129,17 +142,19 @@ class Peripheral(db.Model):
     )
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     def __init__(self, **kwargs):
         super(Peripheral, self).__init__(**kwargs)
         if self.serial_number == '':
             self.serial_number = None
 
-    @property
-    def warranty_end_date(self):
-        if self.purchase_date and self.warranty_length:
-            return self.purchase_date + relativedelta(months=+self.warranty_length)
-        return None
+    @validates('purchase_date', 'warranty_length')
+    def _sync_warranty_end_date(self, key, value):
+        # Keep the stored warranty_end_date in step with its inputs
+        values = {'purchase_date': self.purchase_date, 'warranty_length': self.warranty_length, key: value}
+        self.warranty_end_date = compute_warranty_end_date(values['purchase_date'], values['warranty_length'])
+        return value
 
 class License(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -152,11 +167,11 @@ class License(db.Model):
     
     # Dates
     purchase_date = db.Column(db.Date)
-    expiry_date = db.Column(db.Date, nullable=True) # Optional for perpetual licenses
+    expiry_date = db.Column(db.Date, nullable=True, index=True) # Optional for perpetual licenses
 
     # Relationships
     user_id = db.Column(db.Integer, db.ForeignKey('user.id')) # Assigned user (seat)
-    purchase_id = db.Column(db.Integer, db.ForeignKey('purchase.id'), nullable=True)
+    purchase_id = db.Column(db.Integer, db.ForeignKey('purchase.id'), nullable=True, index=True)
     budget_id = db.Column(db.Integer, db.ForeignKey('budget.id'), nullable=True)
     subscription_id = db.Column(db.Integer, db.ForeignKey('subscription.id'), nullable=True)
     software_id = db.Column(db.Integer, db.ForeignKey('software.id'), nullable=True)
@@ -216,6 +231,9 @@ class Software(db.Model):
 
     @property
     def owner(self):
+        # Set by resolve_owners() when the rows are listed in bulk
+        if '_owner' in self.__dict__:
+            return self._owner
         if self.owner_type == 'user' and self.owner_id:
             return User.query.get(self.owner_id)
         if self.owner_type == 'group' and self.owner_id:
@@ -227,7 +245,7 @@ class MaintenanceLog(db.Model):
     event_type = db.Column(db.String(100), nullable=False) # e.g., Repair, Planned Maintenance, Unplanned Maintenance
     description = db.Column(db.Text, nullable=False)
     status = db.Column(db.String(50), nullable=False, default='Open') # Open, In Progress, Completed, Cancelled
-    event_date = db.Column(db.Date, nullable=False, default=date.today)
+    event_date = db.Column(db.Date, nullable=False, default=date.today, index=True)
     ticket_link = db.Column(db.String(512))
     notes = db.Column(db.Text)
     
@@ -279,3 +297,34 @@ class DisposalRecord(db.Model):
                             lazy=True, cascade='all, delete-orphan')
 
     history = db.relationship('DisposalHistory', backref='disposal_record', lazy=True, cascade='all, delete-orphan', order_by='DisposalHistory.changed_at.desc()')
+
+class BookValueSnapshot(db.Model):
+    """
+    Book value of one asset or peripheral at the start of a month, under both
+    depreciation algorithms. Written by the nightly job in src/book_values.py
+    for a rolling window of months; never edited by hand.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.Date, nullable=False, index=True) # First day of the month
+    item_type = db.Column(db.String(20), nullable=False) # 'Asset' or 'Peripheral'
+    item_id = db.Column(db.Integer, nullable=False)
+    location_id = db.Column(db.Integer) # Location of the item when the snapshot was taken
+    original_eur = db.Column(db.Float, nullable=False)
+    linear_eur = db.Column(db.Float, nullable=False)
+    declining_eur = db.Column(db.Float, nullable=False)
+    __table_args__ = (db.UniqueConstraint('item_type', 'item_id', 'month', name='uq_book_value_snapshot_item_month'),)
+
+class LocationValueSnapshot(db.Model):
+    """Per-location totals of BookValueSnapshot, one row per (month, location); served to the trend charts."""
+    id = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.Date, nullable=False, index=True)
+    location_id = db.Column(db.Integer) # None groups peripherals and assets without a location
+    original_eur = db.Column(db.Float, nullable=False)
+    linear_eur = db.Column(db.Float, nullable=False)
+    declining_eur = db.Column(db.Float, nullable=False)
+
+class BookValueSnapshotRun(db.Model):
+    """One run of the snapshot job; the latest start time tells the next run which items changed."""
+    id = db.Column(db.Integer, primary_key=True)
+    started_at = db.Column(db.DateTime, nullable=False)
+    items_processed = db.Column(db.Integer, nullable=False, default=0)
@@ -5,6 +5,10 @@ from sqlalchemy import and_
 from ..extensions import db
 from .core import Attachment
 
+# Credentials of the admin account created by `flask init-db`
+DEFAULT_ADMIN_NAME = 'admin'
+DEFAULT_ADMIN_PASSWORD = 'admin123'
+
 user_groups = db.Table('user_groups',
     db.Column('user_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
     db.Column('group_id', db.Integer, db.ForeignKey('group.id'), primary_key=True)
@@ -19,9 +23,11 @@ class Group(db.Model):
 
 class User(db.Model): # Add UserMixin here if using Flask-Login
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
+    name = db.Column(db.String(100), nullable=False, index=True)
     email = db.Column(db.String(100), unique=True, nullable=False) # Make email unique and required for login
     password_hash = db.Column(db.String(120)) # Can be nullable for users who don't log in
+    # Set at login and on password changes, so requests never hash the default password
+    must_change_password = db.Column(db.Boolean, default=False, server_default=db.false(), nullable=False)
     role = db.Column(db.String(50), default='user') # e.g., 'user', 'editor', 'admin'
     department = db.Column(db.String(100))
     job_title = db.Column(db.String(100))
@@ -48,6 +54,11 @@ class User(db.Model): # Add UserMixin here if using Flask-Login
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
+        self.must_change_password = self.is_default_password(password)
+
+    def is_default_password(self, password):
+        """Whether `password` (in clear) is the default admin password for this user."""
+        return self.name == DEFAULT_ADMIN_NAME and password == DEFAULT_ADMIN_PASSWORD
     
     def check_password(self, password):
         # Only check password if one is set
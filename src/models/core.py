@@ -38,6 +38,65 @@ class NotificationSetting(db.Model):
     # We'll store the days as a comma-separated string, e.g., "30,14,7"
     notify_days_before = db.Column(db.String(100), default="30,14,7")
 
+class SchedulerLease(db.Model):
+    """
+    The scheduler leadership lease: only the process holding an unexpired
+    lease runs scheduled jobs (see src/scheduler.py).
+    """
+    name = db.Column(db.String(50), primary_key=True)
+    holder = db.Column(db.String(255), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+class JobRun(db.Model):
+    """One execution of a scheduled job."""
+    id = db.Column(db.Integer, primary_key=True)
+    job_name = db.Column(db.String(100), nullable=False, index=True)
+    holder = db.Column(db.String(255))
+    started_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    finished_at = db.Column(db.DateTime)
+    duration_ms = db.Column(db.Integer)
+    status = db.Column(db.String(20), nullable=False, default='running') # running, success, failed
+    items_processed = db.Column(db.Integer)
+    error = db.Column(db.Text)
+
+class NotificationOutbox(db.Model):
+    """A notification queued for the delivery worker (src/notifications.py)."""
+    __table_args__ = (db.Index('ix_notification_outbox_due', 'status', 'next_attempt_at'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    channel = db.Column(db.String(20), nullable=False) # 'email' or 'webhook'
+    recipient = db.Column(db.Text, nullable=False) # Comma-separated addresses or the webhook URL
+    subject = db.Column(db.String(255))
+    payload = db.Column(db.Text, nullable=False) # HTML body or JSON document
+    # pending -> sending -> sent, or back to pending for a retry; dead after the last attempt
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    claimed_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+class PdfJob(db.Model):
+    """A PDF rendered in the background by the PDF worker pool (src/pdf_jobs.py)."""
+    id = db.Column(db.String(32), primary_key=True) # uuid4 hex, used in the polling URLs
+    kind = db.Column(db.String(50), nullable=False) # e.g. 'inventory', 'compliance-dashboard'
+    batch_id = db.Column(db.String(32), index=True) # Jobs submitted together (bulk generation)
+    status = db.Column(db.String(20), nullable=False, default='queued') # queued, done, failed
+    content_hash = db.Column(db.String(64), nullable=False) # Cache key: sha256 of the rendered HTML
+    filename = db.Column(db.String(255), nullable=False) # Name the PDF is downloaded or attached as
+    # When set, the finished PDF is saved as an attachment of this record
+    linkable_type = db.Column(db.String(50))
+    linkable_id = db.Column(db.Integer)
+    attachment_id = db.Column(db.Integer, db.ForeignKey('attachment.id'))
+    return_url = db.Column(db.String(255)) # Where the user goes once the job has finished
+    requested_by_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Refreshed by the submitting process while the job waits for or runs its render
+    heartbeat_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
 link_tags = db.Table('link_tags',
     db.Column('link_id', db.Integer, db.ForeignKey('link.id'), primary_key=True),
     db.Column('tag_id', db.Integer, db.ForeignKey('tag.id'), primary_key=True)
@@ -72,6 +131,9 @@ class Link(db.Model):
     @property
     def owner(self):
         """Devuelve el objeto User o Group basado en owner_type y owner_id."""
+        # Set by resolve_owners() when the rows are listed in bulk
+        if '_owner' in self.__dict__:
+            return self._owner
         from .auth import User, Group
         if self.owner_type == 'User' and self.owner_id:
             return User.query.get(self.owner_id)
@@ -119,9 +181,51 @@ class Documentation(db.Model):
     @property
     def owner(self):
         """Devuelve el objeto User o Group basado en owner_type y owner_id."""
+        # Set by resolve_owners() when the rows are listed in bulk
+        if '_owner' in self.__dict__:
+            return self._owner
         from .auth import User, Group
         if self.owner_type == 'User' and self.owner_id:
             return User.query.get(self.owner_id)
         if self.owner_type == 'Group' and self.owner_id:
             return Group.query.get(self.owner_id)
         return None
+
+def resolve_owners(items):
+    """
+    Resolves the polymorphic owner (User or Group) of many Links, Documentation
+    or Software rows at once: one IN (...) query per owner type instead of one
+    query per row. Returns the items.
+    """
+    from .auth import User, Group
+    models = {'user': User, 'group': Group}
+    ids_by_type = {}
+    for item in items:
+        if item.owner_type and item.owner_id:
+            ids_by_type.setdefault(item.owner_type.lower(), set()).add(item.owner_id)
+
+    owners = {}
+    for owner_type, ids in ids_by_type.items():
+        model = models.get(owner_type)
+        if model is None:
+            continue
+        for owner in model.query.filter(model.id.in_(ids)).all():
+            owners[(owner_type, owner.id)] = owner
+
+    for item in items:
+        item._owner = owners.get(((item.owner_type or '').lower(), item.owner_id))
+    return items
+
+class SearchDocument(db.Model):
+    """
+    One row per searchable record, feeding the global search index.
+    Maintained by the hooks in src/search_index.py; never edited by hand.
+    """
+    __table_args__ = (db.UniqueConstraint('entity_type', 'entity_id', name='uq_search_document_entity'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity_type = db.Column(db.String(50), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    label = db.Column(db.String(255), nullable=False) # Text shown in the results dropdown
+    title = db.Column(db.Text, nullable=False, default='')
+    body = db.Column(db.Text, nullable=False, default='')
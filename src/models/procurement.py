@@ -1,11 +1,12 @@
-import calendar
-from datetime import datetime, date, timedelta
-from dateutil.relativedelta import relativedelta
-from sqlalchemy.orm import foreign
-from sqlalchemy import and_
+from datetime import datetime, date
+from sqlalchemy.orm import foreign, column_property
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy import and_, select, func
 from ..extensions import db
 from .core import Attachment, CURRENCY_RATES, Tag
 from .auth import User
+from .assets import Asset, Peripheral, License
+from ..renewals import RenewalSchedule
 
 # Association table for Subscriptions and Tags
 subscription_tags = db.Table('subscription_tags',
@@ -37,7 +38,7 @@ purchase_tags = db.Table('purchase_tags',
 
 class Supplier(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
+    name = db.Column(db.String(100), nullable=False, index=True)
     email = db.Column(db.String(100))
     phone = db.Column(db.String(20))
     address = db.Column(db.Text)
@@ -94,11 +95,11 @@ class Purchase(db.Model):
     internal_id = db.Column(db.String(100), unique=True)
     description = db.Column(db.String(255), nullable=False)
     invoice_number = db.Column(db.String(100))
-    purchase_date = db.Column(db.Date, nullable=False)
+    purchase_date = db.Column(db.Date, nullable=False, index=True)
     comments = db.Column(db.Text)
     supplier_id = db.Column(db.Integer, db.ForeignKey('supplier.id'))
     payment_method_id = db.Column(db.Integer, db.ForeignKey('payment_method.id'))
-    budget_id = db.Column(db.Integer, db.ForeignKey('budget.id'))
+    budget_id = db.Column(db.Integer, db.ForeignKey('budget.id'), index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_archived = db.Column(db.Boolean, default=False, nullable=False)
 
@@ -127,39 +128,33 @@ class Purchase(db.Model):
 
     cost_history = db.relationship('PurchaseCostHistory', backref='purchase', lazy=True, order_by='PurchaseCostHistory.timestamp.desc()')
 
-    @property
-    def calculated_cost(self):
-        """Calculates the cost from associated assets, peripherals, AND perpetual licenses."""
-        total = 0.0 # Use float for calculations
-        # Add costs from Assets
-        for asset in self.assets:
-            if asset.cost is not None:
-                # Assuming purchase total should be sum of original costs
-                # Add currency conversion here if needed, e.g., to EUR
-                total += asset.cost
-        # Add costs from Peripherals
-        for peripheral in self.peripherals:
-            if peripheral.cost is not None:
-                 # Add currency conversion here if needed
-                 total += peripheral.cost
-
-        # --- ADDED: Include costs from perpetual/standalone licenses ---
-        for license in self.licenses:
-            # Only include cost if it's NOT linked to a subscription (i.e., it's perpetual/standalone)
-            # and if the cost exists
-            if license.subscription_id is None and license.cost is not None:
-                 # Add currency conversion here if needed
-                 total += license.cost
-        # --- END ADDITION ---
-        return total
+    # Cost of the associated assets, peripherals and perpetual/standalone licenses
+    # (subscription seats are paid through the subscription). Summed by the
+    # database as part of the query that loads the purchase, so it can also be
+    # sorted on without loading the items. Deferred, so loading purchases
+    # elsewhere (e.g. through relationships) skips the subqueries: lists that
+    # show it undefer it.
+    calculated_cost = column_property(
+        select(func.coalesce(func.sum(Asset.cost), 0.0))
+        .where(Asset.purchase_id == id).correlate_except(Asset).scalar_subquery()
+        + select(func.coalesce(func.sum(Peripheral.cost), 0.0))
+        .where(Peripheral.purchase_id == id).correlate_except(Peripheral).scalar_subquery()
+        + select(func.coalesce(func.sum(License.cost), 0.0))
+        .where(License.purchase_id == id, License.subscription_id.is_(None)).correlate_except(License).scalar_subquery(),
+        deferred=True
+    )
 
-    @property
+    @hybrid_property
     def total_cost(self):
-        """Returns the validated cost if it exists, otherwise calculates it."""
+        """Returns the validated cost if it exists, otherwise the calculated one."""
         if self.validated_cost is not None:
             return self.validated_cost
         return self.calculated_cost
 
+    @total_cost.expression
+    def total_cost(cls):
+        return func.coalesce(cls.validated_cost, cls.calculated_cost)
+
 class Budget(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -179,15 +174,21 @@ class Budget(db.Model):
         lazy='dynamic', cascade='all, delete-orphan'
     )
 
-    @property
+    # Total cost of the budget's purchases, aggregated by the database. Deferred
+    # like Purchase.calculated_cost: the budget list undefers it.
+    spent = column_property(
+        select(func.coalesce(func.sum(Purchase.total_cost), 0.0))
+        .where(Purchase.budget_id == id).correlate_except(Purchase).scalar_subquery(),
+        deferred=True
+    )
+
+    @hybrid_property
     def remaining(self):
-        # CORRECTED: Use the total_cost property from the Purchase model
-        spent = sum(purchase.total_cost for purchase in self.purchases)
-        return self.amount - spent
+        return self.amount - self.spent
 
 class CostHistory(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    subscription_id = db.Column(db.Integer, db.ForeignKey('subscription.id'), nullable=False)
+    subscription_id = db.Column(db.Integer, db.ForeignKey('subscription.id'), nullable=False, index=True)
     cost = db.Column(db.Float, nullable=False)
     currency = db.Column(db.String(3), nullable=False)
     # The date this cost became effective
@@ -198,7 +199,7 @@ class PaymentMethod(db.Model):
     name = db.Column(db.String(100), nullable=False)  # e.g., "Company Visa"
     method_type = db.Column(db.String(50), nullable=False)  # e.g., "Credit Card", "Bank Transfer"
     details = db.Column(db.String(100))  # e.g., "Visa ending in 1234"
-    expiry_date = db.Column(db.Date)
+    expiry_date = db.Column(db.Date, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_archived = db.Column(db.Boolean, default=False, nullable=False)
 
@@ -260,74 +261,37 @@ class Subscription(db.Model):
         rate = CURRENCY_RATES.get(self.currency, 1.0)
         return self.cost * rate
     
+    @property
+    def renewal_schedule(self):
+        return RenewalSchedule.for_subscription(self)
+
     @property
     def next_renewal_date(self):
         """
-        Calculates the next upcoming renewal date with advanced logic for
-        specific monthly renewal days.
+        Calculates the next upcoming renewal date (today or later), honouring
+        the specific monthly renewal day.
         """
-        current_date = date.today()
-        renewal_date = self.renewal_date
-        
-        while renewal_date < current_date:
-            if self.renewal_period_type == 'monthly':
-                # --- NEW: Advanced Monthly Logic ---
-                # Move to the next month(s) first
-                next_month = renewal_date + relativedelta(months=+self.renewal_period_value)
-                
-                day = next_month.day
-                if self.monthly_renewal_day:
-                    if self.monthly_renewal_day == 'first':
-                        day = 1
-                    elif self.monthly_renewal_day == 'last':
-                        # Get the last day of that month
-                        day = calendar.monthrange(next_month.year, next_month.month)[1]
-                    else:
-                        try:
-                            # Use the specific day, but ensure it's valid for that month
-                            day = int(self.monthly_renewal_day)
-                            last_day_of_month = calendar.monthrange(next_month.year, next_month.month)[1]
-                            day = min(day, last_day_of_month)
-                        except (ValueError, TypeError):
-                            pass # Fallback to original day if invalid
-                
-                renewal_date = next_month.replace(day=day)
-
-            elif self.renewal_period_type == 'yearly':
-                renewal_date += relativedelta(years=+self.renewal_period_value)
-            else: # custom
-                renewal_date += timedelta(days=self.renewal_period_value)
-        
-        return renewal_date
-    
+        return self.renewal_schedule.first_on_or_after(date.today())
+
     def get_renewal_date_after(self, current_renewal):
         """
         Calculates the single next renewal date after a given date,
         applying all advanced monthly logic.
         """
-        if self.renewal_period_type == 'monthly':
-            # Move to the next month(s) first
-            next_month_base = current_renewal + relativedelta(months=+self.renewal_period_value)
-            
-            day = next_month_base.day # Default to the same day in the next month
-            if self.monthly_renewal_day:
-                if self.monthly_renewal_day == 'first':
-                    day = 1
-                elif self.monthly_renewal_day == 'last':
-                    # Get the last day of that month
-                    day = calendar.monthrange(next_month_base.year, next_month_base.month)[1]
-                else:
-                    try:
-                        # Use the specific day, but ensure it's valid for that month
-                        day = int(self.monthly_renewal_day)
-                        last_day_of_month = calendar.monthrange(next_month_base.year, next_month_base.month)[1]
-                        day = min(day, last_day_of_month)
-                    except (ValueError, TypeError):
-                        pass # Fallback to original day if invalid
-            
-            return next_month_base.replace(day=day)
-
-        elif self.renewal_period_type == 'yearly':
-            return current_renewal + relativedelta(years=+self.renewal_period_value)
-        else: # custom
-            return current_renewal + timedelta(days=self.renewal_period_value)
+        return self.renewal_schedule.next_after(current_renewal)
+
+    def renewals_between(self, start_date, end_date):
+        """Yields every renewal date in the inclusive [start_date, end_date] window."""
+        return self.renewal_schedule.between(start_date, end_date)
+
+class RenewalOccurrence(db.Model):
+    """
+    Precomputed renewal dates of active subscriptions over a rolling horizon.
+    Maintained by the hooks in src/renewal_index.py; never edited by hand.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    subscription_id = db.Column(db.Integer, db.ForeignKey('subscription.id'), nullable=False, index=True)
+    renewal_date = db.Column(db.Date, nullable=False, index=True)
+    cost_eur = db.Column(db.Float, nullable=False)
+
+    subscription = db.relationship('Subscription')
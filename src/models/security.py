@@ -1,5 +1,5 @@
 from datetime import datetime, date
-from sqlalchemy.orm import foreign
+from sqlalchemy.orm import foreign, joinedload
 from sqlalchemy import and_
 from ..extensions import db
 from .core import Attachment
@@ -34,42 +34,73 @@ class ComplianceLink(db.Model):
     @property
     def linked_object(self):
         """Resolves the polymorphic relationship to the linked object."""
-        # Import models inside the method to avoid circular imports
-        from .assets import Asset, Peripheral, Software, License, MaintenanceLog
-        from .procurement import Supplier, Purchase, Budget, Subscription
-        from .core import Link, Documentation
-        from .policy import Policy
-        from .training import Course
-        from .bcdr import BCDRPlan
-        
-        # Map types to models
-        model_map = {
-            'Asset': Asset,
-            'Peripheral': Peripheral,
-            'Software': Software,
-            'License': License,
-            'MaintenanceLog': MaintenanceLog,
-            'Supplier': Supplier,
-            'Purchase': Purchase,
-            'Budget': Budget,
-            'Subscription': Subscription,
-            'Link': Link,
-            'Documentation': Documentation,
-            'Policy': Policy,
-            'Course': Course,
-            'BCDRPlan': BCDRPlan,
-            'SecurityIncident': SecurityIncident,
-            'SecurityAssessment': SecurityAssessment,
-            'Risk': Risk,
-            'Risk': Risk,
-            'AssetInventory': AssetInventory
-        }
-        
-        model = model_map.get(self.linkable_type)
+        # Set by resolve_linked_objects() when links are loaded in bulk
+        if '_linked_object' in self.__dict__:
+            return self._linked_object
+        model = linkable_models().get(self.linkable_type)
         if model:
             return model.query.get(self.linkable_id)
         return None
 
+
+def linkable_models():
+    """Maps ComplianceLink.linkable_type values to their models."""
+    # Import models inside the function to avoid circular imports
+    from .assets import Asset, Peripheral, Software, License, MaintenanceLog
+    from .procurement import Supplier, Purchase, Budget, Subscription
+    from .core import Link, Documentation
+    from .policy import Policy
+    from .training import Course
+    from .bcdr import BCDRPlan
+
+    return {
+        'Asset': Asset,
+        'Peripheral': Peripheral,
+        'Software': Software,
+        'License': License,
+        'MaintenanceLog': MaintenanceLog,
+        'Supplier': Supplier,
+        'Purchase': Purchase,
+        'Budget': Budget,
+        'Subscription': Subscription,
+        'Link': Link,
+        'Documentation': Documentation,
+        'Policy': Policy,
+        'Course': Course,
+        'BCDRPlan': BCDRPlan,
+        'SecurityIncident': SecurityIncident,
+        'SecurityAssessment': SecurityAssessment,
+        'Risk': Risk,
+        'AssetInventory': AssetInventory
+    }
+
+
+def resolve_linked_objects(links):
+    """
+    Resolves linked_object for many links at once: one IN (...) query per
+    linkable_type instead of one query per link. Returns the links.
+    """
+    ids_by_type = {}
+    for link in links:
+        ids_by_type.setdefault(link.linkable_type, set()).add(link.linkable_id)
+
+    models = linkable_models()
+    objects = {}
+    for linkable_type, ids in ids_by_type.items():
+        model = models.get(linkable_type)
+        if model is None:
+            continue
+        query = model.query.filter(model.id.in_(ids))
+        if linkable_type == 'SecurityAssessment':
+            # Assessments are labelled with their supplier's name
+            query = query.options(joinedload(model.supplier))
+        for obj in query.all():
+            objects[(linkable_type, obj.id)] = obj
+
+    for link in links:
+        link._linked_object = objects.get((link.linkable_type, link.linkable_id))
+    return links
+
 incident_assets = db.Table('incident_assets',
     db.Column('incident_id', db.Integer, db.ForeignKey('security_incident.id'), primary_key=True),
     db.Column('asset_id', db.Integer, db.ForeignKey('asset.id'), primary_key=True)
@@ -94,7 +125,7 @@ class SecurityIncident(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text, nullable=False)
-    incident_date = db.Column(db.DateTime, default=datetime.utcnow)
+    incident_date = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     status = db.Column(db.String(50), default='Investigating') # Investigating, Contained, Resolved, Closed
     severity = db.Column(db.String(50), default='SEV-3') # SEV-0 (Critical) to SEV-3 (Low)
     impact = db.Column(db.String(50), default='Minor') # Minor, Moderate, Significant, Extensive
@@ -159,7 +190,7 @@ class Risk(db.Model):
     impact = db.Column(db.String(50), default='Low') # Low, Medium, High
     mitigation_plan = db.Column(db.Text)
     iso_27001_control = db.Column(db.String(100)) # e.g., 'A.12.1.2 Protection against malware'
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     link = db.Column(db.String(512))
     attachments = db.relationship('Attachment',
                             primaryjoin="and_(Risk.id==foreign(Attachment.linkable_id), "
@@ -26,7 +26,7 @@ class Course(db.Model):
 class CourseAssignment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     assigned_date = db.Column(db.Date, nullable=False, default=date.today)
-    due_date = db.Column(db.Date, nullable=False)
+    due_date = db.Column(db.Date, nullable=False, index=True)
     
     course_id = db.Column(db.Integer, db.ForeignKey('course.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -1,117 +1,290 @@
-import os
+import json
 import requests
 import smtplib
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from sqlalchemy import or_, and_, update
 
 # Import the models needed for the notification logic
-from .models import Subscription, NotificationSetting
+from .extensions import db
+from .models import NotificationSetting, NotificationOutbox
+from markupsafe import escape
+from . import expiry_scanner
 
-# --- Notification Functions ---
+# Notifications delivered per batch (one SMTP connection per batch)
+OUTBOX_BATCH_SIZE = 100
+# Webhooks posted in parallel, and the size of the HTTP connection pool
+WEBHOOK_CONCURRENCY = 4
+WEBHOOK_TIMEOUT = 10
+# A notification is dead-lettered after MAX_ATTEMPTS failed deliveries; retries
+# back off exponentially from RETRY_BASE_DELAY up to RETRY_MAX_DELAY
+MAX_ATTEMPTS = 6
+RETRY_BASE_DELAY = timedelta(minutes=1)
+RETRY_MAX_DELAY = timedelta(hours=6)
+# Rows left in 'sending' longer than this (e.g. the worker died) are picked up again
+CLAIM_TIMEOUT = timedelta(minutes=15)
 
-def send_email(app, subject, body, to_emails):
-    """Send email notification using app config."""
-    # Check for both a recipient and an email username in config
-    if not to_emails or not app.config.get('EMAIL_USERNAME'):
-        return False
-    
-    try:
-        msg = MIMEMultipart()
-        msg['From'] = app.config['EMAIL_USERNAME']
-        msg['To'] = ', '.join(to_emails)
-        msg['Subject'] = subject
-        msg.attach(MIMEText(body, 'html'))
-        
-        server = smtplib.SMTP(app.config['SMTP_SERVER'], app.config['SMTP_PORT'])
-        server.starttls()
-        server.login(app.config['EMAIL_USERNAME'], app.config['EMAIL_PASSWORD'])
-        server.send_message(msg)
-        server.quit()
-        app.logger.info(f"Sent renewal email to {to_emails}")
-        return True
-    except Exception as e:
-        app.logger.error(f"Failed to send email: {e}")
-        return False
-
-def send_webhook(app, url, data):
-    """Send webhook notification to a specific URL."""
+_webhook_session = None
+
+
+def webhook_session():
+    """The pooled HTTP session shared by every webhook delivery."""
+    global _webhook_session
+    if _webhook_session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=WEBHOOK_CONCURRENCY, pool_maxsize=WEBHOOK_CONCURRENCY)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _webhook_session = session
+    return _webhook_session
+
+
+# --- Outbox ---
+
+def queue_email(subject, body, to_emails):
+    """Adds an email to the outbox; it is sent by the delivery worker once the session commits."""
+    if not to_emails:
+        return None
+    message = NotificationOutbox(channel='email', recipient=', '.join(to_emails), subject=subject, payload=body)
+    db.session.add(message)
+    return message
+
+
+def queue_webhook(url, data):
+    """Adds a webhook call (JSON body) to the outbox."""
     if not url:
-        return False
-    
+        return None
+    message = NotificationOutbox(channel='webhook', recipient=url, payload=json.dumps(data))
+    db.session.add(message)
+    return message
+
+
+def retry_delay(attempts):
+    """Backoff before the next attempt after `attempts` failed deliveries."""
+    return min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+
+
+def _claim_batch(now, limit):
+    """
+    Marks up to `limit` due notifications as 'sending' and returns them. The
+    UPDATE re-checks the status, so a row claimed by another worker in the
+    meantime is skipped.
+    """
+    due = or_(
+        and_(NotificationOutbox.status == 'pending', NotificationOutbox.next_attempt_at <= now),
+        and_(NotificationOutbox.status == 'sending', NotificationOutbox.claimed_at < now - CLAIM_TIMEOUT),
+    )
+    ids = [row.id for row in db.session.query(NotificationOutbox.id).filter(due).order_by(NotificationOutbox.id).limit(limit)]
+    if not ids:
+        return []
+    db.session.execute(
+        update(NotificationOutbox)
+        .where(NotificationOutbox.id.in_(ids), due)
+        .values(status='sending', claimed_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return NotificationOutbox.query.filter(
+        NotificationOutbox.id.in_(ids), NotificationOutbox.status == 'sending', NotificationOutbox.claimed_at == now
+    ).order_by(NotificationOutbox.id).all()
+
+
+def _send_emails(app, messages):
+    """
+    Sends the emails of a batch over a single SMTP connection.
+    Returns {message id: error or None}.
+    """
+    results = {}
+    if not messages:
+        return results
+    if not app.config.get('EMAIL_USERNAME'):
+        return {message.id: 'Email is not configured (EMAIL_USERNAME is empty)' for message in messages}
+
+    try:
+        server = smtplib.SMTP(app.config['SMTP_SERVER'], app.config['SMTP_PORT'], timeout=30)
+    except (OSError, smtplib.SMTPException) as e:
+        return {message.id: f"Could not connect to the SMTP server: {e}" for message in messages}
+
+    try:
+        if app.config.get('SMTP_USE_TLS', True):
+            server.starttls()
+        if app.config.get('EMAIL_PASSWORD'):
+            server.login(app.config['EMAIL_USERNAME'], app.config['EMAIL_PASSWORD'])
+        for message in messages:
+            msg = MIMEMultipart()
+            msg['From'] = app.config['EMAIL_USERNAME']
+            msg['To'] = message.recipient
+            msg['Subject'] = message.subject or ''
+            msg.attach(MIMEText(message.payload, 'html'))
+            try:
+                server.send_message(msg)
+                results[message.id] = None
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError, smtplib.SMTPSenderRefused) as e:
+                # Only this message failed; the connection is still usable
+                results[message.id] = f"SMTP error: {e}"
+    except (OSError, smtplib.SMTPException) as e:
+        for message in messages:
+            results.setdefault(message.id, f"SMTP error: {e}")
+    finally:
+        try:
+            server.quit()
+        except (OSError, smtplib.SMTPException):
+            server.close()
+    return results
+
+
+def _post_webhook(message_id, url, payload):
     try:
-        response = requests.post(url, json=data, timeout=10)
-        app.logger.info(f"Sent webhook to {url}, status code: {response.status_code}")
-        return response.status_code == 200
-    except Exception as e:
-        app.logger.error(f"Failed to send webhook: {e}")
-        return False
-
-def check_upcoming_renewals(app):
+        response = webhook_session().post(
+            url, data=payload, headers={'Content-Type': 'application/json'}, timeout=WEBHOOK_TIMEOUT
+        )
+    except requests.RequestException as e:
+        return message_id, f"Webhook request failed: {e}"
+    if not 200 <= response.status_code < 300:
+        return message_id, f"Webhook returned HTTP {response.status_code}"
+    return message_id, None
+
+
+def _send_webhooks(messages):
+    """Posts the webhooks of a batch, WEBHOOK_CONCURRENCY at a time. Returns {message id: error or None}."""
+    if not messages:
+        return {}
+    # Plain values only: worker threads never touch the database session
+    calls = [(message.id, message.recipient, message.payload) for message in messages]
+    with ThreadPoolExecutor(max_workers=WEBHOOK_CONCURRENCY) as executor:
+        return dict(executor.map(lambda call: _post_webhook(*call), calls))
+
+
+def _record_results(messages, results, now):
+    for message in messages:
+        error = results.get(message.id, 'Not delivered')
+        message.claimed_at = None
+        if error is None:
+            message.status = 'sent'
+            message.sent_at = now
+            message.last_error = None
+            continue
+        message.attempts += 1
+        message.last_error = error
+        if message.attempts >= MAX_ATTEMPTS:
+            message.status = 'dead'
+        else:
+            message.status = 'pending'
+            message.next_attempt_at = now + retry_delay(message.attempts)
+    db.session.commit()
+
+
+def deliver_pending(app, now=None, max_batches=None):
     """
-    Checks for subscriptions that need renewal notifications based on user settings
-    and sends alerts via email and/or webhooks.
+    Drains the outbox batch by batch. Returns (sent, failed): failed
+    deliveries are either rescheduled or, after the last attempt,
+    dead-lettered.
+    """
+    sent = failed = batches = 0
+    while max_batches is None or batches < max_batches:
+        now_batch = now or datetime.utcnow()
+        messages = _claim_batch(now_batch, OUTBOX_BATCH_SIZE)
+        if not messages:
+            break
+        batches += 1
+        results = _send_emails(app, [message for message in messages if message.channel == 'email'])
+        results.update(_send_webhooks([message for message in messages if message.channel == 'webhook']))
+        _record_results(messages, results, now_batch)
+        for message in messages:
+            if message.status == 'sent':
+                sent += 1
+            else:
+                failed += 1
+                app.logger.warning(f"Notification {message.id} ({message.channel}) failed: {message.last_error}")
+    return sent, failed
+
+
+def deliver_notifications(app):
+    """Scheduler job: delivers the queued notifications. Returns how many were attempted."""
+    with app.app_context():
+        sent, failed = deliver_pending(app)
+        if sent or failed:
+            app.logger.info(f"Notification outbox: {sent} sent, {failed} failed.")
+        return sent + failed
+
+
+def _digest_html(events):
+    html_content = "<h2>Upcoming Renewals and Expiries</h2>"
+    for kind, heading in expiry_scanner.SECTIONS.items():
+        section = [event for event in events if event.kind == kind]
+        if not section:
+            continue
+        html_content += f"<h3>{heading}</h3><ul>"
+        for event in section:
+            line = f"<strong>{escape(event.name)}</strong> - {event.due_date.isoformat()} (in {event.days_until} days)"
+            if kind == 'subscription':
+                line += f" - {escape(event.details['type'])} - €{event.details['cost_eur']:.2f}"
+            elif kind == 'course_assignment':
+                line += f" - {escape(event.details['user'])}"
+            html_content += f"<li>{line}</li>"
+        html_content += "</ul>"
+    return html_content
+
+
+def check_upcoming_expiries(app, today=None):
+    """
+    Scans every dated source (subscription renewals, license expiries,
+    warranties, payment methods, training due dates) for items due on one of
+    the configured notification days, and queues one email digest per
+    recipient plus one webhook for the delivery worker.
+    Returns the number of events found.
     """
     with app.app_context():
         # Step 1: Fetch Notification Settings from the database
         settings = NotificationSetting.query.first()
         if not settings or (not settings.email_enabled and not settings.webhook_enabled):
             app.logger.info("Notifications are disabled. Skipping check.")
-            return
+            return 0
 
         # Step 2: Determine which days require notifications
         try:
             notify_days = {int(day) for day in settings.notify_days_before.split(',') if day}
         except (ValueError, TypeError):
             app.logger.error("Invalid 'notify_days_before' format. Skipping check.")
-            return
-            
+            return 0
+
         if not notify_days:
-            return # No notification days configured
-
-        # Step 3: Find subscriptions that match the notification criteria
-        today = datetime.now().date()
-        subscriptions_to_notify = []
-        all_subscriptions = Subscription.query.all()
-
-        for subscription in all_subscriptions:
-            days_until = (subscription.next_renewal_date - today).days
-            # Check if the subscription is due on one of the configured notification days
-            if days_until in notify_days:
-                subscriptions_to_notify.append(subscription)
-
-        # Step 4: If there are subscriptions to notify about, build and send the alerts
-        if subscriptions_to_notify:
-            html_content = "<h2>Upcoming subscription Renewals</h2><ul>"
-            webhook_data = {
-                "text": "Upcoming subscription Renewals",
-                "renewals": []
-            }
-            
-            for subscription in subscriptions_to_notify:
-                days_until = (subscription.next_renewal_date - today).days
-                html_content += f"<li><strong>{subscription.name}</strong> ({subscription.subscription_type}) - Renews in {days_until} days - €{subscription.cost_eur:.2f}</li>"
-                webhook_data["renewals"].append({
-                    "name": subscription.name,
-                    "type": subscription.subscription_type,
-                    "renewal_date": subscription.next_renewal_date.isoformat(),
-                    "days_until": days_until,
-                    "cost_eur": subscription.cost_eur
-                })
-            
-            html_content += "</ul>"
-            
-            # Send email if enabled and a recipient is set
-            if settings.email_enabled and settings.email_recipient:
-                send_email(
-                    app,
-                    "Subscription Renewal Reminder", 
-                    html_content,
-                    [settings.email_recipient]
-                )
-            
-            # Send webhook if enabled and a URL is set
-            if settings.webhook_enabled and settings.webhook_url:
-                send_webhook(app, settings.webhook_url, webhook_data)
-        else:
-            app.logger.info("No subscriptions require notification today.")
\ No newline at end of file
+            return 0 # No notification days configured
+
+        # Step 3: Items falling exactly on one of the configured notification days
+        today = today or datetime.now().date()
+        events = expiry_scanner.scan(today, notify_days)
+        if not events:
+            app.logger.info("No renewals or expiries require notification today.")
+            return 0
+
+        # Step 4: Queue one digest per recipient and the webhook
+        if settings.email_enabled:
+            for address, digest in expiry_scanner.digests(events, settings.email_recipient).items():
+                queue_email("Upcoming Renewals and Expiries", _digest_html(digest), [address])
+
+        if settings.webhook_enabled and settings.webhook_url:
+            queue_webhook(settings.webhook_url, {
+                "text": "Upcoming Renewals and Expiries",
+                # Kept in the original shape for existing consumers
+                "renewals": [
+                    {
+                        "name": event.name,
+                        "type": event.details['type'],
+                        "renewal_date": event.due_date.isoformat(),
+                        "days_until": event.days_until,
+                        "cost_eur": event.details['cost_eur'],
+                    }
+                    for event in events if event.kind == 'subscription'
+                ],
+                "events": [
+                    dict(kind=event.kind, name=event.name, due_date=event.due_date.isoformat(),
+                         days_until=event.days_until, **event.details)
+                    for event in events
+                ],
+            })
+        db.session.commit()
+        return len(events)
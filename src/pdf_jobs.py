@@ -0,0 +1,259 @@
+import hashlib
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import update, func
+from sqlalchemy.exc import SQLAlchemyError
+
+from .extensions import db
+from .models import PdfJob, Attachment
+
+# How often a process marks the jobs it is still rendering as alive
+HEARTBEAT_SECONDS = 30
+
+_executor = None
+_lock = threading.Lock()
+# Renders still running in this process: job id -> future, content hash -> future
+_job_futures = {}
+_renders = {}
+# Heartbeat thread of each app
+_heartbeats = {}
+
+
+def content_hash(html):
+    return hashlib.sha256(html.encode('utf-8')).hexdigest()
+
+
+def cache_path(app, digest):
+    return os.path.join(app.config['PDF_CACHE_FOLDER'], f"{digest}.pdf")
+
+
+def render_pdf(html, path):
+    """Runs in a pool process: renders `html` with WeasyPrint and writes the PDF to `path`."""
+    from weasyprint import HTML
+    pdf = HTML(string=html).write_pdf()
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, 'wb') as f:
+        f.write(pdf)
+    # Readers never see a half-written cache file
+    os.replace(temporary_path, path)
+    return path
+
+
+def executor(app, replace=False):
+    """
+    The process pool shared by every PDF job of this process, created on first
+    use. Workers are spawned rather than forked, so they never inherit the
+    scheduler threads or open database connections of the web process.
+    `replace` starts a new pool, after a worker died and broke the current one.
+    """
+    global _executor
+    with _lock:
+        if replace and _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=app.config['PDF_WORKERS'], mp_context=multiprocessing.get_context('spawn')
+            )
+        return _executor
+
+
+def prune_cache(app):
+    """Keeps the PDF_CACHE_MAX_FILES most recently used PDFs in the cache folder."""
+    folder = app.config['PDF_CACHE_FOLDER']
+    try:
+        entries = [entry for entry in os.scandir(folder) if entry.name.endswith('.pdf')]
+    except OSError:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in entries[app.config['PDF_CACHE_MAX_FILES']:]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def _start_render(app, html, path, digest):
+    """The future of the render of `digest`: the one already running in this process, or a new one."""
+    with _lock:
+        future = _renders.get(digest)
+    if future is not None:
+        return future
+    try:
+        future = executor(app).submit(render_pdf, html, path)
+    except BrokenProcessPool:
+        future = executor(app, replace=True).submit(render_pdf, html, path)
+    with _lock:
+        future = _renders.setdefault(digest, future)
+    future.add_done_callback(lambda _: _renders.pop(digest, None))
+    return future
+
+
+def _beat(app):
+    """Heartbeat thread: keeps the jobs of this process alive until none is left."""
+    while True:
+        time.sleep(HEARTBEAT_SECONDS)
+        with _lock:
+            job_ids = list(_job_futures)
+            if not job_ids:
+                _heartbeats.pop(app, None)
+                return
+        with app.app_context():
+            try:
+                db.session.execute(
+                    update(PdfJob).where(PdfJob.id.in_(job_ids), PdfJob.status == 'queued')
+                    .values(heartbeat_at=datetime.utcnow())
+                )
+                db.session.commit()
+            except SQLAlchemyError:
+                db.session.rollback()
+                app.logger.exception("Could not refresh the PDF job heartbeats")
+
+
+def _start_heartbeat(app):
+    with _lock:
+        if app not in _heartbeats:
+            _heartbeats[app] = threading.Thread(target=_beat, args=(app,), name='pdf-job-heartbeat', daemon=True)
+            _heartbeats[app].start()
+
+
+def submit(html, kind, filename, cache_key=None, linkable=None, batch_id=None, return_url=None,
+           requested_by_id=None):
+    """
+    Queues the rendering of `html` and returns its PdfJob. `cache_key` is the
+    text the cache is keyed on (by default `html` itself): pages stamped with
+    the time of the request pass their content instead, so unchanged content
+    hits the cache. A cached PDF finishes the job right away, and
+    identical renders already running in this process are shared.
+    `linkable` = (type, id) saves the finished PDF as an attachment of that record.
+    """
+    app = current_app._get_current_object()
+    digest = content_hash(cache_key if cache_key is not None else html)
+    job = PdfJob(
+        id=uuid.uuid4().hex, kind=kind, batch_id=batch_id, content_hash=digest, filename=filename,
+        heartbeat_at=datetime.utcnow(),
+        linkable_type=linkable[0] if linkable else None, linkable_id=linkable[1] if linkable else None,
+        return_url=return_url, requested_by_id=requested_by_id,
+    )
+    db.session.add(job)
+    db.session.commit()
+    job_id = job.id
+
+    path = cache_path(app, digest)
+    if os.path.exists(path):
+        os.utime(path)  # Marks it as recently used for pruning
+        finish(app, job_id)
+        db.session.refresh(job)
+        return job
+
+    future = _start_render(app, html, path, digest)
+    with _lock:
+        _job_futures[job_id] = future
+    _start_heartbeat(app)
+    future.add_done_callback(lambda done: finish(app, job_id, done))
+    return job
+
+
+def finish(app, job_id, future=None):
+    """
+    Records the outcome of a job's render, and saves the PDF as an attachment
+    when the job asks for one. Called by the render's done callback and by
+    wait(); the conditional UPDATE makes sure only the first call does the work.
+    """
+    error = None
+    if future is not None:
+        try:
+            future.result()
+        except Exception:
+            error = traceback.format_exc()
+
+    with app.app_context():
+        result = db.session.execute(
+            update(PdfJob)
+            .where(PdfJob.id == job_id, PdfJob.status == 'queued')
+            .values(status='failed' if error else 'done', error=error, finished_at=datetime.utcnow())
+        )
+        if not result.rowcount:
+            db.session.rollback()
+            return
+        job = db.session.get(PdfJob, job_id)
+        if error:
+            app.logger.error(f"PDF job {job_id} ({job.kind}) failed:\n{error}")
+        elif job.linkable_type:
+            stored_filename = f"{uuid.uuid4().hex}.pdf"
+            try:
+                shutil.copyfile(cache_path(app, job.content_hash),
+                                os.path.join(app.config['UPLOAD_FOLDER'], stored_filename))
+                attachment = Attachment(filename=job.filename, secure_filename=stored_filename,
+                                        linkable_type=job.linkable_type, linkable_id=job.linkable_id)
+                db.session.add(attachment)
+                db.session.flush()
+                job.attachment_id = attachment.id
+            except OSError as e:
+                job.status = 'failed'
+                job.error = f"Could not save the PDF as an attachment: {e}"
+                app.logger.error(f"PDF job {job_id}: {job.error}")
+        db.session.commit()
+    with _lock:
+        _job_futures.pop(job_id, None)
+    if future is not None and not error:
+        prune_cache(app)
+
+
+def wait(job, timeout):
+    """
+    Waits up to `timeout` seconds for a job submitted by this process, so
+    quick renders are answered within the request. Returns the job, refreshed.
+    """
+    with _lock:
+        future = _job_futures.get(job.id)
+    if future is not None:
+        try:
+            future.result(timeout=timeout)
+        except FutureTimeoutError:
+            return job
+        except Exception:
+            pass  # Recorded on the job by finish()
+        finish(current_app._get_current_object(), job.id, future)
+    db.session.refresh(job)
+    return job
+
+
+def fail_stale_jobs(timeout, *criteria):
+    """
+    Marks the queued jobs (matching `criteria`) whose heartbeat stopped more
+    than `timeout` seconds ago as failed. Progress lives in the memory of the
+    process that submitted a job, which refreshes its heartbeat every
+    HEARTBEAT_SECONDS however long the job waits for the pool; a job whose
+    process was recycled or crashed would otherwise stay queued forever.
+    Returns the number of jobs failed.
+    """
+    now = datetime.utcnow()
+    last_seen = func.coalesce(PdfJob.heartbeat_at, PdfJob.created_at)
+    result = db.session.execute(
+        update(PdfJob)
+        .where(PdfJob.status == 'queued', last_seen < now - timedelta(seconds=timeout), *criteria)
+        .values(status='failed', error=f"No heartbeat for {timeout} seconds: its worker process has gone.",
+                finished_at=now)
+    )
+    db.session.commit()
+    if result.rowcount:
+        current_app.logger.warning(f"{result.rowcount} stale PDF job(s) marked as failed")
+    return result.rowcount
+
+
+def batch_progress(batch_id):
+    """(total, done, failed) job counts of a batch."""
+    counts = dict(
+        db.session.query(PdfJob.status, db.func.count()).filter(PdfJob.batch_id == batch_id).group_by(PdfJob.status)
+    )
+    return sum(counts.values()), counts.get('done', 0), counts.get('failed', 0)
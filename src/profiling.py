@@ -0,0 +1,170 @@
+import cProfile
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+from flask import g, request
+
+# An admin request carrying either of these is profiled
+PROFILE_PARAM = '_profile'
+PROFILE_HEADER = 'X-Profile'
+
+_PROFILE_ID = re.compile(r'^\d{20}-[0-9a-f]{8}$')
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only one profiler can be active at a time (sys.monitoring allows a single one on Python 3.12+)
+_lock = threading.Lock()
+
+
+def _wants_profile():
+    return PROFILE_PARAM in request.args or PROFILE_HEADER in request.headers
+
+
+def profile_path(app, profile_id, extension='prof'):
+    """Path of a stored profile (or of its metadata), None for ids that are not ours."""
+    if not _PROFILE_ID.match(profile_id or ''):
+        return None
+    return os.path.join(app.config['PROFILE_FOLDER'], f"{profile_id}.{extension}")
+
+
+def save_profile(app, profile_id, profiler, meta):
+    """Writes the profile and its metadata, then drops the oldest beyond PROFILE_MAX_FILES."""
+    os.makedirs(app.config['PROFILE_FOLDER'], exist_ok=True)
+    profiler.dump_stats(profile_path(app, profile_id))
+    with open(profile_path(app, profile_id, 'json'), 'w') as f:
+        json.dump(meta, f)
+    prune_profiles(app)
+
+
+def prune_profiles(app):
+    """Keeps the PROFILE_MAX_FILES most recent profiles: the folder is a ring buffer."""
+    for meta in list_profiles(app)[app.config['PROFILE_MAX_FILES']:]:
+        for extension in ('prof', 'json'):
+            try:
+                os.remove(profile_path(app, meta['id'], extension))
+            except OSError:
+                pass
+
+
+def list_profiles(app):
+    """Metadata of the stored profiles, newest first."""
+    try:
+        names = os.listdir(app.config['PROFILE_FOLDER'])
+    except OSError:
+        return []
+    profiles = []
+    # Ids start with a timestamp, so name order is age order
+    for name in sorted(names, reverse=True):
+        profile_id, extension = os.path.splitext(name)
+        if extension != '.json' or not _PROFILE_ID.match(profile_id):
+            continue
+        try:
+            with open(os.path.join(app.config['PROFILE_FOLDER'], name)) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def load_profile(app, profile_id):
+    """The metadata of a stored profile, or None."""
+    path = profile_path(app, profile_id, 'json')
+    if path is None or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _location(filename, line):
+    if filename.startswith(_PROJECT_ROOT + os.sep):
+        filename = os.path.relpath(filename, _PROJECT_ROOT)
+    elif 'site-packages' + os.sep in filename:
+        filename = filename.split('site-packages' + os.sep, 1)[1]
+    return f"{filename}:{line}" if line else filename
+
+
+def top_functions(app, profile_id, sort='cumulative', limit=50):
+    """
+    The `limit` functions of a stored profile with the highest cumulative
+    (or own, sort='tottime') time, as dicts. Times are in milliseconds.
+    """
+    stats = pstats.Stats(profile_path(app, profile_id))
+    rows = []
+    for (filename, line, function), (primitive_calls, calls, own, cumulative, _) in stats.stats.items():
+        rows.append({
+            'function': function,
+            'location': _location(filename, line),
+            'calls': str(calls) if calls == primitive_calls else f"{calls}/{primitive_calls}",
+            'tottime_ms': own * 1000,
+            'cumtime_ms': cumulative * 1000,
+            'percall_ms': cumulative * 1000 / primitive_calls if primitive_calls else 0.0,
+        })
+    key = 'tottime_ms' if sort == 'tottime' else 'cumtime_ms'
+    rows.sort(key=lambda row: row[key], reverse=True)
+    return rows[:limit], stats.total_tt * 1000
+
+
+def init_app(app):
+    """
+    Opt-in request profiler: an admin request with a `_profile` query parameter
+    or an `X-Profile` header runs under cProfile. The profile is saved with its
+    route, arguments and timing in PROFILE_FOLDER (the last PROFILE_MAX_FILES
+    are kept) and listed at /admin/profiles; the response carries its id in
+    X-Profile-Id. Other requests only pay for the parameter check.
+    """
+    if not app.config['PROFILER_ENABLED']:
+        return
+
+    def start_profile():
+        if not _wants_profile():
+            return
+        from .routes.main import current_user
+        user = current_user()
+        if user is None or user.role != 'admin':
+            return
+        if not _lock.acquire(blocking=False):
+            app.logger.warning(f"Not profiling {request.path}: another request is being profiled")
+            return
+        profile_id = f"{datetime.utcnow():%Y%m%d%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+        g.profile = {'id': profile_id, 'profiler': cProfile.Profile(), 'user': user.email,
+                     'started': time.perf_counter(), 'status': None}
+        g.profile['profiler'].enable()
+
+    def tag_response(response):
+        profile = g.get('profile')
+        if profile is not None:
+            profile['status'] = response.status_code
+            response.headers['X-Profile-Id'] = profile['id']
+        return response
+
+    def finish_profile(exc):
+        # g outlives the request when an app context was already pushed (tests, CLI)
+        profile = g.pop('profile', None)
+        if profile is None:
+            return
+        try:
+            profile['profiler'].disable()
+        finally:
+            _lock.release()
+        duration_ms = (time.perf_counter() - profile['started']) * 1000
+        save_profile(app, profile['id'], profile['profiler'], {
+            'id': profile['id'],
+            'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'view_args': request.view_args or {},
+            'args': {key: value for key, value in request.args.items() if key != PROFILE_PARAM},
+            'status': profile['status'] if exc is None else 500,
+            'error': repr(exc) if exc is not None else None,
+            'duration_ms': round(duration_ms, 1),
+            'user': profile['user'],
+        })
+
+    app.before_request(start_profile)
+    app.after_request(tag_response)
+    app.teardown_request(finish_profile)
@@ -0,0 +1,188 @@
+from datetime import date, timedelta
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import joinedload, selectinload
+
+from .extensions import db
+from .models import Subscription, RenewalOccurrence
+from .forecast import SpendForecast
+
+# How far ahead renewal occurrences are materialized
+RENEWAL_HORIZON_MONTHS = 24
+
+# Changing any of these invalidates a subscription's materialized occurrences
+SCHEDULE_FIELDS = (
+    'renewal_date', 'renewal_period_type', 'renewal_period_value',
+    'monthly_renewal_day', 'cost', 'currency', 'is_archived'
+)
+
+
+def horizon_bounds(today=None):
+    """Returns the (start, end) dates that occurrences are generated for."""
+    today = today or date.today()
+    return today.replace(day=1), today + relativedelta(months=+RENEWAL_HORIZON_MONTHS)
+
+
+def covered_until(today=None):
+    """
+    Last date that window queries may trust the table for. One month short of
+    the generated horizon so a few missed nightly runs don't leave gaps.
+    """
+    today = today or date.today()
+    return today + relativedelta(months=+(RENEWAL_HORIZON_MONTHS - 1))
+
+
+def _occurrence_rows(subscription, start_date, end_date):
+    cost_eur = subscription.cost_eur
+    return [
+        {'subscription_id': subscription.id, 'renewal_date': renewal, 'cost_eur': cost_eur}
+        for renewal in subscription.renewals_between(start_date, end_date)
+    ]
+
+
+def regenerate_occurrences(connection, subscription):
+    """Replaces one subscription's occurrences using the given connection."""
+    table = RenewalOccurrence.__table__
+    connection.execute(table.delete().where(table.c.subscription_id == subscription.id))
+    if subscription.is_archived:
+        return
+    rows = _occurrence_rows(subscription, *horizon_bounds())
+    if rows:
+        connection.execute(table.insert(), rows)
+
+
+@event.listens_for(Subscription, 'after_insert')
+def _materialize_new_subscription(mapper, connection, target):
+    regenerate_occurrences(connection, target)
+
+
+@event.listens_for(Subscription, 'after_update')
+def _materialize_changed_subscription(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in SCHEDULE_FIELDS):
+        regenerate_occurrences(connection, target)
+
+
+@event.listens_for(Subscription, 'before_delete')
+def _drop_deleted_subscription(mapper, connection, target):
+    table = RenewalOccurrence.__table__
+    connection.execute(table.delete().where(table.c.subscription_id == target.id))
+
+
+def rebuild_renewal_occurrences():
+    """Regenerates the whole table from scratch. Returns the number of rows written."""
+    start_date, end_date = horizon_bounds()
+    RenewalOccurrence.query.delete()
+    rows = []
+    for subscription in Subscription.query.filter_by(is_archived=False).yield_per(1000):
+        rows.extend(_occurrence_rows(subscription, start_date, end_date))
+    if rows:
+        db.session.execute(RenewalOccurrence.__table__.insert(), rows)
+    db.session.commit()
+    return len(rows)
+
+
+def extend_renewal_horizon(app):
+    """
+    Nightly job: drops occurrences that fell out of the horizon and appends the
+    ones that entered it, starting after each subscription's last stored date.
+    Returns the number of occurrences added.
+    """
+    with app.app_context():
+        start_date, end_date = horizon_bounds()
+        RenewalOccurrence.query.filter(RenewalOccurrence.renewal_date < start_date).delete()
+
+        last_stored = dict(
+            db.session.query(RenewalOccurrence.subscription_id, func.max(RenewalOccurrence.renewal_date))
+            .group_by(RenewalOccurrence.subscription_id).all()
+        )
+        rows = []
+        for subscription in Subscription.query.filter_by(is_archived=False).yield_per(1000):
+            last = last_stored.get(subscription.id)
+            window_start = max(last + timedelta(days=1), start_date) if last else start_date
+            rows.extend(_occurrence_rows(subscription, window_start, end_date))
+        if rows:
+            db.session.execute(RenewalOccurrence.__table__.insert(), rows)
+        db.session.commit()
+        app.logger.info(f"Renewal horizon extended to {end_date}: {len(rows)} new occurrences.")
+        return len(rows)
+
+
+def _with_subscription_details(query, path=None):
+    """Eager-loads what renewal lists render: the subscription, its supplier and tags."""
+    if path is None:
+        return query.options(joinedload(Subscription.supplier), selectinload(Subscription.tags))
+    return query.options(
+        joinedload(path).joinedload(Subscription.supplier),
+        joinedload(path).selectinload(Subscription.tags)
+    )
+
+
+def renewals_in_window(start_date, end_date):
+    """
+    Returns [(renewal_date, subscription)] for active subscriptions in the
+    inclusive window, sorted by date. Served by an indexed range scan when the
+    window is inside the materialized horizon.
+    """
+    horizon_start, _ = horizon_bounds()
+    if start_date >= horizon_start and end_date <= covered_until():
+        occurrences = (
+            _with_subscription_details(RenewalOccurrence.query, RenewalOccurrence.subscription)
+            .filter(RenewalOccurrence.renewal_date.between(start_date, end_date))
+            .order_by(RenewalOccurrence.renewal_date, RenewalOccurrence.subscription_id)
+            .all()
+        )
+        return [(occurrence.renewal_date, occurrence.subscription) for occurrence in occurrences]
+
+    # Outside the horizon (e.g. browsing the calendar years ahead): expand schedules
+    renewals = [
+        (renewal, subscription)
+        for subscription in _with_subscription_details(Subscription.query.filter_by(is_archived=False)).all()
+        for renewal in subscription.renewals_between(start_date, end_date)
+    ]
+    renewals.sort(key=lambda item: (item[0], item[1].id))
+    return renewals
+
+
+def renewals_on(dates):
+    """Returns [(renewal_date, subscription)] for renewals falling exactly on any of the given dates."""
+    dates = sorted(set(dates))
+    if not dates:
+        return []
+    horizon_start, _ = horizon_bounds()
+    if dates[0] < horizon_start or dates[-1] > covered_until():
+        return [item for item in renewals_in_window(dates[0], dates[-1]) if item[0] in dates]
+    occurrences = (
+        _with_subscription_details(RenewalOccurrence.query, RenewalOccurrence.subscription)
+        .filter(RenewalOccurrence.renewal_date.in_(dates))
+        .order_by(RenewalOccurrence.renewal_date, RenewalOccurrence.subscription_id)
+        .all()
+    )
+    return [(occurrence.renewal_date, occurrence.subscription) for occurrence in occurrences]
+
+
+def monthly_totals(start_date, end_date):
+    """
+    Returns (month_starts, eur_totals) for the inclusive window, aggregated
+    in SQL per renewal date. Windows outside the horizon fall back to the
+    vectorized schedule forecast.
+    """
+    horizon_start, _ = horizon_bounds()
+    if start_date < horizon_start or end_date > covered_until():
+        return SpendForecast.load().monthly_totals(start_date, end_date)
+
+    month_starts, month = [], start_date.replace(day=1)
+    while month <= end_date:
+        month_starts.append(month)
+        month += relativedelta(months=+1)
+    totals = dict.fromkeys(month_starts, 0.0)
+
+    daily_totals = (
+        db.session.query(RenewalOccurrence.renewal_date, func.sum(RenewalOccurrence.cost_eur))
+        .filter(RenewalOccurrence.renewal_date.between(start_date, end_date))
+        .group_by(RenewalOccurrence.renewal_date)
+        .all()
+    )
+    for renewal_date, total in daily_totals:
+        totals[renewal_date.replace(day=1)] += total
+    return month_starts, list(totals.values())
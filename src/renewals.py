@@ -0,0 +1,88 @@
+import calendar
+from datetime import date, timedelta
+from dateutil.relativedelta import relativedelta
+
+
+class RenewalSchedule:
+    """
+    Closed-form view of a subscription's renewal recurrence.
+
+    Occurrence 0 is the anchor (the stored renewal_date). Occurrence k is
+    computed directly from the anchor, so finding the first renewal on or
+    after any date costs the same whether the anchor is last week or ten
+    years ago.
+    """
+
+    def __init__(self, anchor, period_type, period_value=1, monthly_day=None):
+        self.anchor = anchor
+        self.period_type = period_type
+        # A zero/empty period would never advance; treat it as a single unit
+        self.period_value = max(int(period_value or 1), 1)
+        self.monthly_day = monthly_day
+
+    @classmethod
+    def for_subscription(cls, subscription):
+        return cls(
+            subscription.renewal_date,
+            subscription.renewal_period_type,
+            subscription.renewal_period_value,
+            subscription.monthly_renewal_day
+        )
+
+    def _month_day(self, year, month):
+        """Applies the 'first' / 'last' / N rule, clamped to the month length."""
+        last_day = calendar.monthrange(year, month)[1]
+        if self.monthly_day == 'first':
+            return 1
+        if self.monthly_day == 'last':
+            return last_day
+        if self.monthly_day:
+            try:
+                return min(int(self.monthly_day), last_day)
+            except (ValueError, TypeError):
+                pass # Fallback to the anchor day if invalid
+        return min(self.anchor.day, last_day)
+
+    def occurrence(self, k):
+        """Returns the k-th renewal date (k=0 is the anchor itself)."""
+        if k <= 0:
+            return self.anchor
+        if self.period_type == 'monthly':
+            month_index = self.anchor.year * 12 + (self.anchor.month - 1) + k * self.period_value
+            year, month = divmod(month_index, 12)
+            return date(year, month + 1, self._month_day(year, month + 1))
+        elif self.period_type == 'yearly':
+            return self.anchor + relativedelta(years=+k * self.period_value)
+        else: # custom
+            return self.anchor + timedelta(days=k * self.period_value)
+
+    def index_on_or_after(self, target):
+        """Returns the smallest k such that occurrence(k) >= target."""
+        if target <= self.anchor:
+            return 0
+        if self.period_type == 'monthly':
+            elapsed = (target.year - self.anchor.year) * 12 + (target.month - self.anchor.month)
+        elif self.period_type == 'yearly':
+            elapsed = target.year - self.anchor.year
+        else: # custom
+            elapsed = (target - self.anchor).days
+        k = max(-(-elapsed // self.period_value), 1)
+        # Landing in the target's month/year can still fall before its day
+        if self.occurrence(k) < target:
+            k += 1
+        return k
+
+    def first_on_or_after(self, target):
+        return self.occurrence(self.index_on_or_after(target))
+
+    def next_after(self, current):
+        return self.first_on_or_after(current + timedelta(days=1))
+
+    def between(self, start, end):
+        """Lazily yields every renewal date in the inclusive [start, end] window."""
+        k = self.index_on_or_after(start)
+        renewal = self.occurrence(k)
+        while renewal <= end:
+            yield renewal
+            k += 1
+            renewal = self.occurrence(k)
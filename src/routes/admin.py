@@ -1,9 +1,12 @@
 from flask import (
-    Blueprint, render_template, request, redirect, url_for, flash, session
+    Blueprint, render_template, request, redirect, url_for, flash, current_app, send_file, abort
 )
-from ..models import db, User
-from .main import login_required
+from ..models import db, User, JobRun, SchedulerLease
+from .. import scheduler, profiling
+from .main import login_required, current_user
+import os
 from functools import wraps
+from datetime import datetime
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -11,13 +14,11 @@ admin_bp = Blueprint('admin', __name__)
 def admin_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        user_id = session.get('user_id')
-        if not user_id:
+        user = current_user() # Loaded once per request
+        if not user:
             # ... redirect to login
             return redirect(url_for('main.login'))
 
-        user = User.query.get(user_id) # ALWAYS fetch from DB
-
         if not user or user.role != 'admin':
             flash('You do not have permission to access this page.', 'danger')
             return redirect(url_for('main.dashboard'))
@@ -99,4 +100,82 @@ def delete_user(id):
     db.session.delete(user_to_delete)
     db.session.commit()
     flash(f'User "{user_to_delete.name}" has been deleted.', 'success')
-    return redirect(url_for('admin.list_users'))
\ No newline at end of file
+    return redirect(url_for('admin.list_users'))
+
+@admin_bp.route('/jobs')
+@login_required
+@admin_required
+def job_runs():
+    """Scheduled jobs: the current leader and the latest runs of each job."""
+    lease = db.session.get(SchedulerLease, scheduler.LEASE_NAME)
+    runs = JobRun.query.order_by(JobRun.started_at.desc()).limit(200).all()
+    return render_template('admin/job_runs.html', lease=lease, runs=runs, jobs=scheduler.JOBS,
+                           now=datetime.utcnow())
+
+
+@admin_bp.route('/performance')
+@login_required
+@admin_required
+def performance():
+    """Top routes by p95 latency and by query count, from this process's request statistics."""
+    route_stats = current_app.extensions.get('route_stats')
+    routes = route_stats.summary() if route_stats else []
+    return render_template(
+        'admin/performance.html',
+        enabled=route_stats is not None,
+        slowest=sorted(routes, key=lambda route: route['p95_ms'], reverse=True)[:25],
+        chattiest=sorted(routes, key=lambda route: (route['p95_queries'], route['mean_queries']), reverse=True)[:25],
+        slow_query_ms=current_app.config['SLOW_QUERY_MS'],
+        samples=current_app.config['ROUTE_STATS_SAMPLES'],
+    )
+
+
+@admin_bp.route('/performance/reset', methods=['POST'])
+@login_required
+@admin_required
+def reset_performance():
+    route_stats = current_app.extensions.get('route_stats')
+    if route_stats:
+        route_stats.reset()
+    flash('Request statistics have been reset.', 'success')
+    return redirect(url_for('admin.performance'))
+
+
+@admin_bp.route('/profiles')
+@login_required
+@admin_required
+def profiles():
+    """Requests profiled on demand (see src/profiling.py), newest first."""
+    return render_template(
+        'admin/profiles.html',
+        enabled=current_app.config['PROFILER_ENABLED'],
+        profiles=profiling.list_profiles(current_app),
+        max_files=current_app.config['PROFILE_MAX_FILES'],
+        param=profiling.PROFILE_PARAM,
+        header=profiling.PROFILE_HEADER,
+    )
+
+
+@admin_bp.route('/profiles/<profile_id>')
+@login_required
+@admin_required
+def profile_detail(profile_id):
+    """The top functions of one profile, by cumulative or own time."""
+    profile = profiling.load_profile(current_app, profile_id)
+    if profile is None:
+        abort(404)
+    sort = 'tottime' if request.args.get('sort') == 'tottime' else 'cumulative'
+    functions, total_ms = profiling.top_functions(current_app, profile_id, sort=sort)
+    return render_template('admin/profile_detail.html', profile=profile, functions=functions,
+                           total_ms=total_ms, sort=sort)
+
+
+@admin_bp.route('/profiles/<profile_id>/download')
+@login_required
+@admin_required
+def download_profile(profile_id):
+    path = profiling.profile_path(current_app, profile_id)
+    if path is None or not os.path.exists(path):
+        abort(404)
+    return send_file(path, mimetype='application/octet-stream', as_attachment=True,
+                     download_name=f"{profile_id}.prof")
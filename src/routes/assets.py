@@ -2,17 +2,41 @@ from flask import (
     Blueprint, render_template, request, redirect, url_for, flash
 )
 from datetime import datetime
+from sqlalchemy.orm import contains_eager
 from ..models import db, Asset, AssetHistory, User, Location, Supplier, Purchase, AssetAssignment, Peripheral
+from ..server_table import ServerTable, TableColumn
 from .main import login_required
 from .admin import admin_required
 
 assets_bp = Blueprint('assets', __name__)
 
+ASSET_TABLE = ServerTable(
+    Asset,
+    {
+        'name': TableColumn(Asset.name, searchable=True, filter='contains'),
+        'model': TableColumn(Asset.model, searchable=True, filter='contains', null_value=''),
+        'brand': TableColumn(Asset.brand, searchable=True, filter='contains', null_value=''),
+        'serial_number': TableColumn(Asset.serial_number, searchable=True, filter='contains', null_value=''),
+        'status': TableColumn(Asset.status, filter='exact'),
+        'user': TableColumn(User.name, searchable=True, filter='contains', null_value=''),
+        'location': TableColumn(Location.name, filter='exact', null_value=''),
+    },
+    'assets/_rows.html',
+    default_sort='name',
+    base_filters=(Asset.is_archived == False,),
+    joins=((User, Asset.user_id == User.id), (Location, Asset.location_id == Location.id)),
+    options=lambda: (contains_eager(Asset.user), contains_eager(Asset.location)),
+)
+
 @assets_bp.route('/')
 @login_required
 def assets():
-    assets = Asset.query.filter_by(is_archived=False).all()
-    return render_template('assets/list.html', assets=assets)
+    return ASSET_TABLE.render('assets/list.html', request.args)
+
+@assets_bp.route('/api/table')
+@login_required
+def assets_table():
+    return ASSET_TABLE.json_response(request.args)
 
 @assets_bp.route('/archived')
 @login_required
@@ -243,17 +267,12 @@ def checkin_asset(id):
 @assets_bp.route('/warranties')
 @login_required
 def warranties():
-    assets = Asset.query.filter(Asset.warranty_length.isnot(None)).all()
-    peripherals = Peripheral.query.filter(Peripheral.warranty_length.isnot(None)).all()
-    
+    assets = Asset.query.filter(Asset.warranty_end_date.isnot(None)).all()
+    peripherals = Peripheral.query.filter(Peripheral.warranty_end_date.isnot(None)).all()
+
     # Combine and sort assets and peripherals with warranties
-    all_items = assets + peripherals
-    
-    # Filter out items where warranty_end_date is None (it shouldn't happen with the query, but it's safe)
-    items_with_warranties = [item for item in all_items if item.warranty_end_date]
-    
-    sorted_items = sorted(items_with_warranties, key=lambda x: x.warranty_end_date, reverse=True)
-    
+    sorted_items = sorted(assets + peripherals, key=lambda x: x.warranty_end_date, reverse=True)
+
     return render_template('assets/warranties.html', items=sorted_items)
 
 @assets_bp.route('/<int:id>/history')
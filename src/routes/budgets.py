@@ -1,21 +1,43 @@
 from flask import (
     Blueprint, render_template, request, redirect, url_for, flash
 )
-from ..models import db, Budget
+from sqlalchemy.orm import selectinload, undefer
+from ..models import db, Budget, Purchase
+from ..server_table import ServerTable, TableColumn
 from .main import login_required
 
 budgets_bp = Blueprint('budgets', __name__)
 
+BUDGET_TABLE = ServerTable(
+    Budget,
+    {
+        'name': TableColumn(Budget.name, searchable=True, filter='contains'),
+        'category': TableColumn(Budget.category, searchable=True, filter='exact', null_value=''),
+        'amount': TableColumn(Budget.amount, filter='min'),
+        'period': TableColumn(Budget.period, filter='exact'),
+        'remaining': TableColumn(Budget.remaining, filter='min'),
+    },
+    'budgets/_rows.html',
+    default_sort='name',
+    options=lambda: (undefer(Budget.spent),),
+)
+
 @budgets_bp.route('/')
 @login_required
 def budgets():
-    budgets = Budget.query.all()
-    return render_template('budgets/list.html', budgets=budgets)
+    return BUDGET_TABLE.render('budgets/list.html', request.args)
+
+@budgets_bp.route('/api/table')
+@login_required
+def budgets_table():
+    return BUDGET_TABLE.json_response(request.args)
 
 @budgets_bp.route('/<int:id>')
 @login_required
 def budget_detail(id):
-    budget = Budget.query.get_or_404(id)
+    budget = Budget.query.options(
+        selectinload(Budget.purchases).undefer(Purchase.calculated_cost)
+    ).get_or_404(id)
     return render_template('budgets/detail.html', budget=budget)
 
 @budgets_bp.route('/new', methods=['GET', 'POST'])
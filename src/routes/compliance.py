@@ -1,14 +1,36 @@
+import json
 import os
 import uuid
 from werkzeug.utils import secure_filename
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, current_app
 from datetime import datetime
-from ..models import db, Supplier, SecurityAssessment, PolicyVersion, User, AssetInventory, AssetInventoryItem, Asset, BCDRPlan, BCDRTestLog, Subscription, SecurityIncident, PostIncidentReview, IncidentTimelineEvent, MaintenanceLog, Attachment, Framework, FrameworkControl, ComplianceLink
-from .main import login_required
+from ..models import db, Supplier, SecurityAssessment, PolicyVersion, User, AssetInventory, AssetInventoryItem, Asset, BCDRPlan, BCDRTestLog, Subscription, SecurityIncident, PostIncidentReview, IncidentTimelineEvent, MaintenanceLog, Attachment, Framework, FrameworkControl, ComplianceLink, resolve_linked_objects
+from sqlalchemy.orm import contains_eager, joinedload
+from ..server_table import ServerTable, TableColumn
+from .main import login_required, current_user
 from .admin import admin_required
+from .pdf_jobs import job_result
+from .. import pdf_jobs
 
 compliance_bp = Blueprint('compliance', __name__)
 
+INCIDENT_TABLE = ServerTable(
+    SecurityIncident,
+    {
+        'incident_date': TableColumn(SecurityIncident.incident_date, null_value=datetime.min),
+        'title': TableColumn(SecurityIncident.title, searchable=True, filter='contains'),
+        'severity': TableColumn(SecurityIncident.severity, filter='exact', null_value=''),
+        'impact': TableColumn(SecurityIncident.impact, filter='exact', null_value=''),
+        'status': TableColumn(SecurityIncident.status, filter='exact', null_value=''),
+        'owner': TableColumn(User.name, searchable=True, filter='contains', null_value=''),
+    },
+    'compliance/_incident_rows.html',
+    default_sort='incident_date',
+    default_direction='desc',
+    joins=((User, SecurityIncident.owner_id == User.id),),
+    options=lambda: (contains_eager(SecurityIncident.owner),),
+)
+
 @compliance_bp.route('/vendors')
 @login_required
 def vendor_compliance():
@@ -373,8 +395,12 @@ def edit_bcdr_test(test_id):
 @login_required
 @admin_required
 def list_incidents():
-    incidents = SecurityIncident.query.order_by(SecurityIncident.incident_date.desc()).all()
-    return render_template('compliance/incident_list.html', incidents=incidents)
+    return INCIDENT_TABLE.render('compliance/incident_list.html', request.args)
+
+@compliance_bp.route('/incidents/api/table')
+@login_required
+def incidents_table():
+    return INCIDENT_TABLE.json_response(request.args)
 
 @compliance_bp.route('/incidents/new', methods=['GET', 'POST'])
 @login_required
@@ -411,7 +437,9 @@ def new_incident():
 @login_required
 @admin_required
 def incident_detail(id):
-    incident = SecurityIncident.query.get_or_404(id)
+    incident = SecurityIncident.query.options(
+        joinedload(SecurityIncident.owner), joinedload(SecurityIncident.reported_by)
+    ).filter_by(id=id).first_or_404()
     return render_template('compliance/incident_detail.html', incident=incident)
 
 @compliance_bp.route('/incidents/<int:id>/edit', methods=['GET', 'POST'])
@@ -612,30 +640,78 @@ def delete_compliance_link(link_id):
 def dashboard():
     """Displays the compliance dashboard."""
     frameworks = Framework.query.filter_by(is_active=True).order_by(Framework.name).all()
-    return render_template('compliance/dashboard.html', frameworks=frameworks)
+    return render_template('compliance/dashboard.html', frameworks=frameworks, **_dashboard_data(frameworks))
+
+
+def _dashboard_data(frameworks):
+    """
+    Preloads the controls of the given frameworks, their links and the linked
+    objects in a constant number of queries (instead of several per control).
+    Link counts are the lengths of the preloaded lists.
+    """
+    controls = FrameworkControl.query.filter(
+        FrameworkControl.framework_id.in_([framework.id for framework in frameworks])
+    ).order_by(FrameworkControl.id).all()
+    links = ComplianceLink.query.filter(
+        ComplianceLink.framework_control_id.in_([control.id for control in controls])
+    ).order_by(ComplianceLink.id).all()
+    resolve_linked_objects(links)
+
+    controls_by_framework = {framework.id: [] for framework in frameworks}
+    for control in controls:
+        controls_by_framework[control.framework_id].append(control)
+    links_by_control = {control.id: [] for control in controls}
+    for link in links:
+        links_by_control[link.framework_control_id].append(link)
+    return {'controls_by_framework': controls_by_framework, 'links_by_control': links_by_control}
+
+def _dashboard_cache_key(frameworks, controls_by_framework, links_by_control):
+    """
+    What the dashboard PDF shows, as JSON: the PDF cache is keyed on it, so
+    the PDF is only rendered again when the dashboard (or its template) changes.
+    """
+    jinja_env = current_app.jinja_env
+    template_source = jinja_env.loader.get_source(jinja_env, 'compliance/dashboard_pdf.html')[0]
+    content = []
+    for framework in frameworks:
+        controls = []
+        for control in controls_by_framework[framework.id]:
+            links = []
+            for link in links_by_control[control.id]:
+                obj = link.linked_object
+                label = obj and (getattr(obj, 'name', None) or getattr(obj, 'title', None) or getattr(obj, 'description', None))
+                links.append([link.id, link.linkable_type, link.linkable_id, link.description, obj is not None, label])
+            controls.append([control.id, control.control_id, control.name, control.description, links])
+        content.append([framework.id, framework.name, framework.description, controls])
+    return json.dumps([template_source, content], default=str)
 
 @compliance_bp.route('/dashboard/pdf')
 @login_required
 def export_dashboard_pdf():
-    """Exports the compliance dashboard to PDF."""
-    from weasyprint import HTML
-    from io import BytesIO
-    from flask import make_response
-
+    """
+    Exports the compliance dashboard to PDF. The PDF is rendered in the
+    background and cached on the dashboard's content, so an unchanged
+    dashboard is served straight from the cache. Cached PDFs are shared
+    between users: they are stamped with the time they were generated, not
+    with who asked for them.
+    """
     frameworks = Framework.query.filter_by(is_active=True).order_by(Framework.name).all()
-    user = User.query.get(session.get('user_id'))
-    
+    user = current_user()
+    dashboard_data = _dashboard_data(frameworks)
+
     html_content = render_template(
-        'compliance/dashboard_pdf.html', 
+        'compliance/dashboard_pdf.html',
         frameworks=frameworks,
-        generated_at=datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
-        generated_by=user.name if user else 'System'
+        **dashboard_data,
+        generated_at=datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
     )
-    
-    pdf_file = HTML(string=html_content).write_pdf()
-    
-    response = make_response(pdf_file)
-    response.headers['Content-Type'] = 'application/pdf'
-    response.headers['Content-Disposition'] = 'attachment; filename=compliance_report.pdf'
-    
-    return response
\ No newline at end of file
+    cache_key = _dashboard_cache_key(frameworks, **dashboard_data)
+
+    job = pdf_jobs.submit(
+        html_content, 'compliance-dashboard', 'compliance_report.pdf', cache_key=cache_key,
+        return_url=url_for('compliance.dashboard'), requested_by_id=user.id if user else None,
+    )
+    job = pdf_jobs.wait(job, current_app.config['PDF_JOB_WAIT_SECONDS'])
+    if job.status != 'queued':
+        return job_result(job)
+    return redirect(url_for('pdf_jobs.job_status_page', job_id=job.id))
\ No newline at end of file
@@ -4,7 +4,8 @@ from flask import (
     Blueprint, render_template, request, redirect, url_for, flash, current_app
 )
 from werkzeug.utils import secure_filename
-from ..models import db, Documentation, Tag, User, Group, Software, Attachment
+from sqlalchemy.orm import selectinload
+from ..models import db, Documentation, Tag, User, Group, Software, Attachment, resolve_owners
 from .main import login_required
 from .admin import admin_required
 
@@ -32,7 +33,10 @@ def list_docs():
         query = query.join(Documentation.tags).filter(Tag.name.in_(search_tags))
 
     # Ejecutar la query
-    documentation = query.order_by(Documentation.name).all()
+    documentation = query.options(
+        selectinload(Documentation.software), selectinload(Documentation.tags)
+    ).order_by(Documentation.name).all()
+    resolve_owners(documentation)
     
     # Obtener todos los tags para el dropdown del filtro
     all_tags = Tag.query.order_by(Tag.name).all()
@@ -50,6 +54,7 @@ def list_docs():
 def detail(id):
     """Muestra los detalles de una entrada de documentación."""
     doc = Documentation.query.get_or_404(id)
+    resolve_owners([doc])
     return render_template('documentation/detail.html', doc=doc)
 
 @documentation_bp.route('/new', methods=['GET', 'POST'])
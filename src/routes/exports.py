@@ -0,0 +1,20 @@
+from flask import Blueprint, Response, request, stream_with_context, abort
+from ..exports import EXPORTS, FORMATS, STREAMS
+from .main import login_required
+
+exports_bp = Blueprint('exports', __name__)
+
+@exports_bp.route('/<name>.<format>')
+@login_required
+def export(name, format):
+    """Streams a table as CSV or NDJSON; rows are written as they are read."""
+    table = EXPORTS.get(name)
+    if table is None or format not in FORMATS:
+        abort(404)
+    filename = f"{name}-archived.{format}" if request.args.get('archived') == '1' else f"{name}.{format}"
+    rows = STREAMS[format](table, request.args)
+    return Response(
+        stream_with_context(rows),
+        mimetype=FORMATS[format],
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
@@ -1,6 +1,7 @@
 from flask import (
     Blueprint, render_template, request, redirect, url_for, flash
 )
+from sqlalchemy.orm import selectinload
 from ..models import db, Group, User
 from .main import login_required
 from .admin import admin_required
@@ -10,7 +11,7 @@ groups_bp = Blueprint('groups', __name__)
 @groups_bp.route('/')
 @login_required
 def list_groups():
-    groups = Group.query.order_by(Group.name).all()
+    groups = Group.query.options(selectinload(Group.users)).order_by(Group.name).all()
     return render_template('groups/list.html', groups=groups)
 
 @groups_bp.route('/new', methods=['GET', 'POST'])
@@ -1,5 +1,6 @@
 from datetime import datetime
 from flask import Blueprint, render_template, request, flash, redirect, url_for
+from sqlalchemy.orm import selectinload
 from ..models import db, License, User, Purchase, Subscription, Software, Budget # Import Software and Budget
 from .main import login_required
 
@@ -9,7 +10,9 @@ licenses_bp = Blueprint('licenses', __name__, url_prefix='/licenses')
 @login_required
 def list_licenses():
     page = request.args.get('page', 1, type=int)
-    licenses = License.query.filter_by(is_archived=False).order_by(License.name.asc()).paginate(page=page, per_page=15)
+    licenses = License.query.filter_by(is_archived=False).options(
+        selectinload(License.user), selectinload(License.subscription)
+    ).order_by(License.name.asc()).paginate(page=page, per_page=15)
     return render_template('licenses/list.html', licenses=licenses)
 
 @licenses_bp.route('/<int:id>')
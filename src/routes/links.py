@@ -4,7 +4,8 @@ from flask import (
     Blueprint, render_template, request, redirect, url_for, flash, current_app
 )
 from werkzeug.utils import secure_filename
-from ..models import db, Link, Tag, User, Group, Software
+from sqlalchemy.orm import selectinload
+from ..models import db, Link, Tag, User, Group, Software, resolve_owners
 from .main import login_required
 from .admin import admin_required
 
@@ -32,7 +33,8 @@ def list_links():
         query = query.join(Link.tags).filter(Tag.name.in_(search_tags))
 
     # Ejecutar la query
-    links = query.order_by(Link.name).all()
+    links = query.options(selectinload(Link.software), selectinload(Link.tags)).order_by(Link.name).all()
+    resolve_owners(links)
     
     # Obtener todos los tags para el dropdown del filtro
     all_tags = Tag.query.order_by(Tag.name).all()
@@ -50,6 +52,7 @@ def list_links():
 def detail(id):
     """Muestra los detalles de un enlace."""
     link = Link.query.get_or_404(id)
+    resolve_owners([link])
     return render_template('links/detail.html', link=link)
 
 @links_bp.route('/new', methods=['GET', 'POST'])
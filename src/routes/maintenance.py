@@ -3,17 +3,40 @@ import uuid
 from werkzeug.utils import secure_filename
 from flask import current_app, Blueprint, render_template, request, redirect, url_for, flash
 from datetime import datetime
+from sqlalchemy.orm import contains_eager, joinedload
 from ..models import db, MaintenanceLog, Asset, Peripheral, User, Attachment # Added Attachment
+from ..server_table import ServerTable, TableColumn
 from .main import login_required
 from .admin import admin_required
 
 maintenance_bp = Blueprint('maintenance', __name__, url_prefix='/maintenance')
 
+MAINTENANCE_TABLE = ServerTable(
+    MaintenanceLog,
+    {
+        'event_date': TableColumn(MaintenanceLog.event_date),
+        'event_type': TableColumn(MaintenanceLog.event_type, filter='exact'),
+        'description': TableColumn(MaintenanceLog.description, searchable=True, filter='contains'),
+        'status': TableColumn(MaintenanceLog.status, filter='exact'),
+        'assigned_to': TableColumn(User.name, searchable=True, filter='contains', null_value=''),
+    },
+    'maintenance/_rows.html',
+    default_sort='event_date',
+    default_direction='desc',
+    joins=((User, MaintenanceLog.assigned_to_id == User.id),),
+    options=lambda: (contains_eager(MaintenanceLog.assigned_to), joinedload(MaintenanceLog.asset),
+                     joinedload(MaintenanceLog.peripheral)),
+)
+
 @maintenance_bp.route('/')
 @login_required
 def list_logs():
-    logs = MaintenanceLog.query.order_by(MaintenanceLog.event_date.desc()).all()
-    return render_template('maintenance/list.html', logs=logs)
+    return MAINTENANCE_TABLE.render('maintenance/list.html', request.args)
+
+@maintenance_bp.route('/api/table')
+@login_required
+def logs_table():
+    return MAINTENANCE_TABLE.json_response(request.args)
 
 @maintenance_bp.route('/<int:id>')
 @login_required
@@ -2,7 +2,8 @@ from flask import (
     Blueprint, render_template, request, redirect, url_for, flash
 )
 from datetime import datetime
-from ..models import db, PaymentMethod
+from sqlalchemy.orm import selectinload
+from ..models import db, PaymentMethod, Purchase
 from .main import login_required
 
 payment_methods_bp = Blueprint('payment_methods', __name__)
@@ -10,7 +11,9 @@ payment_methods_bp = Blueprint('payment_methods', __name__)
 @payment_methods_bp.route('/')
 @login_required
 def payment_methods():
-    methods = PaymentMethod.query.filter_by(is_archived=False).all()
+    methods = PaymentMethod.query.filter_by(is_archived=False).options(
+        selectinload(PaymentMethod.subscriptions), selectinload(PaymentMethod.purchases)
+    ).all()
     return render_template('payment_methods/list.html', payment_methods=methods)
 
 @payment_methods_bp.route('/archived')
@@ -41,7 +44,9 @@ def unarchive_payment_method(id):
 @payment_methods_bp.route('/<int:id>')
 @login_required
 def payment_method_detail(id):
-    method = PaymentMethod.query.get_or_404(id)
+    method = PaymentMethod.query.options(
+        selectinload(PaymentMethod.purchases).undefer(Purchase.calculated_cost)
+    ).get_or_404(id)
     return render_template('payment_methods/detail.html', method=method)
 
 @payment_methods_bp.route('/new', methods=['GET', 'POST'])
@@ -0,0 +1,127 @@
+import os
+from flask import (
+    Blueprint, render_template, redirect, url_for, flash, jsonify, send_file, abort, current_app
+)
+from ..models import PdfJob
+from .. import pdf_jobs
+from .main import login_required, current_user
+
+pdf_jobs_bp = Blueprint('pdf_jobs', __name__)
+
+# Flashed when a job that saves its PDF as an attachment finishes: kind -> message
+DONE_MESSAGES = {
+    'inventory': 'Snapshot de inventario generado y guardado.',
+}
+
+
+def _visible_jobs(query):
+    """Jobs are only visible to whoever requested them, and to admins."""
+    user = current_user()
+    if user.role != 'admin':
+        query = query.filter(PdfJob.requested_by_id == user.id)
+    return query
+
+
+def _fail_stale_jobs(*criteria):
+    pdf_jobs.fail_stale_jobs(current_app.config['PDF_JOB_TIMEOUT_SECONDS'], *criteria)
+
+
+def _get_job_or_404(job_id):
+    _fail_stale_jobs(PdfJob.id == job_id)
+    job = _visible_jobs(PdfJob.query.filter(PdfJob.id == job_id)).first()
+    if job is None:
+        abort(404)
+    return job
+
+
+def send_job_pdf(job):
+    """Serves the PDF of a finished job from the cache."""
+    path = pdf_jobs.cache_path(current_app, job.content_hash)
+    if not os.path.exists(path):
+        abort(410)  # Pruned from the cache since; the PDF has to be generated again
+    return send_file(path, mimetype='application/pdf', as_attachment=True, download_name=job.filename)
+
+
+def job_result(job):
+    """The response for a finished job: its download, or back to where it was requested from."""
+    if job.status == 'failed':
+        flash('Error al generar el PDF. Revisa los logs.', 'danger')
+        return redirect(job.return_url or url_for('main.dashboard'))
+    if job.attachment_id:
+        flash(DONE_MESSAGES.get(job.kind, f'{job.filename} generado y guardado.'), 'success')
+        return redirect(job.return_url or url_for('main.dashboard'))
+    return send_job_pdf(job)
+
+
+@pdf_jobs_bp.route('/<job_id>')
+@login_required
+def job_status_page(job_id):
+    """Progress page of a job; it polls the status and reloads once the job has finished."""
+    job = _get_job_or_404(job_id)
+    if job.status != 'queued':
+        return job_result(job)
+    return render_template('pdf_jobs/status.html', title=job.filename,
+                           status_url=url_for('pdf_jobs.job_status', job_id=job.id))
+
+
+@pdf_jobs_bp.route('/<job_id>/status')
+@login_required
+def job_status(job_id):
+    job = _get_job_or_404(job_id)
+    return jsonify({
+        'id': job.id,
+        'status': job.status,
+        'finished': job.status != 'queued',
+        'error': job.error is not None,
+        'total': 1,
+        'done': int(job.status == 'done'),
+        # Downloads are fetched by the page; everything else is handled by reloading it
+        'download_url': url_for('pdf_jobs.download', job_id=job.id)
+                        if job.status == 'done' and not job.attachment_id else None,
+    })
+
+
+@pdf_jobs_bp.route('/<job_id>/download')
+@login_required
+def download(job_id):
+    job = _get_job_or_404(job_id)
+    if job.status != 'done':
+        abort(404)
+    return send_job_pdf(job)
+
+
+@pdf_jobs_bp.route('/batch/<batch_id>')
+@login_required
+def batch_status_page(batch_id):
+    """Progress page of a bulk generation; once every job has finished it reports the outcome."""
+    first_job = _visible_jobs(PdfJob.query.filter(PdfJob.batch_id == batch_id)).first()
+    if first_job is None:
+        abort(404)
+    _fail_stale_jobs(PdfJob.batch_id == batch_id)
+    total, done, failed = pdf_jobs.batch_progress(batch_id)
+    if done + failed < total:
+        return render_template('pdf_jobs/status.html', title=f'{total} PDFs',
+                               status_url=url_for('pdf_jobs.batch_status', batch_id=batch_id))
+    if failed:
+        flash(f'{done} of {total} PDFs generated; {failed} failed. Revisa los logs.', 'warning')
+    else:
+        flash(f'{done} PDFs generated and saved.', 'success')
+    return redirect(first_job.return_url or url_for('main.dashboard'))
+
+
+@pdf_jobs_bp.route('/batch/<batch_id>/status')
+@login_required
+def batch_status(batch_id):
+    if _visible_jobs(PdfJob.query.filter(PdfJob.batch_id == batch_id)).first() is None:
+        abort(404)
+    _fail_stale_jobs(PdfJob.batch_id == batch_id)
+    total, done, failed = pdf_jobs.batch_progress(batch_id)
+    return jsonify({
+        'id': batch_id,
+        'status': 'done' if done + failed == total else 'queued',
+        'finished': done + failed == total,
+        'error': failed > 0,
+        'total': total,
+        'done': done + failed,
+        'download_url': None,
+    })
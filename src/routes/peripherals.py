@@ -2,16 +2,39 @@ from flask import (
     Blueprint, render_template, request, redirect, url_for, flash
 )
 from datetime import datetime
+from sqlalchemy.orm import contains_eager
 from ..models import db, Peripheral, Asset, Purchase, Supplier, User, PeripheralAssignment
+from ..server_table import ServerTable, TableColumn
 from .main import login_required
 
 peripherals_bp = Blueprint('peripherals', __name__)
 
+PERIPHERAL_TABLE = ServerTable(
+    Peripheral,
+    {
+        'name': TableColumn(Peripheral.name, searchable=True, filter='contains'),
+        'type': TableColumn(Peripheral.type, filter='exact', null_value=''),
+        'brand': TableColumn(Peripheral.brand, searchable=True, filter='contains', null_value=''),
+        'status': TableColumn(Peripheral.status, filter='exact', null_value=''),
+        'user': TableColumn(User.name, searchable=True, filter='contains', null_value=''),
+        'asset': TableColumn(Asset.name, searchable=True, filter='contains', null_value=''),
+    },
+    'peripherals/_rows.html',
+    default_sort='name',
+    base_filters=(Peripheral.is_archived == False,),
+    joins=((User, Peripheral.user_id == User.id), (Asset, Peripheral.asset_id == Asset.id)),
+    options=lambda: (contains_eager(Peripheral.user), contains_eager(Peripheral.asset)),
+)
+
 @peripherals_bp.route('/')
 @login_required
 def peripherals():
-    peripherals = Peripheral.query.filter_by(is_archived=False).all()
-    return render_template('peripherals/list.html', peripherals=peripherals)
+    return PERIPHERAL_TABLE.render('peripherals/list.html', request.args)
+
+@peripherals_bp.route('/api/table')
+@login_required
+def peripherals_table():
+    return PERIPHERAL_TABLE.json_response(request.args)
 
 @peripherals_bp.route('/<int:id>')
 @login_required
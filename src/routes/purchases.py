@@ -2,16 +2,37 @@ from flask import (
     Blueprint, render_template, request, redirect, url_for, flash, session
 )
 from datetime import datetime
+from sqlalchemy.orm import contains_eager, undefer
 from ..models import db, Purchase, Supplier, User, PaymentMethod, Tag, Budget, PurchaseCostHistory
+from ..server_table import ServerTable, TableColumn
 from .main import login_required
 
 purchases_bp = Blueprint('purchases', __name__, url_prefix='/purchases')
 
+PURCHASE_TABLE = ServerTable(
+    Purchase,
+    {
+        'description': TableColumn(Purchase.description, searchable=True, filter='contains'),
+        'purchase_date': TableColumn(Purchase.purchase_date),
+        'total_cost': TableColumn(Purchase.total_cost, filter='min'),
+        'supplier': TableColumn(Supplier.name, searchable=True, filter='exact', null_value=''),
+    },
+    'purchases/_rows.html',
+    default_sort='purchase_date',
+    default_direction='desc',
+    joins=((Supplier, Purchase.supplier_id == Supplier.id),),
+    options=lambda: (contains_eager(Purchase.supplier), undefer(Purchase.calculated_cost)),
+)
+
 @purchases_bp.route('/')
 @login_required
 def purchases():
-    all_purchases = Purchase.query.order_by(Purchase.purchase_date.desc()).all()
-    return render_template('purchases/list.html', purchases=all_purchases)
+    return PURCHASE_TABLE.render('purchases/list.html', request.args)
+
+@purchases_bp.route('/api/table')
+@login_required
+def purchases_table():
+    return PURCHASE_TABLE.json_response(request.args)
 
 @purchases_bp.route('/<int:id>')
 @login_required
@@ -1,11 +1,16 @@
 from flask import (
     Blueprint, render_template, request
 )
-from sqlalchemy import func
+from sqlalchemy import func, case
 from datetime import date, datetime, timedelta
 from dateutil.relativedelta import relativedelta
-from ..models import db, Subscription, Asset, Supplier, User, Group, Peripheral, Location, CURRENCY_RATES, License, Purchase
+import numpy as np
+from ..models import db, Subscription, Asset, Supplier, User, Group, Peripheral, Location, CURRENCY_RATES
 from .main import login_required
+from ..forecast import SpendForecast
+from ..depreciation import DepreciationBook
+from .. import renewal_index, book_values
+from .. import spend_analysis as spend_analysis_service
 
 reports_bp = Blueprint('reports', __name__)
 
@@ -15,25 +20,19 @@ def subscription_reports():
     today = date.today()
     selected_year = request.args.get('year', default=today.year, type=int)
 
-    all_active_subscriptions = Subscription.query.filter_by(is_archived=False).all()
+    spend = SpendForecast.load()
 
     # Chart 1: Spending by Supplier
-    supplier_spending = {}
     year_start = date(selected_year, 1, 1)
     year_end = date(selected_year, 12, 31)
-
-    for subscription in all_active_subscriptions:
-        renewal = subscription.renewal_date
-        # Ensure initial renewal is correctly handled if before year_start
-        while renewal < year_start:
-            renewal = subscription.get_renewal_date_after(renewal)
-
-        while renewal <= year_end:
-            supplier_name = subscription.supplier.name
-            if supplier_name not in supplier_spending:
-                supplier_spending[supplier_name] = 0
-            supplier_spending[supplier_name] += subscription.cost_eur # Assuming cost_eur property exists
-            renewal = subscription.get_renewal_date_after(renewal)
+    spend_by_supplier_id = spend.supplier_totals(year_start, year_end)
+    supplier_names = dict(
+        db.session.query(Supplier.id, Supplier.name).filter(Supplier.id.in_(spend_by_supplier_id)).all()
+    )
+    supplier_spending = {}
+    for supplier_id, total in spend_by_supplier_id.items():
+        supplier_name = supplier_names.get(supplier_id, 'N/A')
+        supplier_spending[supplier_name] = supplier_spending.get(supplier_name, 0) + total
 
     sorted_supplier_spending = sorted(supplier_spending.items(), key=lambda item: item[1], reverse=True)
     supplier_labels = [item[0] for item in sorted_supplier_spending]
@@ -47,65 +46,26 @@ def subscription_reports():
     type_labels = [item[0].title() for item in subscriptions_by_type]
     type_data = [item[1] for item in subscriptions_by_type]
 
-    # Chart 3 & 4: Historical Spending
+    # Chart 3 & 4: Historical Spending (last 13 months and last 5 years, up to today)
     monthly_start_date = (today.replace(day=1) - relativedelta(months=12))
-    monthly_labels, monthly_costs = [], {}
-    for i in range(13): # 13 months to cover the full range
-        month_date = monthly_start_date + relativedelta(months=+i)
-        year_month_key = month_date.strftime('%Y-%m')
-        monthly_labels.append(month_date.strftime('%b %Y'))
-        monthly_costs[year_month_key] = 0
+    monthly_months, monthly_costs = spend.monthly_totals(monthly_start_date, today)
+    monthly_labels = [month_date.strftime('%b %Y') for month_date in monthly_months]
+    monthly_data = [round(cost, 2) for cost in monthly_costs]
 
     yearly_start_date = today.replace(year=today.year - 4, month=1, day=1)
-    yearly_labels, yearly_costs = [], {}
-    for i in range(5): # Last 5 years including current
-        year_date = yearly_start_date + relativedelta(years=i)
-        yearly_labels.append(year_date.strftime('%Y'))
-        yearly_costs[year_date.strftime('%Y')] = 0
-
-    for subscription in all_active_subscriptions:
-        renewal = subscription.renewal_date
-        # Ensure initial renewal is correctly handled if before start dates
-        while renewal < yearly_start_date:
-             renewal = subscription.get_renewal_date_after(renewal)
-
-        while renewal <= today:
-            year_key = renewal.strftime('%Y')
-            if year_key in yearly_costs:
-                yearly_costs[year_key] += subscription.cost_eur
-
-            month_key = renewal.strftime('%Y-%m')
-            if month_key in monthly_costs:
-                monthly_costs[month_key] += subscription.cost_eur
-
-            renewal = subscription.get_renewal_date_after(renewal)
+    yearly_years, yearly_costs = spend.yearly_totals(yearly_start_date, today)
+    yearly_labels = [str(year) for year in yearly_years]
+    yearly_data = [round(cost, 2) for cost in yearly_costs]
 
-    monthly_data = [round(cost, 2) for cost in monthly_costs.values()]
-    yearly_data = [round(cost, 2) for cost in yearly_costs.values()]
-
-    # Forecast Chart (Logic reused from dashboard)
+    # Forecast Chart (same window as the dashboard)
     forecast_start_date = today.replace(day=1)
     end_of_forecast_period = forecast_start_date + relativedelta(months=+13)
-    forecast_labels, forecast_keys, forecast_costs = [], [], {}
-    for i in range(13):
-        month_date = forecast_start_date + relativedelta(months=+i)
-        year_month_key = month_date.strftime('%Y-%m')
-        forecast_labels.append(month_date.strftime('%b %Y'))
-        forecast_keys.append(year_month_key)
-        forecast_costs[year_month_key] = 0
-
-    for subscription in all_active_subscriptions:
-        renewal = subscription.renewal_date # Start from original renewal
-        while renewal < forecast_start_date: # Find first renewal within or after forecast start
-            renewal = subscription.get_renewal_date_after(renewal)
-
-        while renewal < end_of_forecast_period: # Check renewals within the forecast period
-            year_month_key = renewal.strftime('%Y-%m')
-            if year_month_key in forecast_costs:
-                forecast_costs[year_month_key] += subscription.cost_eur
-            renewal = subscription.get_renewal_date_after(renewal)
-
-    forecast_data = [round(cost, 2) for cost in forecast_costs.values()]
+    forecast_months, forecast_costs = renewal_index.monthly_totals(
+        forecast_start_date, end_of_forecast_period - timedelta(days=1)
+    )
+    forecast_labels = [month_date.strftime('%b %Y') for month_date in forecast_months]
+    forecast_keys = [month_date.strftime('%Y-%m') for month_date in forecast_months]
+    forecast_data = [round(cost, 2) for cost in forecast_costs]
 
 
     return render_template(
@@ -133,25 +93,17 @@ def asset_reports():
     status_labels = [item[0] for item in assets_by_status]
     status_data = [item[1] for item in assets_by_status]
 
-    # --- Warranty Logic (Considering both Assets and Peripherals potentially) ---
+    # --- Warranty Logic (counted in SQL on the stored warranty_end_date) ---
     today = date.today()
-    # Query only non-archived items with purchase_date and warranty_length
-    all_assets_with_warranty = Asset.query.filter(
+    warranty_total, warranty_active = db.session.query(
+        func.count(Asset.id),
+        func.count(case((Asset.warranty_end_date > today, Asset.id)))
+    ).filter(
         Asset.is_archived == False,
         Asset.purchase_date.isnot(None),
         Asset.warranty_length.isnot(None)
-    ).all()
-    # Add peripherals if you track warranty for them similarly
-    # all_peripherals_with_warranty = Peripheral.query.filter(...)
-    # all_items_with_warranty = all_assets_with_warranty + all_peripherals_with_warranty
-    all_items_with_warranty = all_assets_with_warranty # Use only assets for now
-
-    warranty_active = 0
-    for item in all_items_with_warranty:
-        if item.warranty_end_date and item.warranty_end_date > today:
-            warranty_active += 1
-
-    warranty_expired = len(all_items_with_warranty) - warranty_active
+    ).one()
+    warranty_expired = warranty_total - warranty_active
     warranty_labels = ['Active', 'Expired']
     warranty_data = [warranty_active, warranty_expired]
 
@@ -181,98 +133,34 @@ def spend_analysis():
     peripheral_brands = db.session.query(Peripheral.brand).filter(Peripheral.brand.isnot(None), Peripheral.is_archived == False).distinct()
     all_brands = sorted([b[0] for b in asset_brands.union(peripheral_brands) if b[0]]) # Filter out None/empty brands
 
-    # --- Get filter criteria from URL arguments ---
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
-    item_type = request.args.get('item_type', 'all') # Changed default to 'all'
-    supplier_id = request.args.get('supplier_id', type=int)
-    brand = request.args.get('brand') # Still applies to Asset/Peripheral
-    user_id = request.args.get('user_id', type=int)
-    group_id = request.args.get('group_id', type=int)
-    location_id = request.args.get('location_id', type=int) # Only applies to Assets
-
-    # --- Build the queries ---
-    assets_query = Asset.query.filter(Asset.is_archived == False)
-    peripherals_query = Peripheral.query.filter(Peripheral.is_archived == False)
-    licenses_query = License.query.filter(
-        License.is_archived == False,      # Also filter archived licenses
-        License.subscription_id.is_(None), # Only perpetual/standalone
-        License.cost.isnot(None)          # Only those with a cost
-    )
-
-    # Apply date filters
-    if start_date:
-        start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
-        assets_query = assets_query.filter(Asset.purchase_date >= start_date_obj)
-        peripherals_query = peripherals_query.filter(Peripheral.purchase_date >= start_date_obj)
-        licenses_query = licenses_query.filter(License.purchase_date >= start_date_obj)
-    if end_date:
-        end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
-        assets_query = assets_query.filter(Asset.purchase_date <= end_date_obj)
-        peripherals_query = peripherals_query.filter(Peripheral.purchase_date <= end_date_obj)
-        licenses_query = licenses_query.filter(License.purchase_date <= end_date_obj)
-
-    # Apply supplier filter (Join License via Purchase)
-    if supplier_id:
-        assets_query = assets_query.filter(Asset.supplier_id == supplier_id)
-        peripherals_query = peripherals_query.filter(Peripheral.supplier_id == supplier_id)
-        licenses_query = licenses_query.join(Purchase, Purchase.id == License.purchase_id).filter(Purchase.supplier_id == supplier_id)
-        # If supplier_id added to License model:
-        # licenses_query = licenses_query.filter(License.supplier_id == supplier_id)
-
-    # Apply brand filter (only to Asset/Peripheral)
-    if brand:
-        assets_query = assets_query.filter(Asset.brand == brand)
-        peripherals_query = peripherals_query.filter(Peripheral.brand == brand)
-
-    # Apply location filter (only to Asset)
-    if location_id:
-        assets_query = assets_query.filter(Asset.location_id == location_id)
-
-    # Handle user/group filtering
-    user_ids_to_filter = []
-    if user_id:
-        user_ids_to_filter.append(user_id)
-    if group_id:
-        group = Group.query.get(group_id)
-        if group:
-            user_ids_to_filter.extend([user.id for user in group.users if not user.is_archived]) # Filter users by group membership
+    # --- Items and totals come from one UNION ALL projection; rows are paged on the server ---
+    filters = spend_analysis_service.SpendFilters(request.args)
+    items = spend_analysis_service.spend_items(filters)
+    totals_by_currency, total_eur = spend_analysis_service.spend_totals(items)
 
-    if user_ids_to_filter:
-        assets_query = assets_query.filter(Asset.user_id.in_(user_ids_to_filter))
-        peripherals_query = peripherals_query.filter(Peripheral.user_id.in_(user_ids_to_filter))
-        licenses_query = licenses_query.filter(License.user_id.in_(user_ids_to_filter))
-
-    # --- Execute queries and combine results based on item_type ---
-    results = []
-    if item_type in ['assets', 'all']:
-        results.extend(assets_query.all())
-    if item_type in ['peripherals', 'all']:
-        results.extend(peripherals_query.all())
-    if item_type in ['licenses', 'all']:
-        results.extend(licenses_query.all()) # Add licenses
-
-    # --- Recalculate total_cost including licenses (summing original costs) ---
-    total_cost = sum(item.cost for item in results if item.cost is not None)
-
-    # Sort results for display (e.g., by purchase date descending, handle None dates)
-    results.sort(key=lambda x: x.purchase_date if x.purchase_date else date.min, reverse=True)
-
-    return render_template(
+    return spend_analysis_service.spend_table(items).render(
         'reports/spend_analysis.html',
-        results=results,
-        total_cost=total_cost,
+        request.args,
+        filters=filters,
+        totals_by_currency=totals_by_currency,
+        total_eur=total_eur,
         suppliers=suppliers,
         users=users,
         groups=groups,
         all_brands=all_brands,
         locations=locations,
         # Pass filters back to template
-        start_date=start_date, end_date=end_date, item_type=item_type,
-        supplier_id=supplier_id, brand=brand, user_id=user_id, group_id=group_id,
-        location_id=location_id
+        start_date=request.args.get('start_date'), end_date=request.args.get('end_date'),
+        item_type=filters.item_type, supplier_id=filters.supplier_id, brand=filters.brand,
+        user_id=filters.user_id, group_id=filters.group_id, location_id=filters.location_id
     )
 
+@reports_bp.route('/spend-analysis/api/table')
+@login_required
+def spend_analysis_table():
+    items = spend_analysis_service.spend_items(spend_analysis_service.SpendFilters(request.args))
+    return spend_analysis_service.spend_table(items).json_response(request.args)
+
 
 @reports_bp.route('/depreciation', methods=['GET'])
 @login_required
@@ -301,9 +189,14 @@ def depreciation_report():
     currency = request.args.get('currency') # Target currency for display
 
     # --- Build the queries ---
-    # Only include non-archived items with cost and purchase date for depreciation
-    assets_query = Asset.query.filter(Asset.is_archived == False, Asset.cost.isnot(None), Asset.purchase_date.isnot(None))
-    peripherals_query = Peripheral.query.filter(Peripheral.is_archived == False, Peripheral.cost.isnot(None), Peripheral.purchase_date.isnot(None))
+    # Only include non-archived items with cost and purchase date for depreciation.
+    # Plain columns are enough: the values are computed over arrays, not per object.
+    assets_query = db.session.query(
+        Asset.id, Asset.name, Asset.purchase_date, Asset.cost, Asset.currency, Asset.location_id
+    ).filter(Asset.is_archived == False, Asset.cost.isnot(None), Asset.purchase_date.isnot(None))
+    peripherals_query = db.session.query(
+        Peripheral.id, Peripheral.name, Peripheral.purchase_date, Peripheral.cost, Peripheral.currency
+    ).filter(Peripheral.is_archived == False, Peripheral.cost.isnot(None), Peripheral.purchase_date.isnot(None))
 
     # Apply date filters
     if start_date:
@@ -343,89 +236,60 @@ def depreciation_report():
         peripherals_query = peripherals_query.filter(Peripheral.user_id.in_(user_ids_to_filter))
 
     # --- Execute queries and combine results based on item_type ---
-    results_to_depreciate = []
+    rows = [] # (type, id, name, purchase_date, cost, currency, location_id)
     if item_type in ['assets', 'both']:
-        results_to_depreciate.extend(assets_query.all())
+        rows.extend(('Asset',) + tuple(row) for row in assets_query.all())
     if item_type in ['peripherals', 'both']:
-        results_to_depreciate.extend(peripherals_query.all())
+        rows.extend(('Peripheral',) + tuple(row) + (None,) for row in peripherals_query.all())
 
     # --- Depreciation and Chart Calculations ---
-    depreciation_results_display = [] # For the table display
-    today = date.today()
-    total_original_value_eur = 0.0
-    total_depreciated_value_eur = 0.0
-    depreciation_by_location = {} # Store {'Location Name': {'original': X, 'depreciated': Y}} in EUR
-
-    for item in results_to_depreciate:
-        cost = item.cost # Already filtered for cost is not None
-        depreciated_value_original_currency = None
-        rate_to_eur = CURRENCY_RATES.get(item.currency, 1.0) # Rate to convert item's currency to EUR
-        original_value_eur = cost * rate_to_eur
-
-        if item.purchase_date: # Already filtered for purchase_date is not None
-            age_in_days = (today - item.purchase_date).days
-            age_in_years = age_in_days / 365.25 # Approximate years
-
-            if depreciation_period <= 0: # Avoid division by zero
-                depreciated_value_original_currency = cost # No depreciation
-            elif depreciation_algorithm == 'linear':
-                depreciation_per_year = cost / depreciation_period
-                depreciation_amount = depreciation_per_year * age_in_years
-                depreciated_value_original_currency = max(0.0, cost - depreciation_amount)
-            elif depreciation_algorithm == 'declining_balance':
-                # Simplified declining balance - adjust factor if needed
-                factor = 2.0 # Common factor (e.g., double declining)
-                yearly_rate = factor / depreciation_period
-                book_value = cost
-                # Calculate depreciation year by year up to the current age
-                full_years = int(age_in_years)
-                for _ in range(full_years):
-                     depreciation_this_year = book_value * yearly_rate
-                     book_value -= depreciation_this_year
-                # Apply partial year depreciation if needed (more complex, linear approx for remainder here)
-                remaining_fraction = age_in_years - full_years
-                if remaining_fraction > 0:
-                     depreciation_this_year = book_value * yearly_rate
-                     book_value -= (depreciation_this_year * remaining_fraction)
-
-                depreciated_value_original_currency = max(0.0, book_value)
-
-
-            # Calculate depreciated value in EUR for charts
-            depreciated_value_eur = depreciated_value_original_currency * rate_to_eur
-
-            total_original_value_eur += original_value_eur
-            total_depreciated_value_eur += depreciated_value_eur
-
-            # Accumulate values by location (only for Assets)
-            if isinstance(item, Asset) and item.location:
-                location_name = item.location.name
-                if location_name not in depreciation_by_location:
-                    depreciation_by_location[location_name] = {'original': 0.0, 'depreciated': 0.0}
-                depreciation_by_location[location_name]['original'] += original_value_eur
-                depreciation_by_location[location_name]['depreciated'] += depreciated_value_eur
-
-        # --- Currency Conversion Logic for Table Display ---
-        display_currency_code = item.currency
-        display_cost = cost
-        display_depreciated_value = depreciated_value_original_currency
-
-        if currency and currency != item.currency:
-            # Convert to the target display currency via EUR
-            rate_from_eur = CURRENCY_RATES.get(currency, 1.0)
-            if rate_from_eur != 0: # Avoid division by zero if target currency is unknown
-                 display_currency_code = currency
-                 display_cost = original_value_eur / rate_from_eur
-                 if depreciated_value_original_currency is not None:
-                     display_depreciated_value = depreciated_value_eur / rate_from_eur
-
-
-        depreciation_results_display.append({
-            'item': item,
-            'cost': display_cost,
-            'depreciated_value': display_depreciated_value,
-            'display_currency': display_currency_code
-        })
+    book = DepreciationBook(
+        [row[4] for row in rows],
+        [row[3] for row in rows],
+        [row[5] for row in rows],
+        [row[6] or 0 for row in rows] # Only assets have a location
+    )
+    depreciated_values = book.book_values(depreciation_period, depreciation_algorithm)
+    original_values_eur = book.costs_eur
+    depreciated_values_eur = depreciated_values * book.rates_to_eur
+    total_original_value_eur = float(original_values_eur.sum())
+    total_depreciated_value_eur = float(depreciated_values_eur.sum())
+
+    location_totals = book.by_location(depreciated_values_eur)
+    location_names = dict(
+        db.session.query(Location.id, Location.name).filter(Location.id.in_(location_totals)).all()
+    )
+    depreciation_by_location = {} # {'Location Name': {'original': X, 'depreciated': Y}} in EUR
+    for lid, (original, depreciated) in sorted(location_totals.items(), key=lambda item: location_names.get(item[0], '')):
+        depreciation_by_location[location_names.get(lid, 'N/A')] = {'original': original, 'depreciated': depreciated}
+
+    # --- Currency Conversion Logic for Table Display ---
+    display_costs = book.costs
+    display_depreciated_values = depreciated_values
+    display_currencies = book.currencies
+    if currency:
+        # Convert to the target display currency via EUR
+        rate_from_eur = CURRENCY_RATES.get(currency, 1.0)
+        if rate_from_eur != 0: # Avoid division by zero if target currency is unknown
+            convert = display_currencies != currency
+            display_costs = np.where(convert, original_values_eur / rate_from_eur, display_costs)
+            display_depreciated_values = np.where(convert, depreciated_values_eur / rate_from_eur, display_depreciated_values)
+            display_currencies = np.where(convert, currency, display_currencies)
+
+    # Most recent purchases first
+    order = np.argsort(-book.purchase_dates.astype(np.int64), kind='stable')
+    depreciation_results_display = [
+        {
+            'type': rows[i][0],
+            'id': rows[i][1],
+            'name': rows[i][2],
+            'purchase_date': rows[i][3],
+            'cost': float(display_costs[i]),
+            'depreciated_value': float(display_depreciated_values[i]),
+            'display_currency': display_currencies[i]
+        }
+        for i in order.tolist()
+    ]
 
     # Prepare data for charts (always in EUR)
     value_chart_labels = ['Depreciated Value', 'Value Lost to Depreciation']
@@ -435,9 +299,9 @@ def depreciation_report():
     location_chart_data_original = [round(data['original'], 2) for data in depreciation_by_location.values()]
     location_chart_data_depreciated = [round(data['depreciated'], 2) for data in depreciation_by_location.values()]
 
-    # Sort results for display
-    depreciation_results_display.sort(key=lambda x: x['item'].purchase_date if x['item'].purchase_date else date.min, reverse=True)
-
+    # Trend chart, served from the nightly snapshots (whole portfolio or the selected location)
+    trend_months, trend_original, trend_values = book_values.portfolio_trend(depreciation_algorithm, location_id)
+    trend_labels = [month.strftime('%b %Y') for month in trend_months]
 
     return render_template(
         'reports/depreciation.html',
@@ -459,5 +323,9 @@ def depreciation_report():
         value_chart_data=value_chart_data,
         location_chart_labels=location_chart_labels,
         location_chart_data_original=location_chart_data_original,
-        location_chart_data_depreciated=location_chart_data_depreciated
+        location_chart_data_depreciated=location_chart_data_depreciated,
+        trend_labels=trend_labels,
+        trend_original=trend_original,
+        trend_values=trend_values,
+        snapshot_period=book_values.SNAPSHOT_PERIOD_YEARS
     )
\ No newline at end of file
@@ -1,17 +1,39 @@
 from flask import (
     Blueprint, render_template, request, redirect, url_for, flash
 )
+from datetime import datetime
 from ..models import db, Risk
+from ..server_table import ServerTable, TableColumn
 from .main import login_required
 from .admin import admin_required
 
 risk_bp = Blueprint('risk', __name__)
 
+RISK_TABLE = ServerTable(
+    Risk,
+    {
+        'risk_description': TableColumn(Risk.risk_description, searchable=True, filter='contains'),
+        'status': TableColumn(Risk.status, filter='exact', null_value=''),
+        'likelihood': TableColumn(Risk.likelihood, filter='exact', null_value=''),
+        'impact': TableColumn(Risk.impact, filter='exact', null_value=''),
+        'risk_owner': TableColumn(Risk.risk_owner, searchable=True, filter='contains', null_value=''),
+        'iso_27001_control': TableColumn(Risk.iso_27001_control, searchable=True, filter='contains', null_value=''),
+        'created_at': TableColumn(Risk.created_at, null_value=datetime.min),
+    },
+    'risk/_rows.html',
+    default_sort='created_at',
+    default_direction='desc',
+)
+
 @risk_bp.route('/')
 @login_required
 def list_risks():
-    risks = Risk.query.order_by(Risk.created_at.desc()).all()
-    return render_template('risk/list.html', risks=risks)
+    return RISK_TABLE.render('risk/list.html', request.args)
+
+@risk_bp.route('/api/table')
+@login_required
+def risks_table():
+    return RISK_TABLE.json_response(request.args)
 
 @risk_bp.route('/<int:id>')
 @login_required
@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template, request, flash, redirect, url_for
-from ..models import db, Software, Supplier, User, Group, License
+from sqlalchemy.orm import selectinload
+from ..models import db, Software, Supplier, User, Group, License, Subscription, resolve_owners
 from .main import login_required
 
 software_bp = Blueprint('software', __name__, url_prefix='/software')
@@ -8,8 +9,18 @@ software_bp = Blueprint('software', __name__, url_prefix='/software')
 @login_required
 def list_software():
     page = request.args.get('page', 1, type=int)
-    all_software = Software.query.filter_by(is_archived=False).order_by(Software.name.asc()).paginate(page=page, per_page=15)
-    return render_template('software/list.html', all_software=all_software)
+    all_software = Software.query.filter_by(is_archived=False).options(
+        selectinload(Software.supplier)
+    ).order_by(Software.name.asc()).paginate(page=page, per_page=15)
+    resolve_owners(all_software.items)
+    # License and subscription counts of the page in two grouped queries
+    ids = [software.id for software in all_software.items]
+    license_counts = dict(db.session.query(License.software_id, db.func.count()).filter(
+        License.software_id.in_(ids)).group_by(License.software_id))
+    subscription_counts = dict(db.session.query(Subscription.software_id, db.func.count()).filter(
+        Subscription.software_id.in_(ids)).group_by(Subscription.software_id))
+    return render_template('software/list.html', all_software=all_software,
+                           license_counts=license_counts, subscription_counts=subscription_counts)
 
 @software_bp.route('/<int:id>')
 @login_required
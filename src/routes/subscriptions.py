@@ -1,10 +1,12 @@
 from flask import (
     Blueprint, render_template, request, redirect, url_for, flash, jsonify
 )
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from dateutil.relativedelta import relativedelta
+from sqlalchemy.orm import contains_eager, selectinload
 from ..models import db, Subscription, Supplier, Contact, PaymentMethod, Tag, CostHistory, CURRENCY_RATES, Software
 from .main import login_required
+from .. import renewal_index
 
 subscriptions_bp = Blueprint('subscriptions', __name__)
 
@@ -15,7 +17,9 @@ def subscriptions():
     tag_filter = request.args.get('tag_id', type=int)
     month_filter = request.args.get('month')
 
-    query = Subscription.query.join(Supplier).filter(Subscription.is_archived == False)
+    query = Subscription.query.join(Supplier).filter(Subscription.is_archived == False).options(
+        contains_eager(Subscription.supplier), selectinload(Subscription.tags)
+    )
 
     if subscription_type_filter and subscription_type_filter != 'all':
         query = query.filter(Subscription.subscription_type == subscription_type_filter)
@@ -31,14 +35,12 @@ def subscriptions():
             filter_month_start = datetime.strptime(month_filter, '%Y-%m').date()
             filter_month_end = filter_month_start + relativedelta(months=+1, days=-1)
 
-            filtered_subscriptions = []
-            for subscription in all_subscriptions:
-                next_renewal = subscription.next_renewal_date
-                while next_renewal <= filter_month_end:
-                    if next_renewal >= filter_month_start:
-                        filtered_subscriptions.append(subscription)
-                        break
-                    next_renewal = subscription.get_renewal_date_after(next_renewal)
+            # Past renewals don't count, so the window never starts before today
+            window_start = max(filter_month_start, date.today())
+            filtered_subscriptions = [
+                subscription for subscription in all_subscriptions
+                if next(subscription.renewals_between(window_start, filter_month_end), None)
+            ]
 
             all_subscriptions = filtered_subscriptions
         except ValueError:
@@ -245,25 +247,24 @@ def calendar_events():
     except (ValueError, TypeError):
         return jsonify({"error": "Invalid date format"}), 400
 
-    all_active_subscriptions = Subscription.query.filter_by(is_archived=False).all()
     events = []
 
-    for subscription in all_active_subscriptions:
-        next_renewal = subscription.next_renewal_date
-        while next_renewal < end_date:
-            if next_renewal >= start_date:
-                events.append({
-                    'id': subscription.id,
-                    'title': subscription.name,
-                    'start': next_renewal.isoformat(),
-                    'backgroundColor': '#007bff' if subscription.auto_renew else '#ffc107',
-                    'borderColor': '#007bff' if subscription.auto_renew else '#ffc107',
-                    'url': url_for('subscriptions.subscription_detail', id=subscription.id),
-                    'extendedProps': {
-                        'subscription_name': subscription.name,
-                        'cost_eur': f"€{subscription.cost_eur:.2f}"
-                    }
-                })
-            next_renewal = subscription.get_renewal_date_after(next_renewal)
+    # FullCalendar's end is exclusive; past renewals are not shown
+    window_start = max(start_date, date.today())
+    window_end = end_date - timedelta(days=1)
+
+    for next_renewal, subscription in renewal_index.renewals_in_window(window_start, window_end):
+        events.append({
+            'id': subscription.id,
+            'title': subscription.name,
+            'start': next_renewal.isoformat(),
+            'backgroundColor': '#007bff' if subscription.auto_renew else '#ffc107',
+            'borderColor': '#007bff' if subscription.auto_renew else '#ffc107',
+            'url': url_for('subscriptions.subscription_detail', id=subscription.id),
+            'extendedProps': {
+                'subscription_name': subscription.name,
+                'cost_eur': f"€{subscription.cost_eur:.2f}"
+            }
+        })
 
     return jsonify(events)
\ No newline at end of file
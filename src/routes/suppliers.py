@@ -1,18 +1,37 @@
 from flask import (
     Blueprint, render_template, request, redirect, url_for, flash
 )
+from sqlalchemy.orm import selectinload
 from ..models import db, Supplier
+from ..server_table import ServerTable, TableColumn
 from .main import login_required
 from datetime import datetime
 from .admin import admin_required
 
 suppliers_bp = Blueprint('suppliers', __name__)
 
+SUPPLIER_TABLE = ServerTable(
+    Supplier,
+    {
+        'name': TableColumn(Supplier.name, searchable=True, filter='contains'),
+        'email': TableColumn(Supplier.email, searchable=True, filter='contains', null_value=''),
+        'phone': TableColumn(Supplier.phone, searchable=True, filter='contains', null_value=''),
+    },
+    'suppliers/_rows.html',
+    default_sort='name',
+    base_filters=(Supplier.is_archived == False,),
+    options=lambda: (selectinload(Supplier.subscriptions),),
+)
+
 @suppliers_bp.route('/')
 @login_required
 def suppliers():
-    suppliers = Supplier.query.filter_by(is_archived=False).all()
-    return render_template('suppliers/list.html', suppliers=suppliers)
+    return SUPPLIER_TABLE.render('suppliers/list.html', request.args)
+
+@suppliers_bp.route('/api/table')
+@login_required
+def suppliers_table():
+    return SUPPLIER_TABLE.json_response(request.args)
 
 @suppliers_bp.route('/archived')
 @login_required
@@ -1,7 +1,7 @@
 from flask import (
     Blueprint, render_template, request, redirect, url_for, flash
 )
-from ..models import db, Tag
+from ..models import db, Tag, subscription_tags
 from .main import login_required
 
 tags_bp = Blueprint('tags', __name__)
@@ -10,7 +10,11 @@ tags_bp = Blueprint('tags', __name__)
 @login_required
 def tags():
     all_tags = Tag.query.filter_by(is_archived=False).order_by(Tag.name).all()
-    return render_template('tags/list.html', tags=all_tags)
+    # Subscriptions per tag in one grouped query
+    subscription_counts = dict(
+        db.session.query(subscription_tags.c.tag_id, db.func.count()).group_by(subscription_tags.c.tag_id)
+    )
+    return render_template('tags/list.html', tags=all_tags, subscription_counts=subscription_counts)
 
 @tags_bp.route('/archived')
 @login_required
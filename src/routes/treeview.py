@@ -1,154 +1,185 @@
 from flask import (
-    Blueprint, render_template, request, url_for
+    Blueprint, render_template, request, url_for, jsonify, abort
 )
-# --- UPDATED: Import Asset, Peripheral, License ---
-from ..models import Location, User, Supplier, Asset, Peripheral, License
+from sqlalchemy.orm import selectinload
+from ..models import db, Location, User, Supplier, Asset, Peripheral, License, Subscription, purchase_users
 from .main import login_required
 
 treeview_bp = Blueprint('treeview', __name__)
 
+
+def _child_loads(kind):
+    """
+    Loader options for the relationships walked below each kind of root, one
+    query per relationship. Built per request: creating them at import time
+    would configure the mappers before the app has finished loading.
+    """
+    if kind == 'location':
+        return (selectinload(Location.assets).selectinload(Asset.peripherals),)
+    if kind == 'user':
+        return (
+            selectinload(User.assets), selectinload(User.peripherals),
+            selectinload(User.licenses), selectinload(User.purchases),
+        )
+    return (selectinload(Supplier.subscriptions), selectinload(Supplier.assets), selectinload(Supplier.peripherals))
+
+
+def _leaf(name, icon, url):
+    return {'name': name, 'icon': icon, 'url': url}
+
+
+def _group(name, icon, children):
+    return {'name': name, 'icon': icon, 'children': children}
+
+
+def _root(name, icon, url, kind, id, children=None, expandable=False):
+    """
+    Root node. Either carries its children (fully expanded tree) or, when it
+    has any, the URL the page fetches them from on first expansion.
+    """
+    node = {'name': name, 'icon': icon, 'url': url, 'children': children or []}
+    if children is None and expandable:
+        node['children_url'] = url_for('treeview.node_children', kind=kind, id=id)
+    return node
+
+
+def _location_children(location):
+    children = []
+    for asset in location.assets:
+        asset_node = _leaf(asset.name, 'fa-laptop', url_for('assets.asset_detail', id=asset.id))
+        asset_node['children'] = [
+            _leaf(peripheral.name, 'fa-keyboard', url_for('peripherals.peripheral_detail', id=peripheral.id))
+            for peripheral in asset.peripherals
+        ]
+        children.append(asset_node)
+    return children
+
+
+def _user_children(user):
+    children = []
+    if user.assets:
+        children.append(_group('Assets', 'fa-laptop', [
+            _leaf(asset.name, 'fa-laptop', url_for('assets.asset_detail', id=asset.id))
+            for asset in user.assets
+        ]))
+    if user.peripherals:
+        children.append(_group('Peripherals', 'fa-keyboard', [
+            _leaf(peripheral.name, 'fa-keyboard', url_for('peripherals.peripheral_detail', id=peripheral.id))
+            for peripheral in user.peripherals
+        ]))
+    if user.licenses:
+        children.append(_group('Licenses', 'fa-id-badge', [
+            _leaf(license.name, 'fa-id-badge', url_for('licenses.detail', id=license.id))
+            for license in user.licenses
+        ]))
+    if user.purchases:
+        children.append(_group('Purchases', 'fa-shopping-cart', [
+            _leaf(purchase.description, 'fa-shopping-cart', url_for('purchases.purchase_detail', id=purchase.id))
+            for purchase in user.purchases
+        ]))
+    return children
+
+
+def _supplier_children(supplier):
+    children = []
+    if supplier.subscriptions:
+        children.append(_group('Subscriptions', 'fa-cogs', [
+            _leaf(subscription.name, 'fa-cogs', url_for('subscriptions.subscription_detail', id=subscription.id))
+            for subscription in supplier.subscriptions
+        ]))
+    if supplier.assets:
+        children.append(_group('Assets', 'fa-laptop', [
+            _leaf(asset.name, 'fa-laptop', url_for('assets.asset_detail', id=asset.id))
+            for asset in supplier.assets
+        ]))
+    if supplier.peripherals:
+        children.append(_group('Peripherals', 'fa-keyboard', [
+            _leaf(peripheral.name, 'fa-keyboard', url_for('peripherals.peripheral_detail', id=peripheral.id))
+            for peripheral in supplier.peripherals
+        ]))
+    return children
+
+
+def _ids_referenced_by(*columns):
+    """Ids that appear in any of the given foreign key columns (one DISTINCT query per column)."""
+    ids = set()
+    for column in columns:
+        ids.update(row[0] for row in db.session.query(column).filter(column.isnot(None)).distinct())
+    return ids
+
+
 @treeview_bp.route('/')
 @login_required
 def tree_view():
     selected_root = request.args.get('root', 'locations')
+    # Expanding everything up front is opt-in; by default only roots are rendered
+    expand_all = request.args.get('expand') == 'all'
     tree_data = []
 
     # Define the available options for the dropdown
     root_options = ["Locations", "Users", "Suppliers"]
 
     if selected_root == 'locations':
-        locations = Location.query.order_by(Location.name).all()
-        for location in locations:
-            location_node = {
-                'name': location.name,
-                'icon': 'fa-map-marker-alt',
-                'url': url_for('locations.location_detail', id=location.id),
-                'children': []
-            }
-            for asset in location.assets:
-                asset_node = {
-                    'name': asset.name,
-                    'icon': 'fa-laptop',
-                    'url': url_for('assets.asset_detail', id=asset.id),
-                    'children': []
-                }
-                for peripheral in asset.peripherals:
-                    peripheral_node = {
-                        'name': peripheral.name,
-                        'icon': 'fa-keyboard',
-                        'url': url_for('peripherals.peripheral_detail', id=peripheral.id)
-                    }
-                    asset_node['children'].append(peripheral_node)
-                location_node['children'].append(asset_node)
-            tree_data.append(location_node)
+        query = Location.query.order_by(Location.name)
+        if expand_all:
+            query = query.options(*_child_loads('location'))
+        else:
+            expandable = _ids_referenced_by(Asset.location_id)
+        for location in query:
+            tree_data.append(_root(
+                location.name, 'fa-map-marker-alt', url_for('locations.location_detail', id=location.id),
+                'location', location.id,
+                children=_location_children(location) if expand_all else None,
+                expandable=not expand_all and location.id in expandable
+            ))
 
     elif selected_root == 'users':
-        users = User.query.order_by(User.name).filter_by(is_archived=False).all() # Show all users, even archived ones
-        for user in users:
-            user_node = {
-                'name': user.name,
-                'icon': 'fa-user',
-                'url': url_for('users.user_detail', id=user.id),
-                'children': []
-            }
-            # Add assigned assets
-            if user.assets:
-                assets_node = {'name': 'Assets', 'icon': 'fa-laptop', 'children': []}
-                for asset in user.assets:
-                    assets_node['children'].append({
-                        'name': asset.name,
-                        'icon': 'fa-laptop',
-                        'url': url_for('assets.asset_detail', id=asset.id)
-                    })
-                user_node['children'].append(assets_node)
-
-            # --- ADD Peripherals ---
-            if user.peripherals:
-                peripherals_node = {'name': 'Peripherals', 'icon': 'fa-keyboard', 'children': []}
-                for peripheral in user.peripherals:
-                    peripherals_node['children'].append({
-                        'name': peripheral.name,
-                        'icon': 'fa-keyboard', # Or fa-mouse, fa-headphones etc. based on type?
-                        'url': url_for('peripherals.peripheral_detail', id=peripheral.id)
-                    })
-                user_node['children'].append(peripherals_node)
-            # --- END ADD Peripherals ---
-
-            # --- ADD Licenses ---
-            if user.licenses:
-                licenses_node = {'name': 'Licenses', 'icon': 'fa-id-badge', 'children': []}
-                for license in user.licenses:
-                    license_display_name = f"{license.name}"
-                    # Example: Truncate key if you want to show part of it
-                    # if license.license_key:
-                    #    license_display_name += f" (...{license.license_key[-6:]})"
-
-                    licenses_node['children'].append({
-                        'name': license_display_name,
-                        'icon': 'fa-id-badge', # Or fa-key
-                        'url': url_for('licenses.detail', id=license.id)
-                    })
-                user_node['children'].append(licenses_node)
-            # --- END ADD Licenses ---
-
-            # Add associated purchases
-            if user.purchases:
-                purchases_node = {'name': 'Purchases', 'icon': 'fa-shopping-cart', 'children': []}
-                for purchase in user.purchases:
-                    purchases_node['children'].append({
-                        'name': purchase.description,
-                        'icon': 'fa-shopping-cart',
-                        'url': url_for('purchases.purchase_detail', id=purchase.id)
-                    })
-                user_node['children'].append(purchases_node)
-            tree_data.append(user_node)
+        query = User.query.order_by(User.name).filter_by(is_archived=False)
+        if expand_all:
+            query = query.options(*_child_loads('user'))
+        else:
+            expandable = _ids_referenced_by(
+                Asset.user_id, Peripheral.user_id, License.user_id, purchase_users.c.user_id
+            )
+        for user in query:
+            tree_data.append(_root(
+                user.name, 'fa-user', url_for('users.user_detail', id=user.id), 'user', user.id,
+                children=_user_children(user) if expand_all else None,
+                expandable=not expand_all and user.id in expandable
+            ))
 
     elif selected_root == 'suppliers':
-        suppliers = Supplier.query.order_by(Supplier.name).all()
-        for supplier in suppliers:
-            supplier_node = {
-                'name': supplier.name,
-                'icon': 'fa-building',
-                'url': url_for('suppliers.supplier_detail', id=supplier.id),
-                'children': []
-            }
-            # Add associated subscriptions
-            if supplier.subscriptions:
-                subscriptions_node = {'name': 'Subscriptions', 'icon': 'fa-cogs', 'children': []}
-                for subscription in supplier.subscriptions:
-                    subscriptions_node['children'].append({
-                        'name': subscription.name,
-                        'icon': 'fa-cogs',
-                        'url': url_for('subscriptions.subscription_detail', id=subscription.id)
-                    })
-                supplier_node['children'].append(subscriptions_node)
-
-            # Add associated assets
-            if supplier.assets:
-                assets_node = {'name': 'Assets', 'icon': 'fa-laptop', 'children': []}
-                for asset in supplier.assets:
-                    assets_node['children'].append({
-                        'name': asset.name,
-                        'icon': 'fa-laptop',
-                        'url': url_for('assets.asset_detail', id=asset.id)
-                    })
-                supplier_node['children'].append(assets_node)
-
-            # --- ADD Peripherals ---
-            if supplier.peripherals:
-                peripherals_node = {'name': 'Peripherals', 'icon': 'fa-keyboard', 'children': []}
-                for peripheral in supplier.peripherals:
-                    peripherals_node['children'].append({
-                        'name': peripheral.name,
-                        'icon': 'fa-keyboard', # Or other icons based on type
-                        'url': url_for('peripherals.peripheral_detail', id=peripheral.id)
-                    })
-                supplier_node['children'].append(peripherals_node)
-            # --- END ADD Peripherals ---
-
-            tree_data.append(supplier_node)
+        query = Supplier.query.order_by(Supplier.name)
+        if expand_all:
+            query = query.options(*_child_loads('supplier'))
+        else:
+            expandable = _ids_referenced_by(Subscription.supplier_id, Asset.supplier_id, Peripheral.supplier_id)
+        for supplier in query:
+            tree_data.append(_root(
+                supplier.name, 'fa-building', url_for('suppliers.supplier_detail', id=supplier.id),
+                'supplier', supplier.id,
+                children=_supplier_children(supplier) if expand_all else None,
+                expandable=not expand_all and supplier.id in expandable
+            ))
 
     return render_template('tree_view.html',
                            tree_data=tree_data,
                            root_options=root_options,
-                           selected_root=selected_root)
\ No newline at end of file
+                           selected_root=selected_root,
+                           expand_all=expand_all)
+
+
+@treeview_bp.route('/api/nodes/<kind>/<int:id>')
+@login_required
+def node_children(kind, id):
+    """Children of a single root node, for expanding the tree one node at a time."""
+    if kind == 'location':
+        location = Location.query.options(*_child_loads('location')).filter_by(id=id).first_or_404()
+        return jsonify(_location_children(location))
+    if kind == 'user':
+        user = User.query.options(*_child_loads('user')).filter_by(id=id).first_or_404()
+        return jsonify(_user_children(user))
+    if kind == 'supplier':
+        supplier = Supplier.query.options(*_child_loads('supplier')).filter_by(id=id).first_or_404()
+        return jsonify(_supplier_children(supplier))
+    abort(404)
@@ -1,21 +1,40 @@
-import os
 import uuid
 from datetime import datetime
 from flask import (
     Blueprint, render_template, request, redirect, url_for, flash, current_app
 )
-from ..models import db, User, Attachment
-from .main import login_required
-from weasyprint import HTML
+from sqlalchemy.orm import selectinload
+from ..models import db, User, License
+from ..server_table import ServerTable, TableColumn
+from .. import pdf_jobs
+from .main import login_required, current_user
 from .admin import admin_required
+from .pdf_jobs import job_result
 
 users_bp = Blueprint('users', __name__)
 
+USER_TABLE = ServerTable(
+    User,
+    {
+        'name': TableColumn(User.name, searchable=True, filter='contains'),
+        'email': TableColumn(User.email, searchable=True, filter='contains'),
+        'department': TableColumn(User.department, filter='exact', null_value=''),
+        'job_title': TableColumn(User.job_title, searchable=True, filter='contains', null_value=''),
+    },
+    'users/_rows.html',
+    default_sort='name',
+    base_filters=(User.is_archived == False,),
+)
+
 @users_bp.route('/')
 @login_required
 def users():
-    users = User.query.filter_by(is_archived=False).all()
-    return render_template('users/list.html', users=users)
+    return USER_TABLE.render('users/list.html', request.args)
+
+@users_bp.route('/api/table')
+@login_required
+def users_table():
+    return USER_TABLE.json_response(request.args)
 
 @users_bp.route('/archived')
 @login_required
@@ -86,56 +105,57 @@ def edit_user(id):
 
     return render_template('users/form.html', user=user)
 
-@users_bp.route('/<int:id>/inventory/generate', methods=['POST'])
-@login_required
-def generate_inventory(id):
+def _submit_inventory_job(user, batch_id=None):
     """
-    Genera un snapshot en PDF del inventario del usuario y lo guarda
-    como un adjunto enlazado a ese usuario.
+    Queues the PDF snapshot of a user's inventory; the PDF worker saves it as
+    an attachment linked to that user. The snapshot is keyed on its full HTML,
+    generation time included, so every snapshot records when it was taken.
     """
-    user = User.query.get_or_404(id)
-    
-    # 1. Renderizar la plantilla HTML específica para el PDF
     html_content = render_template(
-        'users/inventory_pdf.html', 
+        'users/inventory_pdf.html',
         user=user,
         generated_at=datetime.now()
     )
-    
-    # 2. Generar los bytes del PDF en memoria
-    try:
-        pdf_bytes = HTML(string=html_content).write_pdf()
-    except Exception as e:
-        current_app.logger.error(f"Error al generar PDF con WeasyPrint: {e}")
-        flash('Error al generar el PDF. Revisa los logs.', 'danger')
-        return redirect(url_for('users.user_detail', id=id))
-
-    # 3. Definir nombres de archivo
     timestamp = datetime.now().strftime('%Y-%m-%d_%H%M')
-    original_filename = f"Inventory_{user.name.replace(' ', '_')}_{timestamp}.pdf"
-    secure_filename_to_save = f"{uuid.uuid4().hex}.pdf"
-    
-    # 4. Guardar el archivo físico
-    save_path = os.path.join(current_app.config['UPLOAD_FOLDER'], secure_filename_to_save)
-    
-    try:
-        with open(save_path, 'wb') as f:
-            f.write(pdf_bytes)
-    except OSError as e:
-        current_app.logger.error(f"Error al guardar archivo PDF: {e}")
-        flash('Error al guardar el archivo de inventario.', 'danger')
-        return redirect(url_for('users.user_detail', id=id))
-
-    # 5. Crear el registro 'Attachment' en la BD
-    attachment = Attachment(
-        filename=original_filename,
-        secure_filename=secure_filename_to_save,
-        linkable_type='User',
-        linkable_id=user.id
+    requester = current_user()
+    return pdf_jobs.submit(
+        html_content, 'inventory', f"Inventory_{user.name.replace(' ', '_')}_{timestamp}.pdf",
+        linkable=('User', user.id), batch_id=batch_id,
+        return_url=url_for('users.user_detail', id=user.id) if batch_id is None else url_for('users.users'),
+        requested_by_id=requester.id if requester else None,
     )
-    
-    db.session.add(attachment)
-    db.session.commit()
-    
-    flash('Snapshot de inventario generado y guardado.', 'success')
-    return redirect(url_for('users.user_detail', id=id))
\ No newline at end of file
+
+@users_bp.route('/<int:id>/inventory/generate', methods=['POST'])
+@login_required
+def generate_inventory(id):
+    """
+    Genera un snapshot en PDF del inventario del usuario y lo guarda
+    como un adjunto enlazado a ese usuario. El PDF se genera en segundo
+    plano; si no está listo enseguida, se muestra la página de progreso.
+    """
+    user = User.query.get_or_404(id)
+    job = pdf_jobs.wait(_submit_inventory_job(user), current_app.config['PDF_JOB_WAIT_SECONDS'])
+    if job.status != 'queued':
+        return job_result(job)
+    return redirect(url_for('pdf_jobs.job_status_page', job_id=job.id))
+
+@users_bp.route('/inventory/generate-bulk', methods=['POST'])
+@login_required
+@admin_required
+def generate_inventory_bulk():
+    """Queues an inventory snapshot for every active user of a department, rendered in parallel."""
+    department = request.form.get('department')
+    if not department:
+        flash('Select a department.', 'warning')
+        return redirect(url_for('users.users'))
+    users = User.query.filter_by(department=department, is_archived=False).options(
+        selectinload(User.assets), selectinload(User.peripherals),
+        selectinload(User.licenses).joinedload(License.software)
+    ).order_by(User.name).all()
+    if not users:
+        flash(f'No active users in department "{department}".', 'warning')
+        return redirect(url_for('users.users'))
+    batch_id = uuid.uuid4().hex
+    for user in users:
+        _submit_inventory_job(user, batch_id=batch_id)
+    return redirect(url_for('pdf_jobs.batch_status_page', batch_id=batch_id))
\ No newline at end of file
@@ -0,0 +1,203 @@
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime, timedelta, timezone
+from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy import update, or_
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from .extensions import db
+from .models import SchedulerLease, JobRun
+from . import notifications, renewal_index, book_values
+
+LEASE_NAME = 'scheduler'
+# A leader that stops renewing its lease is replaced once the lease expires
+LEASE_TTL = timedelta(seconds=90)
+LEASE_RENEW_SECONDS = 30
+
+# (job name, function(app) returning the number of items processed, trigger arguments).
+# Daily jobs use cron triggers so every process fires them at the same time,
+# whenever it was started; catch_up_daily_jobs() runs them if that was missed.
+JOBS = (
+    ('check-upcoming-expiries', notifications.check_upcoming_expiries, dict(trigger='cron', hour=7)),
+    ('deliver-notifications', notifications.deliver_notifications, dict(trigger='interval', minutes=1)),
+    ('extend-renewal-horizon', renewal_index.extend_renewal_horizon, dict(trigger='cron', hour=2)),
+    ('snapshot-book-values', book_values.snapshot_book_values, dict(trigger='cron', hour=3)),
+)
+# Jobs that run at most once a day, even if the lease changes hands after today's run
+DAILY_JOBS = {'check-upcoming-expiries', 'extend-renewal-horizon', 'snapshot-book-values'}
+# How often daily jobs whose hour has passed without a successful run are caught up
+CATCH_UP_MINUTES = 15
+# Frequent jobs whose runs that processed nothing are not kept in the history
+QUIET_JOBS = {'deliver-notifications'}
+# Runs kept in the history per job
+JOB_HISTORY_RUNS = 100
+
+# Identifies this process in the lease and in the job history
+HOLDER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# Jobs running in this process: the cron trigger and the catch-up never run one twice
+_running = set()
+_running_lock = threading.Lock()
+
+
+def acquire_lease(holder=None, now=None):
+    """
+    Takes or renews the scheduler lease for `holder`. Returns True when the
+    holder is the leader. The lease changes hands in a single conditional
+    UPDATE, so two processes can never both win it.
+    """
+    holder = holder or HOLDER
+    now = now or datetime.utcnow()
+    result = db.session.execute(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == LEASE_NAME,
+               or_(SchedulerLease.holder == holder, SchedulerLease.expires_at < now))
+        .values(holder=holder, expires_at=now + LEASE_TTL)
+    )
+    if result.rowcount:
+        db.session.commit()
+        return True
+    if db.session.get(SchedulerLease, LEASE_NAME) is not None:
+        db.session.rollback()
+        return False
+    # First run on this database: whoever inserts the row first leads
+    try:
+        db.session.add(SchedulerLease(name=LEASE_NAME, holder=holder, expires_at=now + LEASE_TTL))
+        db.session.commit()
+        return True
+    except IntegrityError:
+        db.session.rollback()
+        return False
+
+
+def release_lease(holder=None):
+    """Gives up the lease (on shutdown) so another process can take over right away."""
+    holder = holder or HOLDER
+    db.session.execute(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == LEASE_NAME, SchedulerLease.holder == holder)
+        .values(expires_at=datetime.utcnow() - timedelta(seconds=1))
+    )
+    db.session.commit()
+
+
+def _ran_today(name):
+    # Days are local, like the cron triggers; started_at is in UTC
+    midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    today = midnight.astimezone(timezone.utc).replace(tzinfo=None)
+    return db.session.query(JobRun.id).filter(
+        JobRun.job_name == name, JobRun.status == 'success', JobRun.started_at >= today
+    ).first() is not None
+
+
+def prune_job_runs(name, keep):
+    """Deletes the runs of a job beyond its `keep` most recent ones."""
+    cutoff = db.session.query(JobRun.id).filter(JobRun.job_name == name) \
+        .order_by(JobRun.id.desc()).offset(keep).limit(1).scalar()
+    if cutoff is not None:
+        JobRun.query.filter(JobRun.job_name == name, JobRun.id <= cutoff).delete(synchronize_session=False)
+
+
+def run_job(app, name, func, holder=None):
+    """
+    Runs a scheduled job if this process holds the lease, and records the run
+    (duration, items processed, error) in the job history, which keeps the
+    last JOB_HISTORY_RUNS runs of each job. Returns the JobRun, or None when
+    another process is the leader, when a daily job already ran today, when
+    the job is already running in this process, or for a run of a quiet job
+    that found nothing to do.
+    """
+    with _running_lock:
+        if name in _running:
+            return None
+        _running.add(name)
+    try:
+        return _run_job(app, name, func, holder or HOLDER)
+    finally:
+        with _running_lock:
+            _running.discard(name)
+
+
+def _run_job(app, name, func, holder):
+    with app.app_context():
+        if not acquire_lease(holder):
+            return None
+        if name in DAILY_JOBS and _ran_today(name):
+            db.session.rollback()
+            return None
+        run = JobRun(job_name=name, holder=holder, started_at=datetime.utcnow())
+        db.session.add(run)
+        db.session.commit()
+        run_id = run.id
+
+        started = time.perf_counter()
+        try:
+            items = func(app)
+            status, error = 'success', None
+        except Exception:
+            db.session.rollback()
+            items, status, error = None, 'failed', traceback.format_exc()
+            app.logger.error(f"Scheduled job {name} failed:\n{error}")
+
+        run = db.session.get(JobRun, run_id)
+        if name in QUIET_JOBS and status == 'success' and not items:
+            db.session.delete(run)
+            db.session.commit()
+            return None
+        run.finished_at = datetime.utcnow()
+        run.duration_ms = int((time.perf_counter() - started) * 1000)
+        run.status = status
+        run.items_processed = items if isinstance(items, int) else None
+        run.error = error
+        prune_job_runs(name, JOB_HISTORY_RUNS)
+        db.session.commit()
+        # Loaded now so the returned run stays readable once the app context ends
+        db.session.refresh(run)
+        return run
+
+
+def catch_up_daily_jobs(app, now=None):
+    """
+    Runs the daily jobs whose hour has passed today without a successful run,
+    e.g. because no process held the lease when their cron trigger fired (the
+    leader was restarting). Returns the names of the jobs that ran.
+    """
+    now = now or datetime.now()
+    ran = []
+    for name, func, trigger in JOBS:
+        if name in DAILY_JOBS and now.hour >= trigger.get('hour', 0):
+            if run_job(app, name, func) is not None:
+                ran.append(name)
+    return ran
+
+
+def renew_lease(app):
+    """Heartbeat job: keeps the lease while this process is alive."""
+    with app.app_context():
+        acquire_lease()
+
+
+def build_scheduler(app, scheduler_class=BackgroundScheduler):
+    """Every process schedules the jobs; only the lease holder actually runs them."""
+    scheduler = scheduler_class()
+    scheduler.add_job(func=renew_lease, args=[app], id='renew-lease', trigger='interval', seconds=LEASE_RENEW_SECONDS)
+    scheduler.add_job(func=catch_up_daily_jobs, args=[app], id='catch-up-daily-jobs', trigger='interval',
+                      minutes=CATCH_UP_MINUTES)
+    for name, func, trigger in JOBS:
+        scheduler.add_job(func=run_job, args=[app, name, func], id=name, **trigger)
+    return scheduler
+
+
+def shutdown_scheduler(app, scheduler):
+    """Stops the scheduler and hands the lease over, if this process held it."""
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
+    with app.app_context():
+        try:
+            release_lease()
+        except SQLAlchemyError:
+            db.session.rollback()
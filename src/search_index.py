@@ -0,0 +1,326 @@
+import re
+from flask import url_for
+from sqlalchemy import event, inspect, select, func, case, and_, or_, literal_column, table, column
+from sqlalchemy.exc import OperationalError
+
+from .extensions import db
+from .models import (
+    SearchDocument, Subscription, Asset, Supplier, Contact, Purchase, Peripheral,
+    Software, License, Policy, Documentation, Link, Risk, SecurityIncident
+)
+
+# SQLite FTS5 table mirroring search_document (external content, kept in sync by triggers)
+FTS_TABLE = 'search_document_fts'
+
+# bm25 column weights: a hit in the title outranks one in the body
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+# Longer queries are truncated to this many terms
+MAX_TERMS = 8
+
+_SQLITE_CREATE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, body, content='search_document', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    f"CREATE TRIGGER IF NOT EXISTS search_document_ai AFTER INSERT ON search_document BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    f"CREATE TRIGGER IF NOT EXISTS search_document_ad AFTER DELETE ON search_document BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); END",
+    f"CREATE TRIGGER IF NOT EXISTS search_document_au AFTER UPDATE ON search_document BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+)
+
+_SQLITE_DROP = (
+    "DROP TRIGGER IF EXISTS search_document_ai",
+    "DROP TRIGGER IF EXISTS search_document_ad",
+    "DROP TRIGGER IF EXISTS search_document_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+)
+
+# Weighted document vector; the GIN index and the queries must use the exact same expression
+_PG_VECTOR = "setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', body), 'B')"
+
+_PG_CREATE = (
+    f"CREATE INDEX IF NOT EXISTS ix_search_document_tsv ON search_document USING gin (({_PG_VECTOR}))",
+)
+
+
+def _contact_label(connection, record):
+    supplier_name = connection.execute(
+        select(Supplier.name).where(Supplier.id == record.supplier_id)
+    ).scalar()
+    return f"{record.name} ({supplier_name})" if supplier_name else record.name
+
+
+def _risk_label(connection, record):
+    text = record.risk_description
+    return text if len(text) <= 80 else text[:77] + '...'
+
+
+class SearchEntity:
+    """Describes how one model is indexed and linked from the search results."""
+
+    def __init__(self, model, type_label, endpoint, title, body=(), boost=1.0, label=None, label_fields=()):
+        self.model = model
+        self.type_label = type_label
+        self.endpoint = endpoint
+        self.title = title
+        self.body = body
+        self.boost = boost
+        self.label = label
+        self.fields = (title,) + tuple(body) + tuple(label_fields)
+        if hasattr(model, 'is_archived'):
+            self.fields += ('is_archived',)
+
+    def document(self, connection, record):
+        """
+        Builds the search_document row for an ORM instance or a Core row of the
+        model's table. Archived records are not searchable and return None.
+        """
+        if getattr(record, 'is_archived', False):
+            return None
+        title = getattr(record, self.title) or ''
+        label = self.label(connection, record) if self.label else title
+        return {
+            'entity_type': self.type_label,
+            'entity_id': record.id,
+            'label': label[:255],
+            'title': title,
+            'body': ' '.join(str(value) for value in (getattr(record, field) for field in self.body) if value),
+        }
+
+
+# Boost multiplies the text score so that, for equally good matches, the
+# records people look up most often come first
+SEARCH_ENTITIES = [
+    SearchEntity(Subscription, 'Subscription', 'subscriptions.subscription_detail', 'name',
+                 ('subscription_type', 'description'), boost=1.2),
+    SearchEntity(Asset, 'Asset', 'assets.asset_detail', 'name',
+                 ('serial_number', 'internal_id', 'brand', 'model'), boost=1.2),
+    SearchEntity(Supplier, 'Supplier', 'suppliers.supplier_detail', 'name', ('email',), boost=1.1),
+    SearchEntity(Contact, 'Contact', 'contacts.contact_detail', 'name', ('email', 'role'),
+                 label=_contact_label, label_fields=('supplier_id',)),
+    SearchEntity(Purchase, 'Purchase', 'purchases.purchase_detail', 'description',
+                 ('internal_id', 'invoice_number'), boost=0.9),
+    SearchEntity(Peripheral, 'Peripheral', 'peripherals.peripheral_detail', 'name',
+                 ('serial_number', 'brand', 'type')),
+    SearchEntity(Software, 'Software', 'software.detail', 'name', ('category', 'description')),
+    SearchEntity(License, 'License', 'licenses.detail', 'name'),
+    SearchEntity(Policy, 'Policy', 'policies.detail', 'title', ('category', 'description'), boost=0.9),
+    SearchEntity(Documentation, 'Documentation', 'documentation.detail', 'name', ('description',), boost=0.8),
+    SearchEntity(Link, 'Link', 'links.detail', 'name', ('description', 'url'), boost=0.8),
+    SearchEntity(Risk, 'Risk', 'risk.detail', 'risk_description',
+                 ('risk_owner', 'iso_27001_control', 'mitigation_plan'), boost=0.7, label=_risk_label),
+    SearchEntity(SecurityIncident, 'Incident', 'compliance.incident_detail', 'title', ('description',), boost=0.7),
+]
+
+ENTITIES_BY_TYPE = {entity.type_label: entity for entity in SEARCH_ENTITIES}
+ENTITIES_BY_MODEL = {entity.model: entity for entity in SEARCH_ENTITIES}
+
+
+# --- Index maintenance ---
+
+def _fts5_available(connection):
+    return bool(connection.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar())
+
+
+def ensure_search_index(connection):
+    """Creates the dialect-specific full-text structures over search_document if missing."""
+    if connection.dialect.name == 'sqlite' and _fts5_available(connection):
+        statements = _SQLITE_CREATE
+    elif connection.dialect.name == 'postgresql':
+        statements = _PG_CREATE
+    else:
+        return
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+@event.listens_for(SearchDocument.__table__, 'after_create')
+def _create_search_index(target, connection, **kw):
+    ensure_search_index(connection)
+
+
+@event.listens_for(SearchDocument.__table__, 'before_drop')
+def _drop_search_index(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        for statement in _SQLITE_DROP:
+            connection.exec_driver_sql(statement)
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Alembic filter: the FTS5 table and its shadow tables are not part of the models."""
+    return not (type_ == 'table' and reflected and compare_to is None and name.startswith(FTS_TABLE))
+
+
+def _remove_document(connection, entity, entity_id):
+    documents = SearchDocument.__table__
+    connection.execute(documents.delete().where(
+        documents.c.entity_type == entity.type_label, documents.c.entity_id == entity_id
+    ))
+
+
+def index_record(connection, entity, record):
+    """Replaces one record's search document using the given connection."""
+    _remove_document(connection, entity, record.id)
+    document = entity.document(connection, record)
+    if document:
+        connection.execute(SearchDocument.__table__.insert(), document)
+
+
+def _register_hooks(entity):
+    @event.listens_for(entity.model, 'after_insert')
+    def _index_new_record(mapper, connection, target):
+        index_record(connection, entity, target)
+
+    @event.listens_for(entity.model, 'after_update')
+    def _index_changed_record(mapper, connection, target):
+        state = inspect(target)
+        if any(state.attrs[field].history.has_changes() for field in entity.fields):
+            index_record(connection, entity, target)
+
+    @event.listens_for(entity.model, 'after_delete')
+    def _unindex_deleted_record(mapper, connection, target):
+        _remove_document(connection, entity, target.id)
+
+
+for _entity in SEARCH_ENTITIES:
+    _register_hooks(_entity)
+
+
+@event.listens_for(Supplier, 'after_update')
+def _relabel_supplier_contacts(mapper, connection, target):
+    """Contact results show their supplier's name, so a rename re-labels them."""
+    if not inspect(target).attrs.name.history.has_changes():
+        return
+    contacts = Contact.__table__
+    entity = ENTITIES_BY_MODEL[Contact]
+    for contact in connection.execute(select(contacts).where(contacts.c.supplier_id == target.id)).all():
+        index_record(connection, entity, contact)
+
+
+def rebuild_search_index():
+    """Re-indexes every searchable record from scratch. Returns the number of documents written."""
+    connection = db.session.connection()
+    if connection.dialect.name == 'sqlite':
+        for statement in _SQLITE_DROP:
+            connection.exec_driver_sql(statement)
+    connection.execute(SearchDocument.__table__.delete())
+
+    documents = []
+    for entity in SEARCH_ENTITIES:
+        for record in connection.execute(select(entity.model.__table__)).all():
+            document = entity.document(connection, record)
+            if document:
+                documents.append(document)
+    if documents:
+        connection.execute(SearchDocument.__table__.insert(), documents)
+
+    ensure_search_index(connection)
+    if connection.dialect.name == 'sqlite' and _fts5_available(connection):
+        connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    db.session.commit()
+    return len(documents)
+
+
+# --- Queries ---
+
+def _terms(query):
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+def _boost(entity_type):
+    return case(
+        {entity.type_label: entity.boost for entity in SEARCH_ENTITIES},
+        value=entity_type, else_=1.0
+    )
+
+
+def _fts5_scores(terms):
+    documents = SearchDocument.__table__
+    fts = table(FTS_TABLE, column('rowid'))
+    fts_ref = literal_column(FTS_TABLE)
+    # Every term must match, the last characters typed are a prefix
+    match = ' '.join(f'"{term}"*' for term in terms)
+    rank = -func.bm25(fts_ref, TITLE_WEIGHT, BODY_WEIGHT)
+    return (
+        select(documents.c.entity_type, documents.c.entity_id, documents.c.label,
+               (rank * _boost(documents.c.entity_type)).label('score'))
+        .select_from(fts.join(documents, documents.c.id == fts.c.rowid))
+        .where(fts_ref.op('MATCH')(match))
+    )
+
+
+def _tsvector_scores(terms):
+    documents = SearchDocument.__table__
+    vector = literal_column(_PG_VECTOR)
+    tsquery = func.to_tsquery(literal_column("'simple'"), ' & '.join(f'{term}:*' for term in terms))
+    return (
+        select(documents.c.entity_type, documents.c.entity_id, documents.c.label,
+               (func.ts_rank(vector, tsquery) * _boost(documents.c.entity_type)).label('score'))
+        .where(vector.op('@@')(tsquery))
+    )
+
+
+def _like_scores(terms):
+    """Portable fallback (no full-text support): substring match, title prefix hits first."""
+    documents = SearchDocument.__table__
+    title, body = func.lower(documents.c.title), func.lower(documents.c.body)
+    title_first = case((title.startswith(terms[0], autoescape=True), 2.0), else_=1.0)
+    return (
+        select(documents.c.entity_type, documents.c.entity_id, documents.c.label,
+               (title_first * _boost(documents.c.entity_type)).label('score'))
+        .where(and_(*[
+            or_(title.contains(term, autoescape=True), body.contains(term, autoescape=True))
+            for term in terms
+        ]))
+    )
+
+
+def _top_results(scores, limit, per_type):
+    scored = scores.subquery()
+    position = func.row_number().over(
+        partition_by=scored.c.entity_type, order_by=scored.c.score.desc()
+    ).label('position')
+    ranked = select(scored, position).subquery()
+    return db.session.execute(
+        select(ranked.c.entity_type, ranked.c.entity_id, ranked.c.label)
+        .where(ranked.c.position <= per_type)
+        .order_by(ranked.c.score.desc(), ranked.c.entity_type, ranked.c.entity_id)
+        .limit(limit)
+    ).all()
+
+
+def search(query, limit=20, per_type=5):
+    """
+    Returns the best matches for the query across every searchable model as
+    [{name, type, url}], ranked by text relevance times the entity boost and
+    capped at `per_type` results per type. Each term is prefix-matched.
+    """
+    terms = _terms(query)
+    if not terms:
+        return []
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        try:
+            rows = _top_results(_fts5_scores(terms), limit, per_type)
+        except OperationalError:
+            # FTS5 missing from this SQLite build, or the index was never built
+            db.session.rollback()
+            rows = _top_results(_like_scores(terms), limit, per_type)
+    elif dialect == 'postgresql':
+        rows = _top_results(_tsvector_scores(terms), limit, per_type)
+    else:
+        rows = _top_results(_like_scores(terms), limit, per_type)
+
+    return [
+        {
+            'name': row.label,
+            'type': row.entity_type,
+            'url': url_for(ENTITIES_BY_TYPE[row.entity_type].endpoint, id=row.entity_id)
+        }
+        for row in rows
+    ]
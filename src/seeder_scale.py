@@ -0,0 +1,514 @@
+from datetime import date, datetime, timedelta
+import numpy as np
+from faker import Faker
+from sqlalchemy import func, text
+
+from .models import (
+    db, Supplier, User, Group, user_groups, Location, Budget, PaymentMethod, Purchase,
+    Asset, Peripheral, Software, License, Subscription, CostHistory, Framework, FrameworkControl,
+    ComplianceLink, SecurityIncident, incident_users, incident_assets, Course, CourseAssignment,
+    CourseCompletion, compute_warranty_end_date
+)
+from . import renewal_index, search_index
+
+# Rows inserted per executemany() call
+BATCH_SIZE = 10000
+
+# Rows generated per unit of --factor (about 8,000 in total, so --factor 125 is a million rows)
+PER_FACTOR = {
+    'suppliers': 40,
+    'locations': 2,
+    'budgets': 4,
+    'payment_methods': 2,
+    'users': 400,
+    'groups': 10,
+    'purchases': 300,
+    'assets': 1000,
+    'peripherals': 1500,
+    'software': 30,
+    'subscriptions': 150,
+    'licenses': 1200,
+    'compliance_links': 400,
+    'incidents': 20,
+    'courses': 5,
+}
+# Controls of the framework the compliance links point at (one framework per run)
+FRAMEWORK_CONTROLS = 50
+# Training assignments per active user
+COURSES_PER_USER = 3
+
+CURRENCIES = (('EUR', 'USD', 'GBP', 'ZAR'), (0.6, 0.3, 0.08, 0.02))
+
+DEPARTMENTS = {
+    # department: (share of the headcount, job titles)
+    'Engineering': (0.30, ('Backend Developer', 'Frontend Developer', 'Lead Developer', 'SRE', 'QA Engineer')),
+    'Sales': (0.18, ('Account Executive', 'Sales Manager', 'Sales Engineer')),
+    'Support': (0.12, ('Support Agent', 'Support Lead')),
+    'Marketing': (0.10, ('Marketing Specialist', 'Marketing Director', 'Content Writer')),
+    'Operations': (0.10, ('Operations Analyst', 'Office Manager', 'IT Administrator')),
+    'Design': (0.08, ('UX/UI Designer', 'Lead Designer')),
+    'Finance': (0.07, ('Accountant', 'Financial Controller')),
+    'HR': (0.05, ('HR Generalist', 'Recruiter')),
+}
+
+ASSET_CATALOG = (
+    # (share, prefix, brand, model, median cost, warranty lengths in months)
+    (0.25, 'LT', 'Dell', 'Latitude 7440', 1400, (12, 24, 36)),
+    (0.20, 'LT', 'Apple', 'MacBook Pro 14"', 2300, (12, 36)),
+    (0.20, 'LT', 'Lenovo', 'ThinkPad T14', 1300, (12, 24, 36)),
+    (0.10, 'DT', 'HP', 'EliteDesk 800', 900, (12, 36)),
+    (0.10, 'PH', 'Apple', 'iPhone 15', 950, (12, 24)),
+    (0.06, 'SRV', 'Dell', 'PowerEdge R760', 9000, (36, 60)),
+    (0.05, 'NET', 'Cisco', 'Catalyst 9300', 6000, (36, 60)),
+    (0.04, 'FW', 'Palo Alto', 'PA-440', 4000, (36, 60)),
+)
+ASSET_STATUSES = (('In Use', 'In Storage', 'In Repair', 'Awaiting Disposal', 'Disposed'), (0.75, 0.12, 0.05, 0.05, 0.03))
+
+PERIPHERAL_CATALOG = (
+    # (share, type, brand, median cost)
+    (0.30, 'Monitor', 'Dell', 300),
+    (0.20, 'Keyboard', 'Logitech', 80),
+    (0.20, 'Mouse', 'Logitech', 50),
+    (0.15, 'Headset', 'Jabra', 150),
+    (0.10, 'Docking Station', 'Dell', 220),
+    (0.05, 'Webcam', 'Logitech', 90),
+)
+
+SOFTWARE_CATALOG = (
+    ('Slack', 'Communication'), ('Zoom', 'Communication'), ('Jira', 'Development'), ('GitHub', 'Development'),
+    ('Figma', 'Design'), ('Adobe Creative Cloud', 'Design'), ('1Password', 'Security'), ('Okta', 'Security'),
+    ('Microsoft 365', 'Productivity'), ('Notion', 'Productivity'), ('Salesforce', 'CRM'), ('Datadog', 'Monitoring'),
+)
+
+SUBSCRIPTION_TYPES = (('SaaS', 'Software', 'Cloud', 'Domain', 'Support'), (0.6, 0.2, 0.1, 0.05, 0.05))
+# (period type, period value, share, median cost)
+RENEWAL_PERIODS = (('monthly', 1, 0.55, 200), ('yearly', 1, 0.40, 6000), ('custom', 90, 0.05, 500))
+
+PURCHASE_KINDS = (
+    'Laptop refresh', 'Monitor order', 'Network equipment', 'Server hardware',
+    'Office peripherals', 'Software licenses', 'Mobile devices', 'Spare parts',
+)
+
+INCIDENT_TITLES = (
+    'Phishing email reported', 'Lost laptop', 'Malware detected on endpoint', 'Suspicious login attempts',
+    'Misconfigured cloud storage bucket', 'Vendor data exposure', 'Unauthorized software installed',
+)
+INCIDENT_STATUSES = (('Investigating', 'Contained', 'Resolved', 'Closed'), (0.15, 0.10, 0.25, 0.50))
+SEVERITIES = (('SEV-3', 'SEV-2', 'SEV-1', 'SEV-0'), (0.5, 0.3, 0.15, 0.05))
+IMPACTS = ('Minor', 'Moderate', 'Significant', 'Extensive')
+
+COURSE_TITLES = (
+    'Cybersecurity Awareness', 'Data Protection (GDPR)', 'Phishing Simulation Debrief',
+    'Secure Coding', 'Acceptable Use Policy', 'Incident Reporting',
+)
+
+LINKABLE_TYPES = (('Asset', 'Subscription', 'Supplier', 'Software', 'Course'), (0.4, 0.2, 0.15, 0.15, 0.1))
+
+
+class _Generator:
+    """Random values for the scale seeder, reproducible for a given seed."""
+
+    def __init__(self, seed):
+        self.rng = np.random.default_rng(seed)
+        fake = Faker()
+        fake.seed_instance(seed)
+        # Faker is far too slow to call once per row: draw from pools instead
+        self.first_names = [fake.first_name() for _ in range(400)]
+        self.last_names = [fake.last_name() for _ in range(400)]
+        self.companies = [fake.company() for _ in range(400)]
+        self.cities = [fake.city() for _ in range(200)]
+        self.today = date.today()
+
+    def choice(self, options, n, p=None):
+        """n indexes into `options` (drawn with the given probabilities)."""
+        return self.rng.choice(len(options), size=n, p=p).tolist()
+
+    def pick(self, values, n, p=None):
+        """n values drawn from `values` (with the given probabilities)."""
+        return [values[i] for i in self.choice(values, n, p)]
+
+    def popular(self, ids, n, skew=1.1):
+        """
+        n ids drawn with a Zipf-like skew: a few suppliers, products or users
+        account for most of the rows, as in real inventories.
+        """
+        weights = 1.0 / np.arange(1, len(ids) + 1) ** skew
+        return self.pick(ids, n, weights / weights.sum())
+
+    def chance(self, probability, n):
+        return (self.rng.random(n) < probability).tolist()
+
+    def costs(self, median, n, sigma=0.35):
+        """Log-normally distributed amounts around `median`."""
+        return np.round(np.exp(self.rng.normal(np.log(median), sigma, n)), 2).tolist()
+
+    def days_ago(self, max_days, n, min_days=0):
+        """Dates spread uniformly over the last `max_days` days (negative values are in the future)."""
+        ordinal = self.today.toordinal()
+        return [date.fromordinal(ordinal - days) for days in self.rng.integers(min_days, max_days, n).tolist()]
+
+    def timestamps(self, dates):
+        """A datetime during the working day of each date."""
+        seconds = self.rng.integers(8 * 3600, 19 * 3600, len(dates)).tolist()
+        return [datetime(d.year, d.month, d.day) + timedelta(seconds=s) for d, s in zip(dates, seconds)]
+
+    def subsets(self, ids, n, mean_size, min_size=0):
+        """For n parents, a list of distinct ids each (Poisson-sized around mean_size)."""
+        sizes = np.clip(self.rng.poisson(mean_size - min_size, n) + min_size, 0, len(ids)).tolist()
+        pool = np.asarray(ids)
+        return [self.rng.choice(pool, size, replace=False).tolist() if size else [] for size in sizes]
+
+
+def _next_id(model):
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def _insert(table, rows, batch_size):
+    for offset in range(0, len(rows), batch_size):
+        db.session.execute(table.insert(), rows[offset:offset + batch_size])
+    return len(rows)
+
+
+def _sync_sequences(models):
+    """Moves the PostgreSQL id sequences past the explicit ids written by the seeder."""
+    if db.session.connection().dialect.name != 'postgresql':
+        return
+    for model in models:
+        table = model.__tablename__
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), (SELECT MAX(id) FROM \"{table}\"))"
+        ))
+
+
+def seed_scale(factor, seed=0, batch_size=BATCH_SIZE):
+    """
+    Adds a production-sized synthetic dataset to the database of the current
+    app context: about 8,000 rows per unit of `factor`. Rows are generated
+    column-wise with NumPy and written with Core executemany() in batches of
+    `batch_size`, with explicit primary keys so foreign keys can be wired up
+    without reading anything back. The existing data is kept.
+
+    Core inserts bypass the ORM hooks, so the renewal occurrences and the
+    search index are rebuilt at the end. Returns {table: rows inserted}.
+    """
+    gen = _Generator(seed)
+    rng = gen.rng
+    today = gen.today
+    counts = {}
+    n = {key: value * factor for key, value in PER_FACTOR.items()}
+
+    def write(model_or_table, rows):
+        table = getattr(model_or_table, '__table__', model_or_table)
+        counts[table.name] = counts.get(table.name, 0) + _insert(table, rows, batch_size)
+
+    # --- Suppliers, locations, budgets, payment methods ---
+    first = _next_id(Supplier)
+    supplier_ids = list(range(first, first + n['suppliers']))
+    compliance = gen.pick(('Compliant', 'Pending', 'Non-Compliant'), len(supplier_ids), (0.6, 0.3, 0.1))
+    signed = gen.days_ago(3 * 365, len(supplier_ids))
+    write(Supplier, [{
+        'id': supplier_id, 'name': gen.companies[i % len(gen.companies)],
+        'email': f"sales{supplier_id}@example.com",
+        'compliance_status': status, 'gdpr_dpa_signed': dpa if status == 'Compliant' else None,
+        'data_storage_region': region, 'created_at': created, 'is_archived': archived,
+    } for i, (supplier_id, status, dpa, region, created, archived) in enumerate(zip(
+        supplier_ids, compliance, signed, gen.pick(('EU', 'US', 'UK'), len(supplier_ids), (0.6, 0.3, 0.1)),
+        gen.timestamps(gen.days_ago(6 * 365, len(supplier_ids))), gen.chance(0.05, len(supplier_ids)),
+    ))])
+
+    first = _next_id(Location)
+    location_ids = list(range(first, first + n['locations']))
+    write(Location, [
+        {'id': location_id, 'name': f"{gen.cities[i % len(gen.cities)]} Office {location_id}", 'is_archived': False}
+        for i, location_id in enumerate(location_ids)
+    ])
+
+    first = _next_id(Budget)
+    budget_ids = list(range(first, first + n['budgets']))
+    write(Budget, [{
+        'id': budget_id, 'name': f"{category} {today.year} #{budget_id}", 'category': category,
+        'amount': amount, 'currency': 'EUR', 'period': 'Yearly',
+    } for budget_id, category, amount in zip(
+        budget_ids, gen.pick(('IT', 'Software', 'Security', 'Facilities'), len(budget_ids)),
+        gen.costs(100000, len(budget_ids), sigma=0.6),
+    )])
+
+    first = _next_id(PaymentMethod)
+    payment_method_ids = list(range(first, first + n['payment_methods']))
+    write(PaymentMethod, [{
+        'id': method_id, 'name': f"Corporate card {method_id}", 'method_type': 'Credit Card',
+        'details': f"Ends in {int(rng.integers(1000, 9999))}", 'expiry_date': expiry,
+    } for method_id, expiry in zip(payment_method_ids, gen.days_ago(-30, len(payment_method_ids), min_days=-1095))])
+
+    # --- People ---
+    first = _next_id(User)
+    user_ids = list(range(first, first + n['users']))
+    department_names = list(DEPARTMENTS)
+    departments = gen.pick(department_names, len(user_ids), [share for share, _ in DEPARTMENTS.values()])
+    archived_users = gen.chance(0.06, len(user_ids))
+    user_rows = []
+    for user_id, department, archived, role, created, first_name, last_name, title in zip(
+        user_ids, departments, archived_users,
+        gen.pick(('user', 'editor', 'admin'), len(user_ids), (0.95, 0.04, 0.01)),
+        gen.timestamps(gen.days_ago(6 * 365, len(user_ids))),
+        gen.pick(gen.first_names, len(user_ids)), gen.pick(gen.last_names, len(user_ids)),
+        rng.integers(0, 60, len(user_ids)).tolist(),
+    ):
+        titles = DEPARTMENTS[department][1]
+        user_rows.append({
+            'id': user_id, 'name': f"{first_name} {last_name}",
+            'email': f"{first_name}.{last_name}.{user_id}@example.com".lower().replace(' ', '').replace("'", ''),
+            'role': role, 'department': department, 'job_title': titles[title % len(titles)],
+            'must_change_password': False, 'created_at': created, 'is_archived': archived,
+        })
+    write(User, user_rows)
+    active_user_ids = [user_id for user_id, archived in zip(user_ids, archived_users) if not archived]
+
+    first = _next_id(Group)
+    group_ids = list(range(first, first + n['groups']))
+    group_departments = gen.pick(department_names, len(group_ids))
+    write(Group, [
+        {'id': group_id, 'name': f"{department} Team {group_id}", 'description': f"Members of the {department} team."}
+        for group_id, department in zip(group_ids, group_departments)
+    ])
+    write(user_groups, [
+        {'user_id': user_id, 'group_id': group_id}
+        for user_id, groups in zip(active_user_ids, gen.subsets(group_ids, len(active_user_ids), 1.8, min_size=1))
+        for group_id in groups
+    ])
+
+    # --- Purchases ---
+    first = _next_id(Purchase)
+    purchase_ids = list(range(first, first + n['purchases']))
+    purchase_dates = gen.days_ago(5 * 365, len(purchase_ids))
+    validated = gen.chance(0.6, len(purchase_ids))
+    write(Purchase, [{
+        'id': purchase_id, 'internal_id': f"PO-{purchase_id:07d}", 'invoice_number': f"INV-{purchase_id:07d}",
+        'description': f"{kind} {purchased.year}-Q{(purchased.month - 1) // 3 + 1}",
+        'purchase_date': purchased, 'supplier_id': supplier_id,
+        'payment_method_id': method_id, 'budget_id': budget_id,
+        'validated_cost': cost if is_validated else None,
+        'cost_validated_at': validated_at if is_validated else None,
+        'created_at': created, 'is_archived': False,
+    } for purchase_id, kind, purchased, supplier_id, method_id, budget_id, cost, is_validated, validated_at, created in zip(
+        purchase_ids, gen.pick(PURCHASE_KINDS, len(purchase_ids)), purchase_dates,
+        gen.popular(supplier_ids, len(purchase_ids)), gen.pick(payment_method_ids, len(purchase_ids)),
+        gen.pick(budget_ids, len(purchase_ids)), gen.costs(8000, len(purchase_ids), sigma=0.9), validated,
+        gen.timestamps([d + timedelta(days=14) for d in purchase_dates]), gen.timestamps(purchase_dates),
+    )])
+
+    # --- Assets and peripherals ---
+    first = _next_id(Asset)
+    asset_ids = list(range(first, first + n['assets']))
+    catalog = gen.choice(ASSET_CATALOG, len(asset_ids), [item[0] for item in ASSET_CATALOG])
+    asset_purchase_dates = gen.days_ago(5 * 365, len(asset_ids))
+    asset_rows = []
+    for (asset_id, item, status, purchased, updated, user_id, location_id, supplier_id, purchase_id, has_purchase,
+         currency, noise, warranty) in zip(
+        asset_ids, catalog, gen.pick(ASSET_STATUSES[0], len(asset_ids), ASSET_STATUSES[1]),
+        asset_purchase_dates, gen.timestamps(asset_purchase_dates), gen.pick(active_user_ids, len(asset_ids)),
+        gen.pick(location_ids, len(asset_ids)), gen.popular(supplier_ids, len(asset_ids)),
+        gen.pick(purchase_ids, len(asset_ids)), gen.chance(0.6, len(asset_ids)),
+        gen.pick(CURRENCIES[0], len(asset_ids), CURRENCIES[1]),
+        np.exp(rng.normal(0, 0.2, len(asset_ids))).tolist(), rng.integers(0, 60, len(asset_ids)).tolist(),
+    ):
+        _, prefix, brand, model, median_cost, warranties = ASSET_CATALOG[item]
+        warranty = warranties[warranty % len(warranties)]
+        asset_rows.append({
+            'id': asset_id, 'name': f"{prefix}-{asset_id:06d}", 'brand': brand, 'model': model,
+            'serial_number': f"SN{asset_id:09d}", 'internal_id': f"AST-{asset_id:07d}", 'status': status,
+            'purchase_date': purchased, 'cost': round(median_cost * noise, 2), 'currency': currency,
+            'warranty_length': warranty, 'warranty_end_date': compute_warranty_end_date(purchased, warranty),
+            'user_id': user_id if status == 'In Use' else None, 'location_id': location_id,
+            'supplier_id': supplier_id, 'purchase_id': purchase_id if has_purchase else None,
+            'is_archived': status == 'Disposed', 'created_at': updated, 'updated_at': updated,
+        })
+    write(Asset, asset_rows)
+    in_use_assets = [(row['id'], row['user_id']) for row in asset_rows if row['user_id']]
+    del asset_rows
+
+    first = _next_id(Peripheral)
+    peripheral_ids = list(range(first, first + n['peripherals']))
+    catalog = gen.choice(PERIPHERAL_CATALOG, len(peripheral_ids), [item[0] for item in PERIPHERAL_CATALOG])
+    peripheral_purchase_dates = gen.days_ago(5 * 365, len(peripheral_ids))
+    # Most peripherals sit on a desk next to an assigned laptop
+    attached = gen.pick(in_use_assets, len(peripheral_ids)) if in_use_assets else [(None, None)] * len(peripheral_ids)
+    peripheral_rows = []
+    for peripheral_id, item, purchased, updated, (asset_id, user_id), is_attached, status, supplier_id, cost_noise in zip(
+        peripheral_ids, catalog, peripheral_purchase_dates, gen.timestamps(peripheral_purchase_dates),
+        attached, gen.chance(0.7, len(peripheral_ids)),
+        gen.pick(ASSET_STATUSES[0][:3], len(peripheral_ids), (0.8, 0.15, 0.05)),
+        gen.popular(supplier_ids, len(peripheral_ids)), np.exp(rng.normal(0, 0.25, len(peripheral_ids))).tolist(),
+    ):
+        _, peripheral_type, brand, median_cost = PERIPHERAL_CATALOG[item]
+        peripheral_rows.append({
+            'id': peripheral_id, 'name': f"{peripheral_type}-{peripheral_id:06d}", 'type': peripheral_type,
+            'brand': brand, 'serial_number': f"PSN{peripheral_id:09d}", 'status': status,
+            'purchase_date': purchased, 'warranty_length': 24,
+            'warranty_end_date': compute_warranty_end_date(purchased, 24),
+            'cost': round(median_cost * cost_noise, 2), 'currency': 'EUR',
+            'asset_id': asset_id if is_attached else None, 'user_id': user_id if is_attached else None,
+            'supplier_id': supplier_id, 'is_archived': False, 'created_at': updated, 'updated_at': updated,
+        })
+    write(Peripheral, peripheral_rows)
+    del peripheral_rows
+
+    # --- Software, subscriptions and licenses ---
+    first = _next_id(Software)
+    software_ids = list(range(first, first + n['software']))
+    products = dict(zip(software_ids, gen.choice(SOFTWARE_CATALOG, len(software_ids))))
+    write(Software, [{
+        'id': software_id, 'name': f"{SOFTWARE_CATALOG[product][0]} {software_id}",
+        'category': SOFTWARE_CATALOG[product][1], 'owner_id': owner_id, 'owner_type': 'Group',
+        'supplier_id': supplier_id, 'is_archived': False,
+    } for software_id, product, owner_id, supplier_id in zip(
+        software_ids, products.values(), gen.pick(group_ids, len(software_ids)), gen.popular(supplier_ids, len(software_ids))
+    )])
+
+    first = _next_id(Subscription)
+    subscription_ids = list(range(first, first + n['subscriptions']))
+    periods = gen.choice(RENEWAL_PERIODS, len(subscription_ids), [period[2] for period in RENEWAL_PERIODS])
+    # How many price changes each subscription went through (about one every year or two)
+    changes = rng.poisson(1.2, len(subscription_ids)).tolist()
+    subscription_rows, history_rows = [], []
+    for subscription_id, period, change_count, kind, supplier_id, software_id, currency, auto_renew, archived in zip(
+        subscription_ids, periods, changes, gen.pick(SUBSCRIPTION_TYPES[0], len(subscription_ids), SUBSCRIPTION_TYPES[1]),
+        gen.popular(supplier_ids, len(subscription_ids)), gen.popular(software_ids, len(subscription_ids)),
+        gen.pick(CURRENCIES[0], len(subscription_ids), CURRENCIES[1]),
+        gen.chance(0.7, len(subscription_ids)), gen.chance(0.08, len(subscription_ids)),
+    ):
+        period_type, period_value, _, median_cost = RENEWAL_PERIODS[period]
+        period_days = {'monthly': 30, 'yearly': 365}.get(period_type, period_value)
+        started = today - timedelta(days=int(rng.integers(30, 365)) + 365 * change_count)
+        # Walk the price history forward from the first cost: mostly increases of a few percent
+        cost = float(gen.costs(median_cost, 1, sigma=0.8)[0])
+        changed_date = started
+        for step in range(change_count + 1):
+            if step:
+                cost = round(cost * (1 + float(rng.normal(0.06, 0.04))), 2)
+                changed_date = min(changed_date + timedelta(days=int(rng.integers(300, 430))), today)
+            history_rows.append({'subscription_id': subscription_id, 'cost': cost, 'currency': currency,
+                                 'changed_date': changed_date})
+        created = gen.timestamps([started])[0]
+        subscription_rows.append({
+            'id': subscription_id, 'name': f"{SOFTWARE_CATALOG[products[software_id]][0]} {kind} {subscription_id}",
+            'subscription_type': kind, 'renewal_date': today + timedelta(days=int(rng.integers(0, period_days))),
+            'renewal_period_type': period_type, 'renewal_period_value': period_value,
+            'monthly_renewal_day': 'last' if period_type == 'monthly' and rng.random() < 0.1 else None,
+            'auto_renew': auto_renew, 'cost': cost, 'currency': currency,
+            'supplier_id': supplier_id, 'software_id': software_id if rng.random() < 0.5 else None,
+            'is_archived': archived, 'created_at': created, 'updated_at': created,
+        })
+    write(Subscription, subscription_rows)
+    write(CostHistory, history_rows)
+    del subscription_rows, history_rows
+
+    first = _next_id(License)
+    license_ids = list(range(first, first + n['licenses']))
+    license_purchase_dates = gen.days_ago(3 * 365, len(license_ids))
+    license_created = gen.timestamps(license_purchase_dates)
+    write(License, [{
+        'id': license_id, 'name': f"Seat {license_id}", 'license_key': f"KEY-{license_id:010d}",
+        'cost': cost, 'currency': 'EUR', 'purchase_date': purchased,
+        'expiry_date': None if perpetual else purchased + timedelta(days=365 * term),
+        'user_id': user_id if assigned else None, 'purchase_id': purchase_id if has_purchase else None,
+        'subscription_id': subscription_id if has_subscription else None,
+        'software_id': software_id, 'is_archived': False, 'created_at': created,
+    } for license_id, cost, purchased, created, perpetual, term, user_id, assigned, purchase_id, has_purchase,
+          subscription_id, has_subscription, software_id in zip(
+        license_ids, gen.costs(150, len(license_ids), sigma=0.7), license_purchase_dates, license_created,
+        gen.chance(0.2, len(license_ids)), gen.pick((1, 1, 1, 3), len(license_ids)),
+        gen.pick(active_user_ids, len(license_ids)), gen.chance(0.85, len(license_ids)),
+        gen.pick(purchase_ids, len(license_ids)), gen.chance(0.3, len(license_ids)),
+        gen.pick(subscription_ids, len(license_ids)), gen.chance(0.4, len(license_ids)),
+        gen.popular(software_ids, len(license_ids)),
+    )])
+
+    # --- Training ---
+    first = _next_id(Course)
+    course_ids = list(range(first, first + n['courses']))
+    write(Course, [{
+        'id': course_id, 'title': f"{COURSE_TITLES[i % len(COURSE_TITLES)]} {course_id}",
+        'link': f"https://training.example.com/courses/{course_id}", 'completion_days': 30,
+    } for i, course_id in enumerate(course_ids)])
+
+    first = _next_id(CourseAssignment)
+    pairs = [
+        (user_id, course_id)
+        for user_id, courses in zip(active_user_ids, gen.subsets(course_ids, len(active_user_ids), COURSES_PER_USER))
+        for course_id in courses
+    ]
+    assigned_dates = gen.days_ago(365, len(pairs))
+    assignment_rows, completion_rows = [], []
+    # Two thirds are completed, a few of them after the due date
+    for assignment_id, (user_id, course_id), assigned, days_taken, is_completed in zip(
+        range(first, first + len(pairs)), pairs, assigned_dates,
+        rng.integers(1, 40, len(pairs)).tolist(), gen.chance(0.66, len(pairs)),
+    ):
+        assignment_rows.append({'id': assignment_id, 'course_id': course_id, 'user_id': user_id,
+                                'assigned_date': assigned, 'due_date': assigned + timedelta(days=30)})
+        completed = assigned + timedelta(days=days_taken)
+        if is_completed and completed <= today:
+            completion_rows.append({'assignment_id': assignment_id, 'completion_date': completed})
+    write(CourseAssignment, assignment_rows)
+    write(CourseCompletion, completion_rows)
+    del assignment_rows, completion_rows
+
+    # --- Security incidents ---
+    first = _next_id(SecurityIncident)
+    incident_ids = list(range(first, first + n['incidents']))
+    severities = gen.choice(SEVERITIES[0], len(incident_ids), SEVERITIES[1])
+    incident_dates = gen.timestamps(gen.days_ago(3 * 365, len(incident_ids)))
+    incident_statuses = gen.pick(INCIDENT_STATUSES[0], len(incident_ids), INCIDENT_STATUSES[1])
+    write(SecurityIncident, [{
+        'id': incident_id, 'title': f"{title} (#{incident_id})", 'description': f"{title}. Reported to the security team.",
+        'incident_date': happened, 'status': status, 'severity': SEVERITIES[0][severity],
+        # Lower SEV numbers are more severe and tend to have a wider impact
+        'impact': IMPACTS[min(3 - severity + int(rng.integers(0, 2)), 3)],
+        'data_breach': bool(rng.random() < 0.05), 'third_party_impacted': bool(rng.random() < 0.1),
+        'created_at': happened,
+        'resolved_at': happened + timedelta(hours=float(rng.exponential(72))) if status in ('Resolved', 'Closed') else None,
+        'reported_by_id': reporter, 'owner_id': owner,
+    } for incident_id, title, happened, status, severity, reporter, owner in zip(
+        incident_ids, gen.pick(INCIDENT_TITLES, len(incident_ids)), incident_dates, incident_statuses, severities,
+        gen.pick(active_user_ids, len(incident_ids)), gen.pick(active_user_ids, len(incident_ids)),
+    )])
+    write(incident_users, [
+        {'incident_id': incident_id, 'user_id': user_id}
+        for incident_id, users in zip(incident_ids, gen.subsets(active_user_ids, len(incident_ids), 1.5, min_size=1))
+        for user_id in users
+    ])
+    write(incident_assets, [
+        {'incident_id': incident_id, 'asset_id': asset_id}
+        for incident_id, assets in zip(incident_ids, gen.subsets(asset_ids, len(incident_ids), 1.0))
+        for asset_id in assets
+    ])
+
+    # --- Compliance ---
+    first = _next_id(Framework)
+    write(Framework, [{'id': first, 'name': f"Scale Test Framework {first}", 'is_custom': True, 'is_active': True,
+                       'description': 'Synthetic controls for load testing.'}])
+    first_control = _next_id(FrameworkControl)
+    control_ids = list(range(first_control, first_control + FRAMEWORK_CONTROLS))
+    write(FrameworkControl, [
+        {'id': control_id, 'framework_id': first, 'control_id': f"STF.{i // 10 + 1}.{i % 10 + 1}", 'name': f"Control {i + 1}"}
+        for i, control_id in enumerate(control_ids)
+    ])
+    linkable_ids = {'Asset': asset_ids, 'Subscription': subscription_ids, 'Supplier': supplier_ids,
+                    'Software': software_ids, 'Course': course_ids}
+    linkable_types = gen.pick(LINKABLE_TYPES[0], n['compliance_links'], LINKABLE_TYPES[1])
+    write(ComplianceLink, [{
+        'framework_control_id': control_id, 'linkable_type': linkable_type,
+        'linkable_id': linkable_ids[linkable_type][int(rng.integers(len(linkable_ids[linkable_type])))],
+        'description': f"{linkable_type} evidence for the control.",
+    } for control_id, linkable_type in zip(gen.popular(control_ids, len(linkable_types), skew=0.5), linkable_types)])
+
+    _sync_sequences([Supplier, Location, Budget, PaymentMethod, User, Group, Purchase, Asset, Peripheral, Software,
+                     Subscription, CostHistory, License, Course, CourseAssignment, CourseCompletion,
+                     SecurityIncident, Framework, FrameworkControl, ComplianceLink])
+    db.session.commit()
+
+    # Core inserts skip the ORM hooks that maintain these tables
+    counts['renewal_occurrence'] = renewal_index.rebuild_renewal_occurrences()
+    counts['search_document'] = search_index.rebuild_search_index()
+    return counts
@@ -0,0 +1,236 @@
+import base64
+import json
+from datetime import date, datetime
+from flask import render_template, jsonify
+from sqlalchemy import func, or_, and_, literal
+from .extensions import db
+
+# Page sizes offered by the list views; requests are clamped to the largest
+PAGE_SIZES = (10, 25, 50, 100)
+DEFAULT_PAGE_SIZE = 25
+
+
+class TableColumn:
+    """
+    A column of a server-side table.
+
+    `expression` is what the column sorts and filters on. Nullable sort
+    columns need a `null_value` so keyset comparisons never meet a NULL.
+    `filter` is None, 'contains' (case-insensitive substring), 'exact'
+    (rendered as a select of the column's distinct values) or 'min' (numeric
+    lower bound).
+    """
+
+    def __init__(self, expression, sortable=True, searchable=False, filter=None, null_value=None):
+        self.expression = expression
+        self.sortable = sortable
+        self.searchable = searchable
+        self.filter = filter
+        self.null_value = null_value
+
+    @property
+    def sort_expression(self):
+        if self.null_value is None:
+            return self.expression
+        return func.coalesce(self.expression, literal(self.null_value, type_=self.expression.type))
+
+
+class TablePage:
+    def __init__(self, rows, total, filtered, next_cursor, sort, direction, per_page, filters, search):
+        self.rows = rows
+        self.total = total
+        self.filtered = filtered
+        self.next_cursor = next_cursor
+        self.sort = sort
+        self.direction = direction
+        self.per_page = per_page
+        self.filters = filters
+        self.search = search
+
+
+def _encode_cursor(value, row_id):
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    raw = json.dumps([value, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _decode_cursor(cursor, python_type):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, row_id = json.loads(raw)
+        if python_type is datetime and value is not None:
+            value = datetime.fromisoformat(value)
+        elif python_type is date and value is not None:
+            value = date.fromisoformat(value)
+        return value, int(row_id)
+    except (ValueError, TypeError):
+        return None
+
+
+class ServerTable:
+    """
+    Server-side paging, sorting and filtering for a list view.
+
+    Pages are fetched with keyset pagination on (sort column, id): the cursor
+    encodes the last row of the previous page, so every page costs an index
+    range scan instead of an OFFSET over everything before it. Rows are
+    rendered by `rows_template`, both for the first page embedded in the list
+    view and for the JSON responses the table fetches afterwards.
+
+    `options` is a callable returning the loader options for the rows; it is
+    called per query because relationships declared through backrefs only
+    exist once the mappers are configured.
+    """
+
+    page_sizes = PAGE_SIZES
+
+    def __init__(self, model, columns, rows_template, default_sort, default_direction='asc',
+                 base_filters=(), joins=(), options=None):
+        self.model = model
+        self.columns = columns
+        self.rows_template = rows_template
+        self.default_sort = default_sort
+        self.default_direction = default_direction
+        self.base_filters = base_filters
+        self.joins = joins
+        self.options = options
+
+    @property
+    def id_column(self):
+        return self.model.id
+
+    def _base_query(self):
+        query = self.model.query
+        for target, onclause in self.joins:
+            query = query.outerjoin(target, onclause)
+        return query.filter(*self.base_filters)
+
+    def _filtered_query(self, filters, search):
+        query = self._base_query()
+        for key, value in filters.items():
+            column = self.columns[key]
+            if column.filter == 'exact':
+                query = query.filter(column.expression == value)
+            elif column.filter == 'min':
+                query = query.filter(column.sort_expression >= value)
+            else:
+                query = query.filter(column.expression.icontains(value, autoescape=True))
+        if search:
+            searchable = [column.expression for column in self.columns.values() if column.searchable]
+            query = query.filter(or_(*[expression.icontains(search, autoescape=True) for expression in searchable]))
+        return query
+
+    def page(self, args):
+        """Returns a TablePage for the request arguments (sort, direction, per_page, cursor, q, filter[<column>])."""
+        sort = args.get('sort', self.default_sort)
+        if sort not in self.columns or not self.columns[sort].sortable:
+            sort = self.default_sort
+        direction = args.get('direction', self.default_direction)
+        if direction not in ('asc', 'desc'):
+            direction = self.default_direction
+        per_page = min(max(args.get('per_page', DEFAULT_PAGE_SIZE, type=int) or DEFAULT_PAGE_SIZE, 1), PAGE_SIZES[-1])
+        search = args.get('q', '').strip()
+        filters = {}
+        for key, column in self.columns.items():
+            value = args.get(f'filter[{key}]', '').strip()
+            if value and column.filter == 'min':
+                try:
+                    filters[key] = float(value)
+                except ValueError:
+                    pass
+            elif value and column.filter:
+                filters[key] = value
+
+        total = self._base_query().order_by(None).count()
+        query = self._filtered_query(filters, search)
+        filtered = query.order_by(None).count() if filters or search else total
+
+        sort_expression = self.columns[sort].sort_expression
+        id_column = self.id_column
+        cursor = args.get('cursor')
+        position = _decode_cursor(cursor, sort_expression.type.python_type) if cursor else None
+        if position:
+            value, last_id = position
+            if direction == 'asc':
+                query = query.filter(or_(sort_expression > value, and_(sort_expression == value, id_column > last_id)))
+            else:
+                query = query.filter(or_(sort_expression < value, and_(sort_expression == value, id_column < last_id)))
+
+        if direction == 'asc':
+            query = query.order_by(sort_expression.asc(), id_column.asc())
+        else:
+            query = query.order_by(sort_expression.desc(), id_column.desc())
+
+        # One extra row tells whether there is a next page
+        rows = self._fetch(query, sort_expression, per_page + 1)
+        next_cursor = None
+        if len(rows) > per_page:
+            rows = rows[:per_page]
+            _, last_value, last_id = rows[-1]
+            next_cursor = _encode_cursor(last_value, last_id)
+
+        return TablePage([row for row, _, _ in rows], total, filtered, next_cursor, sort, direction, per_page, filters, search)
+
+    def _fetch(self, query, sort_expression, limit):
+        """Returns (row, sort value, id) for the first `limit` rows of the query."""
+        rows = query.add_columns(sort_expression).options(*(self.options() if self.options else ())).limit(limit).all()
+        return [(row, value, row.id) for row, value in rows]
+
+    def filter_options(self):
+        """Distinct values of the 'exact' filter columns, for their select boxes."""
+        options = {}
+        for key, column in self.columns.items():
+            if column.filter == 'exact':
+                values = self._base_query().with_entities(column.expression).filter(
+                    column.expression.isnot(None)
+                ).distinct().order_by(column.expression).all()
+                options[key] = [value for value, in values]
+        return options
+
+    def render(self, template, args, **context):
+        """Renders a list view with the first page of rows embedded."""
+        page = self.page(args)
+        return render_template(template, table=self, page=page, rows=page.rows,
+                               filter_options=self.filter_options(), **context)
+
+    def render_rows(self, page):
+        return render_template(self.rows_template, rows=page.rows)
+
+    def json_response(self, args):
+        """The JSON payload fetched by static/js/server_table.js."""
+        page = self.page(args)
+        return jsonify({
+            'rows_html': self.render_rows(page),
+            'count': len(page.rows),
+            'total': page.total,
+            'filtered': page.filtered,
+            'next_cursor': page.next_cursor,
+            'sort': page.sort,
+            'direction': page.direction,
+            'per_page': page.per_page,
+        })
+
+
+class ProjectionTable(ServerTable):
+    """
+    A ServerTable over a column projection (e.g. a UNION ALL subquery) rather
+    than a mapped model. Rows are plain result rows, and `key` names a unique
+    integer column of the projection used as the keyset tiebreaker.
+    """
+
+    def __init__(self, projection, columns, rows_template, default_sort, default_direction='asc', key='id'):
+        super().__init__(None, columns, rows_template, default_sort, default_direction)
+        self.projection = projection
+        self.key = key
+
+    @property
+    def id_column(self):
+        return self.projection.c[self.key]
+
+    def _base_query(self):
+        return db.session.query(self.projection)
+
+    def _fetch(self, query, sort_expression, limit):
+        rows = query.add_columns(sort_expression).limit(limit).all()
+        return [(row, row[-1], getattr(row, self.key)) for row in rows]
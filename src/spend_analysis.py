@@ -0,0 +1,164 @@
+from datetime import date, datetime
+from sqlalchemy import select, union_all, literal, func, or_
+
+from .extensions import db
+from .models import (
+    Asset, Peripheral, License, Software, Supplier, User, Location, Purchase, user_groups, CURRENCY_RATES
+)
+from .server_table import ProjectionTable, TableColumn
+
+ITEM_TYPES = ('assets', 'peripherals', 'licenses')
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+    except ValueError:
+        return None
+
+
+class SpendFilters:
+    """The spend analysis filters, read from the query string."""
+
+    def __init__(self, args):
+        self.start_date = _parse_date(args.get('start_date'))
+        self.end_date = _parse_date(args.get('end_date'))
+        self.item_type = args.get('item_type', 'all')
+        if self.item_type not in ITEM_TYPES:
+            self.item_type = 'all'
+        self.supplier_id = args.get('supplier_id', type=int)
+        self.brand = args.get('brand') or None  # Assets and peripherals only
+        self.user_id = args.get('user_id', type=int)
+        self.group_id = args.get('group_id', type=int)
+        self.location_id = args.get('location_id', type=int)  # Assets only
+
+    @property
+    def args(self):
+        """The active filters as query arguments, to carry them over to table pages and exports."""
+        args = {
+            'start_date': self.start_date.isoformat() if self.start_date else None,
+            'end_date': self.end_date.isoformat() if self.end_date else None,
+            'item_type': self.item_type if self.item_type != 'all' else None,
+            'supplier_id': self.supplier_id,
+            'brand': self.brand,
+            'user_id': self.user_id,
+            'group_id': self.group_id,
+            'location_id': self.location_id,
+        }
+        return {key: value for key, value in args.items() if value is not None}
+
+    def includes(self, item_type):
+        return self.item_type in ('all', item_type)
+
+    def user_condition(self, user_column):
+        """Items of the selected user, or of the active members of the selected group (either matches)."""
+        conditions = []
+        if self.user_id:
+            conditions.append(user_column == self.user_id)
+        if self.group_id:
+            members = select(user_groups.c.user_id).join(User, User.id == user_groups.c.user_id).where(
+                user_groups.c.group_id == self.group_id, User.is_archived == False
+            )
+            conditions.append(user_column.in_(members))
+        return or_(*conditions) if conditions else None
+
+
+def _branch(type_label, position, model, detail, supplier_id, location, joins, conditions, filters):
+    """
+    One SELECT of the UNION ALL. Every branch projects the same columns; row_key
+    (id * number of types + position) is unique across the union, for keyset paging.
+    """
+    stmt = select(
+        literal(type_label).label('type'),
+        model.id.label('id'),
+        (model.id * len(ITEM_TYPES) + position).label('row_key'),
+        model.name.label('name'),
+        detail.label('detail'),
+        model.purchase_date.label('purchase_date'),
+        model.cost.label('cost'),
+        model.currency.label('currency'),
+        Supplier.name.label('supplier'),
+        User.name.label('user'),
+        location.label('location'),
+    ).select_from(model)
+    for target, onclause in joins:
+        stmt = stmt.outerjoin(target, onclause)
+    stmt = stmt.outerjoin(Supplier, supplier_id == Supplier.id).outerjoin(User, model.user_id == User.id)
+    stmt = stmt.where(model.is_archived == False, *conditions)
+
+    if filters.start_date:
+        stmt = stmt.where(model.purchase_date >= filters.start_date)
+    if filters.end_date:
+        stmt = stmt.where(model.purchase_date <= filters.end_date)
+    if filters.supplier_id:
+        stmt = stmt.where(supplier_id == filters.supplier_id)
+    user_condition = filters.user_condition(model.user_id)
+    if user_condition is not None:
+        stmt = stmt.where(user_condition)
+    return stmt
+
+
+def spend_items(filters):
+    """
+    The purchased items matching `filters` as a single UNION ALL subquery
+    (type, id, row_key, name, detail, purchase_date, cost, currency, supplier,
+    user, location). Filters are applied inside each branch, so the database
+    can use the per-table indexes before the rows are combined.
+    """
+    branches = []
+    if filters.includes('assets'):
+        conditions = []
+        if filters.brand:
+            conditions.append(Asset.brand == filters.brand)
+        if filters.location_id:
+            conditions.append(Asset.location_id == filters.location_id)
+        branches.append(_branch(
+            'Asset', 0, Asset, Asset.brand, Asset.supplier_id, Location.name,
+            [(Location, Asset.location_id == Location.id)], conditions, filters
+        ))
+    if filters.includes('peripherals'):
+        conditions = [Peripheral.brand == filters.brand] if filters.brand else []
+        branches.append(_branch(
+            'Peripheral', 1, Peripheral, Peripheral.brand, Peripheral.supplier_id, db.null(),
+            [], conditions, filters
+        ))
+    if filters.includes('licenses'):
+        # Only standalone (perpetual) licenses with a cost; their supplier is the purchase's
+        branches.append(_branch(
+            'License', 2, License, Software.name, Purchase.supplier_id, db.null(),
+            [(Software, License.software_id == Software.id), (Purchase, License.purchase_id == Purchase.id)],
+            [License.subscription_id.is_(None), License.cost.isnot(None)], filters
+        ))
+    return union_all(*branches).subquery('spend_items')
+
+
+def spend_totals(items):
+    """
+    Returns (by_currency, total_eur): the item count and summed cost per
+    currency, aggregated in SQL, and their sum converted to EUR.
+    """
+    by_currency = db.session.query(
+        func.coalesce(items.c.currency, 'EUR'), func.count(), func.coalesce(func.sum(items.c.cost), 0.0)
+    ).group_by(func.coalesce(items.c.currency, 'EUR')).order_by(func.coalesce(items.c.currency, 'EUR')).all()
+    total_eur = sum(total * CURRENCY_RATES.get(currency, 1.0) for currency, _, total in by_currency)
+    return by_currency, total_eur
+
+
+def spend_table(items):
+    """The results table of the spend analysis, paged on the server."""
+    columns = items.c
+    return ProjectionTable(
+        items,
+        {
+            'type': TableColumn(columns.type, filter='exact'),
+            'name': TableColumn(columns.name, searchable=True, filter='contains'),
+            'detail': TableColumn(columns.detail, searchable=True, filter='contains', null_value=''),
+            'user': TableColumn(columns.user, searchable=True, filter='contains', null_value=''),
+            'purchase_date': TableColumn(columns.purchase_date, null_value=date.min),
+            'cost': TableColumn(columns.cost, filter='min', null_value=0.0),
+        },
+        'reports/_spend_rows.html',
+        default_sort='purchase_date',
+        default_direction='desc',
+        key='row_key',
+    )
@@ -166,4 +166,36 @@ document.addEventListener('DOMContentLoaded', function() {
             }
         });
     }
+
+    const portfolioTrendCtx = document.getElementById('portfolioTrendChart');
+    if (portfolioTrendCtx) {
+        new Chart(portfolioTrendCtx.getContext('2d'), {
+            type: 'line',
+            data: {
+                labels: JSON.parse(portfolioTrendCtx.dataset.labels || '[]'),
+                datasets: [
+                    {
+                        label: 'Original Value (€)',
+                        data: JSON.parse(portfolioTrendCtx.dataset.valuesOriginal || '[]'),
+                        borderColor: 'rgba(54, 162, 235, 1)',
+                        backgroundColor: 'rgba(54, 162, 235, 0.1)',
+                        tension: 0.1
+                    },
+                    {
+                        label: 'Book Value (€)',
+                        data: JSON.parse(portfolioTrendCtx.dataset.valuesBook || '[]'),
+                        borderColor: 'rgba(255, 99, 132, 1)',
+                        backgroundColor: 'rgba(255, 99, 132, 0.1)',
+                        fill: true,
+                        tension: 0.1
+                    }
+                ]
+            },
+            options: {
+                responsive: true,
+                plugins: { legend: { position: 'top' } },
+                scales: { y: { beginAtZero: true } }
+            }
+        });
+    }
 });
\ No newline at end of file
@@ -0,0 +1,247 @@
+/**
+ * Server-side tables: remote paging, sorting and filtering for list views.
+ *
+ * Tables marked with data-server-table="<json url>" are wrapped in the same
+ * markup simple-datatables renders (so they share its stylesheet), but every
+ * page is fetched from the server. The first page is rendered into the
+ * table by the view itself; see src/server_table.py for the JSON payload.
+ *
+ * Pages are keyset-paginated: the server returns a cursor for the next page,
+ * and the cursors of the pages already visited are kept to go back.
+ */
+class ServerTable {
+    constructor(table) {
+        this.table = table;
+        this.url = table.dataset.serverTable;
+        this.tbody = table.querySelector('tbody');
+        this.state = {
+            sort: table.dataset.sort,
+            direction: table.dataset.direction,
+            perPage: parseInt(table.dataset.perPage, 10),
+            q: '',
+            filters: {},
+            cursor: null,
+        };
+        this.history = [];
+        this.result = {
+            count: parseInt(table.dataset.count, 10),
+            total: parseInt(table.dataset.total, 10),
+            filtered: parseInt(table.dataset.filtered, 10),
+            next_cursor: table.dataset.nextCursor || null,
+        };
+        this.requestId = 0;
+
+        this.buildWrapper();
+        this.buildHeaders();
+        this.renderFooter();
+    }
+
+    buildWrapper() {
+        const wrapper = document.createElement('div');
+        wrapper.className = 'datatable-wrapper';
+        wrapper.innerHTML = `
+            <div class="datatable-top">
+                <div class="datatable-dropdown">
+                    <label><select class="datatable-selector"></select> entries per page</label>
+                </div>
+                <div class="datatable-search">
+                    <input class="datatable-input" placeholder="Search..." type="search">
+                </div>
+            </div>
+            <div class="datatable-container"></div>
+            <div class="datatable-bottom">
+                <div class="datatable-info"></div>
+                <nav class="datatable-pagination"><ul class="datatable-pagination-list"></ul></nav>
+            </div>`;
+        this.table.parentNode.insertBefore(wrapper, this.table);
+        wrapper.querySelector('.datatable-container').appendChild(this.table);
+        this.table.classList.add('datatable-table');
+
+        const selector = wrapper.querySelector('.datatable-selector');
+        JSON.parse(this.table.dataset.pageSizes).forEach(size => {
+            const option = new Option(size, size, false, size === this.state.perPage);
+            selector.appendChild(option);
+        });
+        selector.addEventListener('change', () => {
+            this.state.perPage = parseInt(selector.value, 10);
+            this.reload();
+        });
+
+        let searchTimeout;
+        wrapper.querySelector('.datatable-input').addEventListener('input', event => {
+            clearTimeout(searchTimeout);
+            searchTimeout = setTimeout(() => {
+                this.state.q = event.target.value.trim();
+                this.reload();
+            }, 300);
+        });
+
+        this.info = wrapper.querySelector('.datatable-info');
+        this.pager = wrapper.querySelector('.datatable-pagination-list');
+    }
+
+    buildHeaders() {
+        const headings = this.table.querySelectorAll('thead th');
+
+        headings.forEach(th => {
+            if (th.dataset.sort) {
+                const button = document.createElement('button');
+                button.className = 'datatable-sorter';
+                button.type = 'button';
+                button.textContent = th.textContent.trim();
+                th.textContent = '';
+                th.appendChild(button);
+                th.setAttribute('data-sortable', 'true');
+                button.addEventListener('click', () => {
+                    if (this.state.sort === th.dataset.sort) {
+                        this.state.direction = this.state.direction === 'asc' ? 'desc' : 'asc';
+                    } else {
+                        this.state.sort = th.dataset.sort;
+                        this.state.direction = 'asc';
+                    }
+                    this.reload();
+                });
+            }
+        });
+
+        if ([...headings].some(th => th.dataset.filter)) {
+            const row = document.createElement('tr');
+            row.className = 'datatable-filters';
+            headings.forEach(th => {
+                const cell = document.createElement('th');
+                if (th.dataset.filter) {
+                    cell.appendChild(this.buildFilter(th));
+                }
+                row.appendChild(cell);
+            });
+            this.table.querySelector('thead').appendChild(row);
+        }
+        this.markSortedHeading();
+    }
+
+    buildFilter(th) {
+        const key = th.dataset.column;
+        let control;
+        if (th.dataset.filter === 'exact') {
+            control = document.createElement('select');
+            control.className = 'form-select form-select-sm';
+            control.appendChild(new Option('All', ''));
+            JSON.parse(th.dataset.filterOptions || '[]').forEach(value => control.appendChild(new Option(value, value)));
+            control.addEventListener('change', () => this.setFilter(key, control.value));
+        } else {
+            control = document.createElement('input');
+            control.className = 'form-control form-control-sm';
+            if (th.dataset.filter === 'min') {
+                control.type = 'number';
+                control.step = 'any';
+                control.placeholder = 'Min...';
+            } else {
+                control.type = 'search';
+                control.placeholder = 'Filter...';
+            }
+            let filterTimeout;
+            control.addEventListener('input', () => {
+                clearTimeout(filterTimeout);
+                filterTimeout = setTimeout(() => this.setFilter(key, control.value.trim()), 300);
+            });
+        }
+        return control;
+    }
+
+    setFilter(key, value) {
+        if (value) {
+            this.state.filters[key] = value;
+        } else {
+            delete this.state.filters[key];
+        }
+        this.reload();
+    }
+
+    markSortedHeading() {
+        this.table.querySelectorAll('thead th[data-sort]').forEach(th => {
+            th.classList.remove('datatable-ascending', 'datatable-descending');
+            if (th.dataset.sort === this.state.sort) {
+                th.classList.add(this.state.direction === 'asc' ? 'datatable-ascending' : 'datatable-descending');
+            }
+        });
+    }
+
+    // Sorting, filtering or resizing starts again from the first page
+    reload() {
+        this.history = [];
+        this.state.cursor = null;
+        this.fetchPage();
+    }
+
+    nextPage() {
+        if (!this.result.next_cursor) return;
+        this.history.push(this.state.cursor);
+        this.state.cursor = this.result.next_cursor;
+        this.fetchPage();
+    }
+
+    previousPage() {
+        if (!this.history.length) return;
+        this.state.cursor = this.history.pop();
+        this.fetchPage();
+    }
+
+    fetchPage() {
+        const params = new URLSearchParams({
+            sort: this.state.sort,
+            direction: this.state.direction,
+            per_page: this.state.perPage,
+        });
+        if (this.state.q) params.set('q', this.state.q);
+        if (this.state.cursor) params.set('cursor', this.state.cursor);
+        Object.entries(this.state.filters).forEach(([key, value]) => params.set(`filter[${key}]`, value));
+
+        const requestId = ++this.requestId;
+        // The table URL may already carry the page's own filters
+        const separator = this.url.includes('?') ? '&' : '?';
+        fetch(`${this.url}${separator}${params.toString()}`)
+            .then(response => response.json())
+            .then(data => {
+                // Ignore responses overtaken by a newer request
+                if (requestId !== this.requestId) return;
+                this.tbody.innerHTML = data.rows_html;
+                this.result = data;
+                this.markSortedHeading();
+                this.renderFooter();
+            }).catch(error => {
+                console.error('Error loading table page:', error);
+                this.info.textContent = 'Failed to load entries';
+            });
+    }
+
+    renderFooter() {
+        const { count, total, filtered, next_cursor } = this.result;
+        const start = count ? this.history.length * this.state.perPage + 1 : 0;
+        const end = count ? start + count - 1 : 0;
+        let info = `Showing ${start} to ${end} of ${filtered} entries`;
+        if (filtered !== total) info += ` (filtered from ${total} entries)`;
+        this.info.textContent = info;
+
+        this.pager.innerHTML = '';
+        const addItem = (label, enabled, active, handler) => {
+            const li = document.createElement('li');
+            li.className = 'datatable-pagination-list-item';
+            if (!enabled) li.classList.add('datatable-disabled');
+            if (active) li.classList.add('datatable-active');
+            const button = document.createElement('button');
+            button.className = 'datatable-pagination-list-item-link';
+            button.type = 'button';
+            button.textContent = label;
+            if (enabled && handler) button.addEventListener('click', handler);
+            li.appendChild(button);
+            this.pager.appendChild(li);
+        };
+        addItem('‹', this.history.length > 0, false, () => this.previousPage());
+        addItem(String(this.history.length + 1), true, true, null);
+        addItem('›', Boolean(next_cursor), false, () => this.nextPage());
+    }
+}
+
+document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('table[data-server-table]').forEach(table => new ServerTable(table));
+});
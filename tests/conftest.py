@@ -1,12 +1,15 @@
 import pytest
 import os
 import tempfile
+from sqlalchemy import event
 from src import create_app, db
 from src.models import User
 
 @pytest.fixture(scope='session')
 def app():
     """Crea una instancia de la aplicación Flask para pruebas (scope session)."""
+    # Los tests ejecutan los jobs a mano; sin scheduler en segundo plano
+    os.environ.setdefault('SCHEDULER_ENABLED', 'false')
     app = create_app()
     
     # Crear un directorio temporal para uploads
@@ -17,7 +20,11 @@ def app():
         "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
         "WTF_CSRF_ENABLED": False,
         "SECRET_KEY": "test-secret-key",
-        "UPLOAD_FOLDER": tmpdir
+        "UPLOAD_FOLDER": tmpdir,
+        # Caché de PDFs aislada; las peticiones esperan a que el PDF esté listo
+        "PDF_CACHE_FOLDER": tempfile.mkdtemp(),
+        "PDF_WORKERS": 2,
+        "PDF_JOB_WAIT_SECONDS": 60,
     })
 
     with app.app_context():
@@ -28,6 +35,7 @@ def app():
     import shutil
     try:
         shutil.rmtree(tmpdir)
+        shutil.rmtree(app.config['PDF_CACHE_FOLDER'])
     except:
         pass
 
@@ -85,4 +93,44 @@ def user_client(client, app):
         'password': 'password'
     }, follow_redirects=True)
     
-    yield client
\ No newline at end of file
+    yield client
+
+@pytest.fixture(scope='function')
+def query_counter(app, init_database):
+    """
+    Cuenta las sentencias SQL ejecutadas mientras el test está activo.
+    Usar counter.reset() justo antes de la petición que se quiere medir.
+    """
+    class QueryCounter:
+        def __init__(self):
+            self.statements = []
+
+        @property
+        def count(self):
+            return len(self.statements)
+
+        def reset(self):
+            self.statements.clear()
+
+    counter = QueryCounter()
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', _count)
+    yield counter
+    event.remove(engine, 'before_cursor_execute', _count)
+
+@pytest.fixture(scope='function')
+def nplusone(app):
+    """
+    Detector de N+1: mientras el test está activo, una petición que repite la
+    misma SELECT más de NPLUSONE_THRESHOLD veces falla con NPlusOneError.
+    Devuelve la config para ajustar el umbral en un test concreto.
+    """
+    previous = app.config['NPLUSONE_MODE'], app.config['NPLUSONE_THRESHOLD']
+    app.config['NPLUSONE_MODE'] = 'raise'
+    yield app.config
+    app.config['NPLUSONE_MODE'], app.config['NPLUSONE_THRESHOLD'] = previous
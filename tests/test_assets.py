@@ -1,4 +1,6 @@
-from src.models import Asset, User, AssetAssignment
+from datetime import date
+from sqlalchemy import update
+from src.models import Asset, User, AssetAssignment, Peripheral
 from src import db # <-- 1. AÑADIR IMPORT
 
 def test_asset_lifecycle(auth_client, app):
@@ -93,4 +95,39 @@ def test_asset_checkout_checkin(auth_client, app):
         assert asset.user_id is None
         # 2. CORREGIR LegacyAPIWarning (implícito)
         assignment = db.session.query(AssetAssignment).first()
-        assert assignment.checked_in_date is not None
\ No newline at end of file
+        assert assignment.checked_in_date is not None
+
+def test_warranty_end_date_is_stored_and_synced(app, init_database):
+    """El warranty_end_date persistido sigue a purchase_date y warranty_length."""
+    with app.app_context():
+        asset = Asset(name='Laptop', purchase_date=date(2024, 1, 31), warranty_length=1)
+        peripheral = Peripheral(name='Dock', warranty_length=12)
+        db.session.add_all([asset, peripheral])
+        db.session.commit()
+        assert asset.warranty_end_date == date(2024, 2, 29)
+        assert peripheral.warranty_end_date is None
+
+        asset.warranty_length = 24
+        peripheral.purchase_date = date(2024, 6, 1)
+        db.session.commit()
+        assert db.session.query(Asset.warranty_end_date).scalar() == date(2026, 1, 31)
+        assert db.session.query(Peripheral.warranty_end_date).scalar() == date(2025, 6, 1)
+
+        asset.purchase_date = None
+        db.session.commit()
+        assert db.session.query(Asset.warranty_end_date).scalar() is None
+
+
+def test_backfill_warranty_dates_command(app, init_database):
+    with app.app_context():
+        db.session.add(Asset(name='Legacy', purchase_date=date(2023, 5, 10), warranty_length=36))
+        db.session.commit()
+        # Simulate a row written before the column existed
+        db.session.execute(update(Asset).values(warranty_end_date=None))
+        db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['backfill-warranty-dates'])
+    assert 'for 1 items' in result.output
+
+    with app.app_context():
+        assert db.session.query(Asset.warranty_end_date).scalar() == date(2026, 5, 10)
@@ -107,4 +107,43 @@ def test_non_admin_cannot_post(user_client, app):
     response = user_client.post(f'/users/{user_id}/archive', follow_redirects=False)
     
     # Comprobar que la respuesta es 302 (Redirección)
-    assert response.status_code == 302
\ No newline at end of file
+    assert response.status_code == 302
+
+# Test 5: El admin por defecto debe cambiar la contraseña, sin hashear en cada petición
+def test_default_admin_must_change_password(client, app, monkeypatch):
+    """
+    El aviso de contraseña por defecto se decide en el login y en el cambio de
+    contraseña; el resto de peticiones solo leen el flag guardado.
+    """
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        admin = User(name='admin', email='admin@example.com', role='admin')
+        admin.set_password('admin123')
+        db.session.add(admin)
+        db.session.commit()
+        assert admin.must_change_password
+
+    client.post('/login', data={'email': 'admin@example.com', 'password': 'admin123'})
+
+    def no_hashing(self, password):
+        raise AssertionError('check_password called outside login')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(User, 'check_password', no_hashing)
+        response = client.get('/admin/users')
+        assert response.status_code == 200
+        assert b'you must change the default admin password' in response.data
+        assert client.get('/change-password').status_code == 200
+
+    response = client.post('/change-password', data={
+        'current_password': 'admin123',
+        'new_password': 'a-better-password',
+        'confirm_password': 'a-better-password'
+    }, follow_redirects=True)
+    assert b'Your password has been updated successfully!' in response.data
+
+    with app.app_context():
+        assert not User.query.filter_by(email='admin@example.com').first().must_change_password
+    response = client.get('/admin/users')
+    assert b'you must change the default admin password' not in response.data
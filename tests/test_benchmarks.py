@@ -0,0 +1,31 @@
+from benchmarks.routes import compare, endpoints, run_benchmarks
+
+
+def _result(median_ms=100.0, queries=5, peak_kib=1000.0):
+    return {'url': '/', 'median_ms': median_ms, 'min_ms': median_ms, 'queries': queries, 'peak_kib': peak_kib}
+
+
+def test_compare_flags_regressions_beyond_the_tolerance():
+    baseline = {'page': _result()}
+    assert compare({'page': _result(median_ms=120)}, baseline, tolerance=0.25) == []
+    assert compare({'page': _result(median_ms=130)}, baseline, tolerance=0.25) == [('page', 'median_ms', 100.0, 130)]
+    # Una consulta más siempre es una regresión: los datos son los mismos en cada ejecución
+    assert compare({'page': _result(queries=6)}, baseline) == [('page', 'queries', 5, 6)]
+    assert compare({'page': _result(peak_kib=2000)}, baseline) == [('page', 'peak_kib', 1000.0, 2000)]
+    # Diferencias mínimas son ruido aunque el porcentaje sea alto
+    assert compare({'fast': _result(median_ms=3)}, {'fast': _result(median_ms=1)}) == []
+    # Los endpoints nuevos no tienen con qué compararse
+    assert compare({'new': _result()}, baseline) == []
+
+
+def test_endpoints_cover_every_report(app):
+    urls = dict(endpoints(app))
+    assert '/reports/depreciation' in urls and '/reports/spend-analysis' in urls
+    assert sum(name.startswith('dashboard period=') for name in urls) == 5
+
+
+def test_run_benchmarks_measures_time_queries_and_memory(auth_client):
+    results = run_benchmarks(auth_client, [('dashboard', '/?period=30')], repeat=2, log=lambda line: None)
+    result = results['dashboard']
+    assert result['median_ms'] > 0 and result['peak_kib'] > 0
+    assert result['queries'] > 0
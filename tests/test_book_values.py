@@ -0,0 +1,82 @@
+from datetime import date
+from src import db
+from src.book_values import refresh_book_value_snapshots, portfolio_trend
+from src.models import Asset, Peripheral, Location, BookValueSnapshot, LocationValueSnapshot
+
+
+def _setup():
+    office = Location(name='Office')
+    db.session.add(office)
+    db.session.flush()
+    laptop = Asset(name='Laptop', cost=1200, currency='EUR', purchase_date=date(2023, 1, 15), location_id=office.id)
+    monitor = Peripheral(name='Monitor', cost=300, currency='EUR', purchase_date=date(2024, 12, 1))
+    db.session.add_all([laptop, monitor, Asset(name='No cost', purchase_date=date(2023, 1, 1))])
+    db.session.commit()
+    return office.id, laptop.id
+
+
+def test_snapshots_are_incremental(app, init_database):
+    office_id, laptop_id = _setup()
+
+    assert refresh_book_value_snapshots(today=date(2025, 6, 10)) == 2
+    laptop_rows = BookValueSnapshot.query.filter_by(item_type='Asset', item_id=laptop_id).order_by(BookValueSnapshot.month).all()
+    # Desde el primer mes que empieza con el portátil ya comprado hasta junio de 2025
+    assert (laptop_rows[0].month, laptop_rows[-1].month, len(laptop_rows)) == (date(2023, 2, 1), date(2025, 6, 1), 29)
+    assert laptop_rows[0].linear_eur < 1200
+    assert laptop_rows[-1].linear_eur < laptop_rows[0].linear_eur
+    assert laptop_rows[-1].declining_eur < laptop_rows[-1].linear_eur
+    assert BookValueSnapshot.query.filter_by(item_type='Peripheral').count() == 7
+
+    # Un mes después sin cambios: solo se añade el mes nuevo
+    assert refresh_book_value_snapshots(today=date(2025, 7, 2)) == 0
+    assert BookValueSnapshot.query.filter_by(item_type='Asset').count() == 30
+
+    # Los cambios recalculan el histórico del elemento; archivar lo elimina
+    laptop = db.session.get(Asset, laptop_id)
+    laptop.cost = 2400
+    db.session.commit()
+    assert refresh_book_value_snapshots(today=date(2025, 7, 2)) == 1
+    assert {row.original_eur for row in BookValueSnapshot.query.filter_by(item_type='Asset')} == {2400}
+
+    laptop.is_archived = True
+    db.session.commit()
+    refresh_book_value_snapshots(today=date(2025, 7, 2))
+    assert BookValueSnapshot.query.filter_by(item_type='Asset').count() == 0
+    assert LocationValueSnapshot.query.filter_by(location_id=office_id).count() == 0
+
+
+def test_rows_without_updated_at_are_backfilled(app, init_database):
+    """Los elementos anteriores a la columna updated_at solo se recalculan en su primera instantánea."""
+    _setup()
+    db.session.execute(Asset.__table__.update().values(updated_at=None))
+    db.session.execute(Peripheral.__table__.update().values(updated_at=None))
+    db.session.commit()
+
+    assert refresh_book_value_snapshots(today=date(2025, 6, 10)) == 2
+    assert Asset.query.filter(Asset.updated_at.is_(None)).count() == 0
+    assert refresh_book_value_snapshots(today=date(2025, 6, 10)) == 0
+
+
+def test_portfolio_trend_reads_location_totals(app, init_database):
+    office_id, _ = _setup()
+    refresh_book_value_snapshots(today=date(2025, 6, 10))
+
+    months, original, values = portfolio_trend(today=date(2025, 6, 10))
+    assert len(months) == 36 and months[-1] == date(2025, 6, 1)
+    assert original[-1] == 1500
+    assert original[0] == 0
+    assert 0 < values[-1] < 1500
+
+    _, original, _ = portfolio_trend(location_id=office_id, today=date(2025, 6, 10))
+    assert original[-1] == 1200
+
+
+def test_depreciation_report_shows_trend(auth_client, app):
+    with app.app_context():
+        _setup()
+        refresh_book_value_snapshots()
+
+    response = auth_client.get('/reports/depreciation')
+    assert response.status_code == 200
+    assert b'portfolioTrendChart' in response.data
+    assert b'1500.0' in response.data
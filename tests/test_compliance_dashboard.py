@@ -1,5 +1,8 @@
 import pytest
-from src.models import Framework, FrameworkControl, User
+from src.models import (
+    Framework, FrameworkControl, User, ComplianceLink, Asset, Policy, Supplier, SecurityAssessment,
+    resolve_linked_objects
+)
 from src import db
 
 @pytest.fixture(scope='function')
@@ -43,3 +46,87 @@ def test_pdf_export(auth_client, app):
     assert response.headers['Content-Type'] == 'application/pdf'
     assert response.headers['Content-Disposition'] == 'attachment; filename=compliance_report.pdf'
     # We can't easily check PDF content, but status and headers are good indicators
+
+
+def _add_evidence(framework_name, controls, links_per_control):
+    fw = Framework(name=framework_name, is_active=True)
+    db.session.add(fw)
+    db.session.flush()
+    for i in range(controls):
+        ctrl = FrameworkControl(framework_id=fw.id, control_id=f'{framework_name}.{i}', name=f'Control {i}')
+        db.session.add(ctrl)
+        db.session.flush()
+        for j in range(links_per_control):
+            asset = Asset(name=f'Evidence asset {framework_name}-{i}-{j}')
+            policy = Policy(title=f'Evidence policy {framework_name}-{i}-{j}')
+            db.session.add_all([asset, policy])
+            db.session.flush()
+            db.session.add_all([
+                ComplianceLink(framework_control_id=ctrl.id, linkable_type='Asset', linkable_id=asset.id, description='Inventario'),
+                ComplianceLink(framework_control_id=ctrl.id, linkable_type='Policy', linkable_id=policy.id, description='Política'),
+            ])
+    db.session.commit()
+
+def test_resolve_linked_objects_batches_by_type(app, query_counter):
+    with app.app_context():
+        _add_evidence('ISO', 3, 2)
+        db.session.add(ComplianceLink(framework_control_id=1, linkable_type='Asset', linkable_id=999, description='Borrado'))
+        db.session.commit()
+        db.session.expunge_all()
+
+        links = ComplianceLink.query.all()
+        query_counter.reset()
+        resolve_linked_objects(links)
+        # Una consulta IN (...) por tipo
+        assert query_counter.count == 2
+        assert links[0].linked_object.name == 'Evidence asset ISO-0-0'
+        assert links[1].linked_object.title == 'Evidence policy ISO-0-0'
+        assert links[-1].linked_object is None
+        assert query_counter.count == 2
+
+def test_dashboard_query_count_is_constant(auth_client, app, query_counter):
+    with app.app_context():
+        _add_evidence('Small', 2, 1)
+
+    query_counter.reset()
+    response = auth_client.get('/compliance/dashboard')
+    assert response.status_code == 200
+    assert b'2 Links' in response.data
+    small_queries = query_counter.count
+
+    with app.app_context():
+        _add_evidence('Large', 30, 3)
+
+    query_counter.reset()
+    response = auth_client.get('/compliance/dashboard')
+    assert response.status_code == 200
+    assert b'6 Links' in response.data
+    assert b'Evidence policy Large-29-2' in response.data
+    assert query_counter.count == small_queries
+
+def test_assessment_suppliers_are_loaded_with_the_links(app, query_counter):
+    with app.app_context():
+        fw = Framework(name='Vendors', is_active=True)
+        db.session.add(fw)
+        db.session.flush()
+        ctrl = FrameworkControl(framework_id=fw.id, control_id='V.1', name='Vendor reviews')
+        db.session.add(ctrl)
+        db.session.flush()
+        for i in range(3):
+            supplier = Supplier(name=f'Vendor {i}')
+            db.session.add(supplier)
+            db.session.flush()
+            assessment = SecurityAssessment(supplier_id=supplier.id)
+            db.session.add(assessment)
+            db.session.flush()
+            db.session.add(ComplianceLink(framework_control_id=ctrl.id, linkable_type='SecurityAssessment',
+                                          linkable_id=assessment.id, description='Revisión anual'))
+        db.session.commit()
+        db.session.expunge_all()
+
+        links = ComplianceLink.query.all()
+        query_counter.reset()
+        resolve_linked_objects(links)
+        # El nombre del proveedor de cada evaluación viene en la misma consulta
+        assert [link.linked_object.supplier.name for link in links] == ['Vendor 0', 'Vendor 1', 'Vendor 2']
+        assert query_counter.count == 1
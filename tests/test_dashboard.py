@@ -0,0 +1,79 @@
+from datetime import date, timedelta
+from dateutil.relativedelta import relativedelta
+from src import db
+from src.models import Asset, Peripheral, PaymentMethod, Supplier, Subscription, Location
+from src import dashboard_stats
+
+# Session/user lookups + stat counts + renewals + forecast + expiring items
+DASHBOARD_QUERY_BUDGET = 12
+
+
+def _add_estate(size, today):
+    supplier = Supplier(name=f'Supplier {size}')
+    db.session.add(supplier)
+    db.session.flush()
+    for i in range(size):
+        db.session.add(Asset(name=f'Laptop {size}-{i}', purchase_date=today - relativedelta(months=36) + timedelta(days=i % 20),
+                             warranty_length=36))
+        db.session.add(Peripheral(name=f'Monitor {size}-{i}', purchase_date=today - relativedelta(months=12), warranty_length=24))
+        db.session.add(PaymentMethod(name=f'Card {size}-{i}', method_type='Credit Card', expiry_date=today + timedelta(days=40)))
+        db.session.add(Subscription(name=f'SaaS {size}-{i}', subscription_type='SaaS', renewal_date=today + timedelta(days=i % 30),
+                                    renewal_period_type='monthly', cost=5.0, supplier_id=supplier.id))
+    db.session.commit()
+
+
+def test_stat_counts_single_statement(app, query_counter):
+    with app.app_context():
+        db.session.add_all([Location(name='HQ'), Location(name='Old Office', is_archived=True)])
+        db.session.add(Asset(name='Server'))
+        db.session.commit()
+
+        query_counter.reset()
+        stats = dashboard_stats.stat_counts()
+        assert query_counter.count == 1
+        assert stats['locations'] == 1
+        assert stats['assets'] == 1
+        assert stats['subscriptions'] == 0
+
+
+def test_expiring_windows(app, init_database):
+    today = date(2025, 3, 15)
+    with app.app_context():
+        db.session.add_all([
+            Asset(name='Ends in 10 days', purchase_date=date(2023, 3, 25), warranty_length=24),
+            Asset(name='Ended yesterday', purchase_date=date(2024, 3, 14), warranty_length=12),
+            Peripheral(name='Ends in 31 days', purchase_date=date(2024, 10, 15), warranty_length=6),
+            Peripheral(name='Ends today', purchase_date=date(2024, 12, 15), warranty_length=3),
+            PaymentMethod(name='Expires this month', method_type='Card', expiry_date=date(2025, 3, 1)),
+            PaymentMethod(name='Expires in May', method_type='Card', expiry_date=date(2025, 5, 1)),
+            PaymentMethod(name='Expires in June', method_type='Card', expiry_date=date(2025, 6, 1)),
+            PaymentMethod(name='Expired', method_type='Card', expiry_date=date(2025, 2, 1)),
+        ])
+        db.session.commit()
+
+        warranties = dashboard_stats.expiring_warranties(today, days=30)
+        assert [item.name for item in warranties] == ['Ends today', 'Ends in 10 days']
+
+        # today + 90 days = 2025-06-13, before the end of June
+        methods = dashboard_stats.expiring_payment_methods(today, days=90)
+        assert [method.name for method in methods] == ['Expires this month', 'Expires in May']
+
+
+def test_dashboard_query_count_is_constant(auth_client, app, query_counter):
+    today = date.today()
+    with app.app_context():
+        _add_estate(3, today)
+
+    query_counter.reset()
+    response = auth_client.get('/')
+    assert response.status_code == 200
+    small_estate_queries = query_counter.count
+    assert small_estate_queries <= DASHBOARD_QUERY_BUDGET
+
+    with app.app_context():
+        _add_estate(40, today)
+
+    query_counter.reset()
+    response = auth_client.get('/')
+    assert response.status_code == 200
+    assert query_counter.count == small_estate_queries
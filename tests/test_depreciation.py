@@ -0,0 +1,65 @@
+from datetime import date
+import numpy as np
+from src import db
+from src.depreciation import DepreciationBook
+from src.models import Asset, Peripheral, Location
+
+
+def _loop_book_value(cost, purchase_date, today, period, algorithm):
+    """El cálculo original, un año cada vez, como referencia."""
+    age = max((today - purchase_date).days, 0) / 365.25
+    if algorithm == 'linear':
+        return max(0.0, cost - cost / period * age)
+    rate = 2.0 / period
+    book_value = cost
+    for _ in range(int(age)):
+        book_value -= book_value * rate
+    book_value -= book_value * rate * (age - int(age))
+    return max(0.0, book_value)
+
+
+def test_closed_form_matches_yearly_loop():
+    today = date(2025, 6, 30)
+    purchases = [date(2025, 6, 1), date(2024, 1, 15), date(2021, 3, 3), date(2015, 12, 31), date(2026, 1, 1)]
+    costs = [1000.0, 250.0, 1999.99, 80.0, 500.0]
+    book = DepreciationBook(costs, purchases, ['EUR', 'USD', 'EUR', 'GBP', 'EUR'])
+
+    for algorithm in ('linear', 'declining_balance'):
+        for period in (3, 5, 8):
+            values = book.book_values(period, algorithm, as_of=today)
+            expected = [_loop_book_value(c, d, today, period, algorithm) for c, d in zip(costs, purchases)]
+            assert np.allclose(values, expected)
+
+    # Sin periodo no hay depreciación
+    assert book.book_values(0, 'linear', as_of=today).tolist() == costs
+
+
+def test_location_totals_and_monthly_schedule():
+    book = DepreciationBook([1200.0, 600.0, 100.0], [date(2024, 1, 1)] * 3, ['EUR', 'EUR', 'USD'], [1, 1, 0])
+    values = book.book_values(1, 'linear', as_of=date(2024, 7, 1))
+    assert book.by_location(values * book.rates_to_eur) == {1: (1800.0, values[:2].sum())}
+
+    months, totals = book.monthly_totals(date(2023, 12, 1), date(2025, 2, 1), 1)
+    assert months[0] == date(2023, 12, 1) and months[-1] == date(2025, 2, 1)
+    assert totals[0] == 0.0 # Aún no comprados
+    assert totals[1] == 1800.0 + 92.0
+    assert totals[-1] == 0.0
+
+
+def test_depreciation_report_renders(auth_client, app):
+    with app.app_context():
+        office = Location(name='Office')
+        db.session.add(office)
+        db.session.flush()
+        db.session.add(Asset(name='Old Laptop', cost=1000, currency='EUR', purchase_date=date(2000, 1, 1), location_id=office.id))
+        db.session.add(Asset(name='New Laptop', cost=1000, currency='USD', purchase_date=date.today(), location_id=office.id))
+        db.session.add(Peripheral(name='Monitor', cost=200, currency='EUR', purchase_date=date.today()))
+        db.session.commit()
+
+    response = auth_client.get('/reports/depreciation?currency=EUR')
+    assert response.status_code == 200
+    html = response.data.decode()
+    assert html.index('New Laptop') < html.index('Old Laptop')
+    assert 'EUR 920.00' in html
+    assert 'EUR 0.00' in html
+    assert '&#34;Office&#34;' in html or '"Office"' in html
@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+from src import db, exports
+from src.models import Asset, AssetHistory, User
+
+
+def _add_assets(count, archived=0):
+    owner = User(name='Owner', email='owner@test.com')
+    db.session.add(owner)
+    db.session.flush()
+    for i in range(count):
+        db.session.add(Asset(name=f'Laptop {i}', serial_number=f'SN-{i}', user_id=owner.id))
+    for i in range(archived):
+        db.session.add(Asset(name=f'Old laptop {i}', is_archived=True))
+    db.session.commit()
+
+
+def test_csv_export_streams_every_row_in_batches(auth_client, app, monkeypatch, query_counter):
+    monkeypatch.setattr(exports, 'EXPORT_BATCH_SIZE', 10)
+    with app.app_context():
+        _add_assets(25, archived=2)
+
+    query_counter.reset()
+    response = auth_client.get('/exports/assets.csv')
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'text/csv'
+    assert 'attachment; filename=assets.csv' == response.headers['Content-Disposition']
+
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0][:3] == ['ID', 'Internal ID', 'Name']
+    assert len(rows) == 26
+    assert [row[2] for row in rows[1:4]] == ['Laptop 0', 'Laptop 1', 'Laptop 2']
+    assert rows[1][7] == 'Owner'
+    # Three keyset batches of at most 10 rows
+    assert len([s for s in query_counter.statements if 'FROM asset' in s]) == 3
+
+    response = auth_client.get('/exports/assets.csv?archived=1')
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert [row[2] for row in rows[1:]] == ['Old laptop 0', 'Old laptop 1']
+
+
+def test_ndjson_export_and_scopes(auth_client, app):
+    with app.app_context():
+        _add_assets(2)
+        db.session.add_all([
+            AssetHistory(asset_id=1, field_changed='status', old_value='In Stock', new_value='In Use'),
+            AssetHistory(asset_id=2, field_changed='name', old_value='Laptop', new_value='Laptop 1'),
+        ])
+        db.session.commit()
+
+    response = auth_client.get('/exports/assets.ndjson')
+    assert response.mimetype == 'application/x-ndjson'
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [record['Name'] for record in records] == ['Laptop 0', 'Laptop 1']
+    assert records[0]['User'] == 'Owner'
+    assert records[0]['Created At']
+
+    response = auth_client.get('/exports/asset-history.ndjson?asset_id=1')
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [(record['Asset'], record['New Value']) for record in records] == [('Laptop 0', 'In Use')]
+
+    assert auth_client.get('/exports/assets.xlsx').status_code == 404
+    assert auth_client.get('/exports/secrets.csv').status_code == 404
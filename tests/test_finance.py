@@ -73,4 +73,75 @@ def test_budget_remaining_calculation(auth_client, app):
         budget = db.session.get(Budget, 1)
         assert budget is not None
         # 5000 (Presupuesto) - 3000 (Coste Activo) = 2000 (Restante)
-        assert budget.remaining == 2000.00
\ No newline at end of file
+        assert budget.remaining == 2000.00
+
+def test_totals_are_sortable_without_loading_items(auth_client, app, query_counter):
+    """
+    Los totales de compras y presupuestos se calculan en SQL: las listas
+    ordenan por importe sin cargar activos, periféricos ni licencias.
+    """
+    with app.app_context():
+        budget = Budget(name='Hardware', amount=1000)
+        db.session.add(budget)
+        db.session.flush()
+        for i, cost in enumerate([300, 100, 200]):
+            purchase = Purchase(description=f'Order {i}', purchase_date=datetime(2025, 1, 1).date(), budget_id=budget.id)
+            db.session.add(purchase)
+            db.session.flush()
+            db.session.add(Asset(name=f'Laptop {i}', cost=cost, purchase_id=purchase.id))
+            db.session.add(Peripheral(name=f'Dock {i}', cost=cost / 10, purchase_id=purchase.id))
+        db.session.add(Purchase(description='Validated', purchase_date=datetime(2025, 1, 1).date(),
+                                validated_cost=50, budget_id=budget.id))
+        db.session.commit()
+
+        assert [p.description for p in Purchase.query.order_by(Purchase.total_cost)] == [
+            'Validated', 'Order 1', 'Order 2', 'Order 0'
+        ]
+        assert Budget.query.first().spent == 50 + 660
+        assert Budget.query.filter(Budget.remaining < 300).count() == 1
+
+    query_counter.reset()
+    data = auth_client.get('/purchases/api/table?sort=total_cost&direction=desc&filter[total_cost]=200').get_json()
+    assert data['filtered'] == 2
+    assert data['rows_html'].index('Order 0') < data['rows_html'].index('Order 2')
+    assert '330.00' in data['rows_html']
+    assert not [s for s in query_counter.statements if s.lstrip().startswith('SELECT asset.')]
+
+    response = auth_client.get('/budgets/')
+    assert b'290.00' in response.data
+
+def test_calculated_cost_is_only_loaded_where_shown(auth_client, app, query_counter):
+    """
+    El coste calculado y el gasto son diferidos: cargar compras y presupuestos
+    a través de relaciones no ejecuta sus subconsultas, y el detalle del
+    presupuesto carga los costes en bloque.
+    """
+    with app.app_context():
+        budget = Budget(name='Hardware', amount=1000)
+        db.session.add(budget)
+        db.session.flush()
+        for i in range(3):
+            purchase = Purchase(description=f'Order {i}', purchase_date=datetime(2025, 1, 1).date(), budget_id=budget.id)
+            db.session.add(purchase)
+            db.session.flush()
+            db.session.add(Asset(name=f'Laptop {i}', cost=100 * (i + 1), purchase_id=purchase.id))
+        db.session.commit()
+        budget_id = budget.id
+
+        db.session.expunge_all()
+        query_counter.reset()
+        assert len(db.session.get(Budget, budget_id).purchases) == 3
+        assert Purchase.query.first().budget.name == 'Hardware'
+        assert not [s for s in query_counter.statements if 'sum(asset.cost)' in s]
+
+    query_counter.reset()
+    response = auth_client.get(f'/budgets/{budget_id}')
+    assert b'300.00' in response.data
+    # Una sola consulta para los costes de todas sus compras
+    assert len([s for s in query_counter.statements if 'sum(asset.cost)' in s]) == 1
+
+    # La lista de presupuestos carga el restante en la misma consulta que las filas
+    query_counter.reset()
+    assert b'400.00' in auth_client.get('/budgets/').data
+    [statement] = [s for s in query_counter.statements if 'sum(asset.cost)' in s]
+    assert 'budget.name' in statement
@@ -0,0 +1,170 @@
+import random
+from datetime import date, timedelta
+from src import db
+from src.models import Subscription, Supplier, CostHistory
+from src.forecast import SpendForecast
+from src.cost_timeline import CostTimeline
+from src.renewals import RenewalSchedule
+
+
+def _random_schedules(count, seed=7):
+    rng = random.Random(seed)
+    schedules = []
+    for _ in range(count):
+        period_type = rng.choice(['monthly', 'yearly', 'custom'])
+        schedules.append(dict(
+            anchor=date(2018, 1, 1) + timedelta(days=rng.randint(0, 3650)),
+            period_type=period_type,
+            period_value=rng.choice([1, 1, 2, 3, 7, 30]) if period_type == 'custom' else rng.choice([1, 1, 3, 12]),
+            monthly_day=rng.choice([None, 'first', 'last', '15', '31']) if period_type == 'monthly' else None,
+            cost=round(rng.uniform(1, 500), 2)
+        ))
+    return schedules
+
+
+def test_vectorized_totals_match_schedule_expansion():
+    schedules = _random_schedules(300)
+    spend = SpendForecast(
+        ids=range(len(schedules)),
+        supplier_ids=[i % 5 for i in range(len(schedules))],
+        anchors=[s['anchor'] for s in schedules],
+        period_types=[s['period_type'] for s in schedules],
+        period_values=[s['period_value'] for s in schedules],
+        monthly_days=[s['monthly_day'] for s in schedules],
+        costs_eur=[s['cost'] for s in schedules]
+    )
+    start, end = date(2022, 3, 17), date(2026, 8, 9)
+
+    expected_monthly, expected_yearly, expected_supplier = {}, {}, {}
+    for i, s in enumerate(schedules):
+        schedule = RenewalSchedule(s['anchor'], s['period_type'], s['period_value'], s['monthly_day'])
+        for renewal in schedule.between(start, end):
+            month_key = renewal.replace(day=1)
+            expected_monthly[month_key] = expected_monthly.get(month_key, 0) + s['cost']
+            expected_yearly[renewal.year] = expected_yearly.get(renewal.year, 0) + s['cost']
+            expected_supplier[i % 5] = expected_supplier.get(i % 5, 0) + s['cost']
+
+    months, monthly = spend.monthly_totals(start, end)
+    assert months[0] == date(2022, 3, 1) and months[-1] == date(2026, 8, 1)
+    for month_key, total in zip(months, monthly):
+        assert abs(total - expected_monthly.get(month_key, 0)) < 1e-6
+
+    years, yearly = spend.yearly_totals(start, end)
+    assert years == [2022, 2023, 2024, 2025, 2026]
+    for year, total in zip(years, yearly):
+        assert abs(total - expected_yearly.get(year, 0)) < 1e-6
+
+    by_supplier = spend.supplier_totals(start, end)
+    assert set(by_supplier) == set(expected_supplier)
+    for supplier_id, total in by_supplier.items():
+        assert abs(total - expected_supplier[supplier_id]) < 1e-6
+
+
+def _random_histories(count, seed=11):
+    rng = random.Random(seed)
+    row_dates, row_costs = [], []
+    for _ in range(count):
+        dates = sorted(rng.sample(range(0, 3650), rng.randint(1, 4)))
+        row_dates.append([date(2019, 1, 1) + timedelta(days=day) for day in dates])
+        row_costs.append([round(rng.uniform(1, 500), 2) for _ in dates])
+    return row_dates, row_costs
+
+
+def test_effective_costs_match_per_renewal_lookup():
+    schedules = _random_schedules(300)
+    row_dates, row_costs = _random_histories(len(schedules))
+    timeline = CostTimeline(row_dates, row_costs)
+    spend = SpendForecast(
+        ids=range(len(schedules)),
+        supplier_ids=[i % 5 for i in range(len(schedules))],
+        anchors=[s['anchor'] for s in schedules],
+        period_types=[s['period_type'] for s in schedules],
+        period_values=[s['period_value'] for s in schedules],
+        monthly_days=[s['monthly_day'] for s in schedules],
+        costs_eur=[costs[-1] for costs in row_costs],
+        timeline=timeline
+    )
+    start, end = date(2020, 6, 1), date(2026, 5, 31)
+
+    def effective_cost(row, day):
+        # Último cambio anterior o igual al día; antes del primero, el primer coste
+        cost = row_costs[row][0]
+        for changed, value in zip(row_dates[row], row_costs[row]):
+            if changed <= day:
+                cost = value
+        return cost
+
+    expected_monthly = {}
+    for i, s in enumerate(schedules):
+        schedule = RenewalSchedule(s['anchor'], s['period_type'], s['period_value'], s['monthly_day'])
+        for renewal in schedule.between(start, end):
+            cost = effective_cost(i, renewal)
+            assert timeline.cost_at(i, renewal) == cost
+            month_key = renewal.replace(day=1)
+            expected_monthly[month_key] = expected_monthly.get(month_key, 0) + cost
+
+    months, monthly = spend.monthly_totals(start, end)
+    for month_key, total in zip(months, monthly):
+        assert abs(total - expected_monthly.get(month_key, 0)) < 1e-6
+
+
+def test_load_prices_past_renewals_with_cost_history(app, init_database, query_counter):
+    with app.app_context():
+        supplier = Supplier(name='History Supplier')
+        db.session.add(supplier)
+        db.session.flush()
+        subscription = Subscription(name='Tool', subscription_type='SaaS', renewal_date=date(2024, 1, 10),
+                                    renewal_period_type='monthly', cost=150.0, currency='EUR', supplier_id=supplier.id)
+        untracked = Subscription(name='Untracked', subscription_type='SaaS', renewal_date=date(2024, 1, 20),
+                                 renewal_period_type='monthly', cost=10.0, currency='EUR', supplier_id=supplier.id)
+        db.session.add_all([subscription, untracked])
+        db.session.flush()
+        db.session.add_all([
+            CostHistory(subscription_id=subscription.id, cost=100.0, currency='EUR', changed_date=date(2024, 1, 1)),
+            CostHistory(subscription_id=subscription.id, cost=120.0, currency='USD', changed_date=date(2024, 3, 10)),
+            CostHistory(subscription_id=subscription.id, cost=150.0, currency='EUR', changed_date=date(2024, 3, 15)),
+        ])
+        db.session.commit()
+
+        query_counter.reset()
+        spend = SpendForecast.load()
+        assert query_counter.count == 2
+        months, totals = spend.monthly_totals(date(2024, 1, 1), date(2024, 4, 30))
+        # El cambio del 10 de marzo ya aplica a la renovación de ese día
+        assert [round(total, 2) for total in totals] == [110.0, 110.0, 120.4, 160.0]
+
+
+def test_load_skips_archived_and_converts_currency(app, init_database):
+    with app.app_context():
+        supplier = Supplier(name='Forecast Supplier')
+        db.session.add(supplier)
+        db.session.flush()
+        db.session.add_all([
+            Subscription(name='Active', subscription_type='SaaS', renewal_date=date(2025, 1, 10),
+                         renewal_period_type='monthly', cost=100.0, currency='USD', supplier_id=supplier.id),
+            Subscription(name='Archived', subscription_type='SaaS', renewal_date=date(2025, 1, 10),
+                         renewal_period_type='monthly', cost=100.0, currency='EUR', supplier_id=supplier.id,
+                         is_archived=True),
+        ])
+        db.session.commit()
+
+        spend = SpendForecast.load()
+        months, totals = spend.monthly_totals(date(2025, 1, 1), date(2025, 3, 31))
+        assert len(spend) == 1
+        assert [round(total, 2) for total in totals] == [92.0, 92.0, 92.0]
+
+
+def test_subscription_reports_render(auth_client, app):
+    today = date.today()
+    with app.app_context():
+        supplier = Supplier(name='Report Supplier')
+        db.session.add(supplier)
+        db.session.flush()
+        db.session.add(Subscription(name='Yearly Tool', subscription_type='SaaS', renewal_date=today.replace(day=1),
+                                    renewal_period_type='yearly', cost=1200.0, currency='EUR',
+                                    supplier_id=supplier.id))
+        db.session.commit()
+
+    response = auth_client.get(f'/reports/subscription-reports?year={today.year}')
+    assert response.status_code == 200
+    assert b'Report Supplier' in response.data
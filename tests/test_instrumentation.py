@@ -0,0 +1,57 @@
+import json
+import logging
+from src.instrumentation import fingerprint
+
+
+def test_fingerprint_ignores_literals_and_in_list_length():
+    a, digest_a = fingerprint("SELECT * FROM asset WHERE id IN (?, ?, ?) AND name = 'Laptop' LIMIT 10")
+    b, digest_b = fingerprint("SELECT *  FROM asset\n WHERE id IN (?, ?) AND name = 'O''Brien' LIMIT 25")
+    assert a == b == "SELECT * FROM asset WHERE id IN (?+) AND name = ? LIMIT ?"
+    assert digest_a == digest_b
+    assert fingerprint("SELECT * FROM asset WHERE id = %(id_1)s")[0] == "SELECT * FROM asset WHERE id = ?"
+    assert fingerprint("SELECT * FROM peripheral")[1] != digest_a
+
+
+def test_responses_carry_server_timing(auth_client):
+    response = auth_client.get('/')
+    timing = response.headers['Server-Timing']
+    assert timing.startswith('db;dur=')
+    assert 'tpl;dur=' in timing and 'app;dur=' in timing
+    # La página consulta la base de datos
+    queries = int(timing.split('desc="')[1].split(' queries')[0])
+    assert queries > 0
+
+
+def test_slow_queries_and_requests_are_logged(auth_client, app, caplog):
+    app.config['SLOW_QUERY_MS'] = 0
+    try:
+        with caplog.at_level(logging.INFO):
+            auth_client.get('/users/')
+    finally:
+        app.config['SLOW_QUERY_MS'] = 200
+
+    records = [json.loads(record.getMessage()) for record in caplog.records if record.getMessage().startswith('{')]
+    slow = [record for record in records if record['event'] == 'slow_query']
+    assert slow and all(len(record['fingerprint']) == 12 and "'" not in record['statement'] for record in slow)
+    request_log = [record for record in records if record['event'] == 'request'][-1]
+    assert request_log['endpoint'] == 'users.users'
+    assert request_log['queries'] == len(slow)
+    assert 0 < len(request_log['slowest']) <= 3
+
+
+def test_admin_performance_page(auth_client, app):
+    app.extensions['route_stats'].reset()
+    for _ in range(3):
+        auth_client.get('/users/')
+    response = auth_client.get('/admin/performance')
+    assert response.status_code == 200
+    assert b'users.users' in response.data
+
+    rows = {row['endpoint']: row for row in app.extensions['route_stats'].summary()}
+    assert rows['users.users']['requests'] == 3
+    assert rows['users.users']['max_queries'] > 0
+
+
+def test_performance_page_is_admin_only(user_client):
+    response = user_client.get('/admin/performance')
+    assert response.status_code == 302
@@ -0,0 +1,200 @@
+import json
+import socketserver
+import threading
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from dateutil.relativedelta import relativedelta
+from src import db, notifications
+from src.models import (
+    NotificationOutbox, NotificationSetting, Subscription, Supplier, License, Asset, Peripheral, PaymentMethod,
+    Course, CourseAssignment, CourseCompletion, User
+)
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Servidor SMTP mínimo: acepta todo salvo los destinatarios que contienen 'reject'."""
+
+    def reply(self, line):
+        self.wfile.write((line + '\r\n').encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 localhost test SMTP')
+        recipients = []
+        while True:
+            line = self.rfile.readline().decode().rstrip('\r\n')
+            if not line:
+                return
+            command = line.split(' ', 1)[0].upper()
+            if command in ('EHLO', 'HELO'):
+                self.reply('250 localhost')
+            elif command == 'MAIL':
+                recipients = []
+                self.reply('250 OK')
+            elif command == 'RCPT':
+                if 'reject' in line:
+                    self.reply('550 No such user')
+                else:
+                    recipients.append(line)
+                    self.reply('250 OK')
+            elif command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = []
+                while True:
+                    data_line = self.rfile.readline().decode()
+                    if data_line in ('.\r\n', ''):
+                        break
+                    data.append(data_line)
+                self.server.messages.append(''.join(data))
+                self.reply('250 OK')
+            elif command == 'RSET':
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Not implemented')
+
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.requests.append((self.path, json.loads(body)))
+        self.send_response(500 if self.path == '/fail' else 200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def smtp_server(app):
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), _SMTPHandler)
+    server.daemon_threads = True
+    server.connections, server.messages = 0, []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    config = {key: app.config[key] for key in ('SMTP_SERVER', 'SMTP_PORT', 'EMAIL_USERNAME', 'EMAIL_PASSWORD', 'SMTP_USE_TLS')}
+    app.config.update(SMTP_SERVER='127.0.0.1', SMTP_PORT=server.server_address[1],
+                      EMAIL_USERNAME='opsdeck@test.com', EMAIL_PASSWORD='', SMTP_USE_TLS=False)
+    yield server
+    app.config.update(config)
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def webhook_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _WebhookHandler)
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def test_batch_reuses_one_smtp_connection(app, init_database, smtp_server, webhook_server, monkeypatch):
+    monkeypatch.setattr(notifications, 'OUTBOX_BATCH_SIZE', 10)
+    with app.app_context():
+        for i in range(15):
+            notifications.queue_email(f'Reminder {i}', f'<p>Body {i}</p>', [f'user{i}@test.com'])
+        for i in range(6):
+            notifications.queue_webhook(f'{webhook_server}/hook', {'index': i})
+        db.session.commit()
+
+        assert notifications.deliver_pending(app) == (21, 0)
+        # Dos lotes: una conexión SMTP por lote
+        assert smtp_server.connections == 2
+        assert len(smtp_server.messages) == 15
+        assert NotificationOutbox.query.filter_by(status='sent').count() == 21
+        assert notifications.deliver_pending(app) == (0, 0)
+
+
+def test_failures_back_off_and_dead_letter(app, init_database, smtp_server, webhook_server):
+    with app.app_context():
+        notifications.queue_email('Reminder', '<p>Body</p>', ['reject@test.com'])
+        notifications.queue_webhook(f'{webhook_server}/fail', {'text': 'hi'})
+        notifications.queue_email('Reminder', '<p>Body</p>', ['ok@test.com'])
+        db.session.commit()
+
+        now = datetime.utcnow() + timedelta(seconds=1)
+        assert notifications.deliver_pending(app, now=now) == (1, 2)
+        failed = NotificationOutbox.query.filter_by(status='pending').all()
+        assert len(failed) == 2
+        assert all(message.attempts == 1 for message in failed)
+        assert all(message.next_attempt_at == now + notifications.RETRY_BASE_DELAY for message in failed)
+        assert 'HTTP 500' in {m.channel: m for m in failed}['webhook'].last_error
+
+        # Nada se reintenta antes de tiempo
+        assert notifications.deliver_pending(app, now=now + timedelta(seconds=30)) == (0, 0)
+
+        for attempt in range(2, notifications.MAX_ATTEMPTS + 1):
+            now += notifications.retry_delay(attempt - 1)
+            notifications.deliver_pending(app, now=now)
+        assert NotificationOutbox.query.filter_by(status='dead').count() == 2
+        assert notifications.retry_delay(20) == notifications.RETRY_MAX_DELAY
+
+
+def test_unreachable_smtp_server_reschedules(app, init_database):
+    with app.app_context():
+        config = dict(app.config)
+        app.config.update(SMTP_SERVER='127.0.0.1', SMTP_PORT=1, EMAIL_USERNAME='opsdeck@test.com')
+        try:
+            notifications.queue_email('Reminder', '<p>Body</p>', ['user@test.com'])
+            db.session.commit()
+            assert notifications.deliver_pending(app) == (0, 1)
+        finally:
+            app.config.update(SMTP_SERVER=config['SMTP_SERVER'], SMTP_PORT=config['SMTP_PORT'],
+                              EMAIL_USERNAME=config['EMAIL_USERNAME'])
+        message = NotificationOutbox.query.one()
+        assert message.status == 'pending'
+        assert 'connect' in message.last_error
+
+
+def test_expiry_scan_builds_one_digest_per_recipient(app, init_database, query_counter):
+    today = date.today()
+    in_7, in_30 = today + timedelta(days=7), today + timedelta(days=30)
+    with app.app_context():
+        db.session.add(NotificationSetting(email_enabled=True, email_recipient='it@test.com', webhook_enabled=True,
+                                           webhook_url='http://hooks.test/renewals', notify_days_before='30,7'))
+        supplier = Supplier(name='Vendor')
+        alice = User(name='Alice', email='alice@test.com')
+        course = Course(title='Security Awareness')
+        db.session.add_all([supplier, alice, course])
+        db.session.flush()
+        db.session.add_all([
+            Subscription(name='CRM', subscription_type='SaaS', renewal_date=in_30, renewal_period_type='yearly',
+                         cost=100.0, currency='EUR', supplier_id=supplier.id),
+            License(name='Designer', expiry_date=in_7),
+            License(name='Old license', expiry_date=in_7, is_archived=True),
+            License(name='Later license', expiry_date=in_7 + timedelta(days=1)),
+            Asset(name='Laptop', purchase_date=in_7 - relativedelta(months=24), warranty_length=24),
+            Peripheral(name='Dock', purchase_date=in_30 - relativedelta(months=12), warranty_length=12),
+            PaymentMethod(name='Company Visa', method_type='Credit Card', expiry_date=in_30),
+            CourseAssignment(course_id=course.id, user_id=alice.id, due_date=in_7),
+        ])
+        done = CourseAssignment(course_id=course.id, user_id=alice.id, due_date=in_30)
+        db.session.add(done)
+        db.session.flush()
+        db.session.add(CourseCompletion(assignment_id=done.id))
+        db.session.commit()
+
+        query_counter.reset()
+        found = notifications.check_upcoming_expiries(app, today=today)
+        # Una consulta por fuente, sin importar el tamaño de cada tabla
+        assert len([s for s in query_counter.statements if s.lstrip().upper().startswith('SELECT')]) <= 10
+
+        assert found == 6
+        emails = {m.recipient: m for m in NotificationOutbox.query.filter_by(channel='email')}
+        assert set(emails) == {'it@test.com', 'alice@test.com'}
+        digest = emails['it@test.com'].payload
+        for name in ('CRM', 'Designer', 'Laptop', 'Dock', 'Company Visa', 'Security Awareness'):
+            assert name in digest
+        assert 'Old license' not in digest and 'Later license' not in digest
+        assert 'Designer' not in emails['alice@test.com'].payload
+        assert 'Security Awareness' in emails['alice@test.com'].payload
+
+        webhook = json.loads(NotificationOutbox.query.filter_by(channel='webhook').one().payload)
+        assert [renewal['name'] for renewal in webhook['renewals']] == ['CRM']
+        assert len(webhook['events']) == found
@@ -0,0 +1,185 @@
+import os
+import time
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from src import db, pdf_jobs
+from src.models import User, Asset, Attachment, Framework, PdfJob
+
+
+def _wait_for_batch(client, batch_id, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = client.get(f'/pdf-jobs/batch/{batch_id}/status').get_json()
+        if status['finished']:
+            return status
+        time.sleep(0.2)
+    raise AssertionError('El lote de PDFs no terminó a tiempo')
+
+
+def test_dashboard_pdf_is_served_from_the_cache(auth_client, app, monkeypatch):
+    with app.app_context():
+        db.session.add(Framework(name='Cached Framework', is_active=True))
+        db.session.commit()
+
+    first = auth_client.get('/compliance/dashboard/pdf')
+    assert first.status_code == 200
+    assert first.mimetype == 'application/pdf'
+
+    # El contenido no ha cambiado (solo la hora de generación): no se vuelve a renderizar
+    def no_pool(*args, **kwargs):
+        raise AssertionError('El PDF debería servirse desde la caché')
+    monkeypatch.setattr(pdf_jobs, 'executor', no_pool)
+    second = auth_client.get('/compliance/dashboard/pdf')
+    assert second.status_code == 200
+    assert second.data == first.data
+    assert second.headers['Content-Disposition'] == 'attachment; filename=compliance_report.pdf'
+
+    # Otro usuario recibe el mismo PDF: no lleva el nombre de quien lo pidió
+    with app.app_context():
+        other = User(name='Other Admin', email='other@test.com', role='admin')
+        other.set_password('password')
+        db.session.add(other)
+        db.session.commit()
+    auth_client.post('/login', data={'email': 'other@test.com', 'password': 'password'})
+    assert auth_client.get('/compliance/dashboard/pdf').data == first.data
+
+    with app.app_context():
+        jobs = PdfJob.query.filter_by(kind='compliance-dashboard').all()
+        assert [job.status for job in jobs] == ['done', 'done', 'done']
+        assert len({job.content_hash for job in jobs}) == 1
+
+        # Un cambio en el dashboard produce otra clave de caché
+        db.session.add(Framework(name='Another Framework', is_active=True))
+        db.session.commit()
+    monkeypatch.undo()
+    assert auth_client.get('/compliance/dashboard/pdf').status_code == 200
+    with app.app_context():
+        assert len({job.content_hash for job in PdfJob.query.filter_by(kind='compliance-dashboard')}) == 2
+
+
+def test_bulk_inventory_generation_for_a_department(auth_client, app):
+    with app.app_context():
+        for i in range(3):
+            user = User(name=f'IT User {i}', email=f'it{i}@test.com', department='IT')
+            db.session.add(user)
+            db.session.flush()
+            db.session.add(Asset(name=f'Laptop {i}', status='In Use', user_id=user.id))
+        db.session.add(User(name='HR User', email='hr@test.com', department='HR'))
+        db.session.add(User(name='Old IT User', email='old@test.com', department='IT', is_archived=True))
+        db.session.commit()
+
+    response = auth_client.post('/users/inventory/generate-bulk', data={'department': 'IT'})
+    assert response.status_code == 302
+    batch_id = response.headers['Location'].rstrip('/').split('/')[-1]
+
+    status = _wait_for_batch(auth_client, batch_id)
+    assert (status['total'], status['done'], status['error']) == (3, 3, False)
+
+    response = auth_client.get(f'/pdf-jobs/batch/{batch_id}', follow_redirects=True)
+    assert b'3 PDFs generated and saved.' in response.data
+
+    with app.app_context():
+        attachments = Attachment.query.filter_by(linkable_type='User').all()
+        owners = {db.session.get(User, attachment.linkable_id).name for attachment in attachments}
+        assert owners == {'IT User 0', 'IT User 1', 'IT User 2'}
+        for attachment in attachments:
+            assert os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], attachment.secure_filename))
+
+
+def test_pending_job_shows_the_progress_page(auth_client, app):
+    with app.app_context():
+        db.session.add(PdfJob(id='a' * 32, kind='compliance-dashboard', content_hash='0' * 64,
+                              filename='report.pdf', requested_by_id=User.query.first().id))
+        db.session.commit()
+
+    response = auth_client.get(f"/pdf-jobs/{'a' * 32}")
+    assert response.status_code == 200
+    assert b'Generating report.pdf' in response.data
+    status = auth_client.get(f"/pdf-jobs/{'a' * 32}/status").get_json()
+    assert (status['status'], status['finished'], status['download_url']) == ('queued', False, None)
+    assert auth_client.get(f"/pdf-jobs/{'a' * 32}/download").status_code == 404
+
+
+def test_jobs_lost_with_their_worker_are_failed(auth_client, app):
+    """Un trabajo cuyo proceso desapareció no se queda en cola para siempre."""
+    with app.app_context():
+        user_id = User.query.first().id
+        stale = datetime.utcnow() - timedelta(seconds=app.config['PDF_JOB_TIMEOUT_SECONDS'] + 1)
+        db.session.add(PdfJob(id='d' * 32, kind='compliance-dashboard', content_hash='0' * 64,
+                              filename='report.pdf', requested_by_id=user_id, created_at=stale))
+        for i, created_at in enumerate([stale, datetime.utcnow()]):
+            db.session.add(PdfJob(id=f'{i}' * 32, kind='inventory', batch_id='e' * 32, content_hash='0' * 64,
+                                  filename='inventory.pdf', requested_by_id=user_id, created_at=created_at))
+        db.session.commit()
+
+    status = auth_client.get(f"/pdf-jobs/{'d' * 32}/status").get_json()
+    assert (status['status'], status['finished'], status['error']) == ('failed', True, True)
+
+    status = auth_client.get(f"/pdf-jobs/batch/{'e' * 32}/status").get_json()
+    assert (status['finished'], status['done']) == (False, 1)
+    with app.app_context():
+        assert db.session.get(PdfJob, '0' * 32).status == 'failed'
+        assert db.session.get(PdfJob, '1' * 32).status == 'queued'
+
+
+def test_queued_jobs_of_a_live_process_are_not_failed(auth_client, app, monkeypatch):
+    """Un lote mayor que el pool espera más que el timeout sin darse por perdido."""
+    monkeypatch.setitem(app.config, 'PDF_JOB_TIMEOUT_SECONDS', 1)
+    monkeypatch.setattr(pdf_jobs, 'HEARTBEAT_SECONDS', 0.2)
+    monkeypatch.setattr(pdf_jobs, '_heartbeats', {})
+    # Los renders esperan su turno en el pool (de 2 procesos)
+    futures = []
+    def pending_render(app, html, path, digest):
+        futures.append(Future())
+        return futures[-1]
+    monkeypatch.setattr(pdf_jobs, '_start_render', pending_render)
+
+    with app.app_context():
+        user_id = User.query.first().id
+        for i in range(app.config['PDF_WORKERS'] * 3):
+            pdf_jobs.submit(f'<p>{i}</p>', 'inventory', f'{i}.pdf', batch_id='f' * 32, requested_by_id=user_id)
+
+    time.sleep(1.5)
+    status = auth_client.get(f"/pdf-jobs/batch/{'f' * 32}/status").get_json()
+    assert (status['finished'], status['error'], status['done']) == (False, False, 0)
+
+    for future in futures:
+        future.set_result(None)
+    status = auth_client.get(f"/pdf-jobs/batch/{'f' * 32}/status").get_json()
+    assert (status['finished'], status['error'], status['done']) == (True, False, 6)
+
+
+def test_failed_render_is_reported(auth_client, app):
+    with app.app_context():
+        db.session.add(PdfJob(id='b' * 32, kind='compliance-dashboard', content_hash='0' * 64,
+                              filename='report.pdf', return_url='/compliance/dashboard',
+                              requested_by_id=User.query.first().id))
+        db.session.commit()
+
+    future = Future()
+    future.set_exception(RuntimeError('WeasyPrint exploded'))
+    pdf_jobs.finish(app, 'b' * 32, future)
+    # Una segunda llamada no cambia el resultado
+    pdf_jobs.finish(app, 'b' * 32)
+
+    with app.app_context():
+        job = db.session.get(PdfJob, 'b' * 32)
+        assert job.status == 'failed'
+        assert 'WeasyPrint exploded' in job.error
+
+    response = auth_client.get(f"/pdf-jobs/{'b' * 32}")
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith('/compliance/dashboard')
+
+
+def test_jobs_are_private_to_their_requester(user_client, app):
+    with app.app_context():
+        admin = User(name='Other Admin', email='other@test.com', role='admin')
+        db.session.add(admin)
+        db.session.flush()
+        db.session.add(PdfJob(id='c' * 32, kind='compliance-dashboard', content_hash='0' * 64,
+                              filename='report.pdf', requested_by_id=admin.id))
+        db.session.commit()
+
+    assert user_client.get(f"/pdf-jobs/{'c' * 32}").status_code == 404
+    assert user_client.get(f"/pdf-jobs/{'c' * 32}/status").status_code == 404
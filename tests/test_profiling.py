@@ -0,0 +1,56 @@
+import os
+import pytest
+from src import profiling
+
+
+@pytest.fixture
+def profile_folder(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, 'PROFILE_FOLDER', str(tmp_path))
+    return tmp_path
+
+
+def test_admin_can_profile_a_request(auth_client, app, profile_folder):
+    response = auth_client.get('/users/?_profile=1&sort=name')
+    assert response.status_code == 200
+    profile_id = response.headers['X-Profile-Id']
+    assert sorted(os.listdir(profile_folder)) == [f'{profile_id}.json', f'{profile_id}.prof']
+
+    [profile] = profiling.list_profiles(app)
+    assert (profile['endpoint'], profile['status'], profile['args']) == ('users.users', 200, {'sort': 'name'})
+    assert profile['user'] == 'admin@test.com' and profile['duration_ms'] > 0
+
+    # También con la cabecera
+    assert 'X-Profile-Id' in auth_client.get('/users/', headers={'X-Profile': '1'}).headers
+
+    page = auth_client.get('/admin/profiles')
+    assert page.status_code == 200 and profile_id.encode() in page.data
+    detail = auth_client.get(f'/admin/profiles/{profile_id}')
+    assert detail.status_code == 200 and b'src/routes/users.py' in detail.data
+    assert auth_client.get(f'/admin/profiles/{profile_id}?sort=tottime').status_code == 200
+    download = auth_client.get(f'/admin/profiles/{profile_id}/download')
+    assert download.status_code == 200 and download.data == (profile_folder / f'{profile_id}.prof').read_bytes()
+
+
+def test_requests_are_not_profiled_unless_asked(auth_client, app, profile_folder):
+    assert 'X-Profile-Id' not in auth_client.get('/users/').headers
+    assert os.listdir(profile_folder) == []
+
+
+def test_regular_users_cannot_profile(user_client, app, profile_folder):
+    response = user_client.get('/?_profile=1')
+    assert 'X-Profile-Id' not in response.headers
+    assert os.listdir(profile_folder) == []
+    assert user_client.get('/admin/profiles').status_code == 302
+
+
+def test_only_the_latest_profiles_are_kept(auth_client, app, profile_folder, monkeypatch):
+    monkeypatch.setitem(app.config, 'PROFILE_MAX_FILES', 2)
+    ids = [auth_client.get('/users/?_profile=1').headers['X-Profile-Id'] for _ in range(3)]
+    assert [profile['id'] for profile in profiling.list_profiles(app)] == [ids[2], ids[1]]
+    assert len(os.listdir(profile_folder)) == 4
+
+
+def test_unknown_profiles_are_not_found(auth_client, app, profile_folder):
+    assert profiling.profile_path(app, '../../etc/passwd') is None
+    assert auth_client.get('/admin/profiles/20260101000000000000-deadbeef').status_code == 404
+    assert auth_client.get('/admin/profiles/nope/download').status_code == 404
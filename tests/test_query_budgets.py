@@ -0,0 +1,78 @@
+import json
+import logging
+import re
+import pytest
+from werkzeug.routing import IntegerConverter
+from src import db
+from src.instrumentation import NPlusOneError, RequestStats
+from src.seeder import seed_demo_data
+
+# Consultas máximas por petición con los datos de demo
+QUERY_BUDGET = 15
+
+# Rutas rotas por motivos ajenos al número de consultas
+BROKEN_ENDPOINTS = {
+    'compliance.new_inventory',  # La plantilla usa csrf_token() sin CSRFProtect
+    'licenses.archived_licenses',  # Falta la plantilla licenses/archived.html
+}
+SKIPPED_ENDPOINTS = {'static', 'main.logout'}
+
+
+def _crawlable_urls(app):
+    """Las rutas GET cuyos argumentos son enteros, con el id 1 (que existe en los datos de demo)."""
+    for rule in sorted(app.url_map.iter_rules(), key=lambda rule: rule.rule):
+        if 'GET' not in rule.methods or rule.endpoint in SKIPPED_ENDPOINTS | BROKEN_ENDPOINTS:
+            continue
+        if not all(isinstance(converter, IntegerConverter) for converter in rule._converters.values()):
+            continue
+        yield rule.endpoint, re.sub(r'<int:\w+>', '1', rule.rule)
+
+
+def test_request_stats_group_queries_by_shape():
+    stats = RequestStats(track_shapes=True)
+    for i in range(4):
+        stats.add_query(f'SELECT * FROM "group" WHERE "group".id = {i}', 0.1)
+    stats.add_query('SELECT * FROM asset WHERE id IN (?, ?)', 0.1)
+    stats.add_query('UPDATE asset SET name = ? WHERE id = ?', 0.1)
+    assert stats.repeated(3) == [('SELECT * FROM "group" WHERE "group".id = ?', 4)]
+    assert stats.repeated(4) == []
+
+
+def test_detector_raises_or_warns(auth_client, app, nplusone, caplog):
+    # Con umbral 0 cualquier SELECT cuenta como repetida
+    nplusone['NPLUSONE_THRESHOLD'] = 0
+    with pytest.raises(NPlusOneError) as error:
+        auth_client.get('/users/')
+    assert error.value.endpoint == 'users.users'
+
+    nplusone['NPLUSONE_MODE'] = 'warn'
+    with caplog.at_level(logging.WARNING):
+        assert auth_client.get('/users/').status_code == 200
+    events = [json.loads(record.getMessage()) for record in caplog.records if record.getMessage().startswith('{')]
+    assert any(event['event'] == 'n_plus_one' and event['endpoint'] == 'users.users' for event in events)
+
+
+def test_every_route_stays_within_its_query_budget(auth_client, app, nplusone):
+    """
+    Recorre todas las páginas con los datos de demo: ninguna puede repetir la
+    misma SELECT más de dos veces (una por fila) ni pasar de QUERY_BUDGET consultas.
+    """
+    nplusone['NPLUSONE_THRESHOLD'] = 2
+    with app.app_context():
+        seed_demo_data()
+
+    failures, over_budget = [], []
+    for endpoint, url in _crawlable_urls(app):
+        # Los tests comparten la sesión: se vacía para que cada petición empiece en frío, como en producción
+        db.session.expunge_all()
+        try:
+            response = auth_client.get(url)
+        except NPlusOneError as error:
+            failures.append(str(error))
+            continue
+        assert response.status_code < 500, url
+        queries = int(response.headers['Server-Timing'].split('desc="')[1].split(' queries')[0])
+        if queries > QUERY_BUDGET:
+            over_budget.append((endpoint, queries))
+    assert failures == []
+    assert over_budget == []
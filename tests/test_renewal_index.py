@@ -0,0 +1,94 @@
+from datetime import date, timedelta
+from src import db
+from src.models import Subscription, Supplier, RenewalOccurrence
+from src import renewal_index
+
+
+def _create_subscription(**overrides):
+    supplier = Supplier(name='Index Supplier')
+    db.session.add(supplier)
+    db.session.flush()
+    fields = dict(
+        name='Monthly SaaS', subscription_type='SaaS', renewal_date=date.today().replace(day=1),
+        renewal_period_type='monthly', renewal_period_value=1, cost=10.0, currency='EUR',
+        supplier_id=supplier.id
+    )
+    fields.update(overrides)
+    subscription = Subscription(**fields)
+    db.session.add(subscription)
+    db.session.commit()
+    return subscription
+
+
+def test_insert_materializes_horizon(app, init_database):
+    with app.app_context():
+        subscription = _create_subscription()
+        dates = [row.renewal_date for row in RenewalOccurrence.query.order_by(RenewalOccurrence.renewal_date)]
+        horizon_start, horizon_end = renewal_index.horizon_bounds()
+        assert dates == list(subscription.renewals_between(horizon_start, horizon_end))
+        assert len(dates) == renewal_index.RENEWAL_HORIZON_MONTHS + 1
+
+
+def test_only_schedule_changes_regenerate(app, init_database):
+    with app.app_context():
+        subscription = _create_subscription()
+        ids_before = {row.id for row in RenewalOccurrence.query}
+
+        subscription.description = 'Irrelevant change'
+        db.session.commit()
+        assert {row.id for row in RenewalOccurrence.query} == ids_before
+
+        subscription.cost = 25.0
+        subscription.currency = 'USD'
+        db.session.commit()
+        rows = RenewalOccurrence.query.all()
+        assert len(rows) == len(ids_before)
+        assert {row.cost_eur for row in rows} == {25.0 * 0.92}
+
+        subscription.is_archived = True
+        db.session.commit()
+        assert RenewalOccurrence.query.count() == 0
+
+
+def test_delete_removes_occurrences(app, init_database):
+    with app.app_context():
+        subscription = _create_subscription()
+        db.session.delete(subscription)
+        db.session.commit()
+        assert RenewalOccurrence.query.count() == 0
+
+
+def test_nightly_extension_appends_new_dates(app, init_database):
+    with app.app_context():
+        subscription = _create_subscription(renewal_period_type='custom', renewal_period_value=7)
+        # Simulate a table built a while ago: drop the tail of the horizon
+        cutoff = date.today() + timedelta(days=200)
+        RenewalOccurrence.query.filter(RenewalOccurrence.renewal_date > cutoff).delete()
+        db.session.commit()
+
+        renewal_index.extend_renewal_horizon(app)
+
+        horizon_start, horizon_end = renewal_index.horizon_bounds()
+        dates = [row.renewal_date for row in RenewalOccurrence.query.order_by(RenewalOccurrence.renewal_date)]
+        assert dates == list(subscription.renewals_between(horizon_start, horizon_end))
+
+
+def test_window_queries_match_schedule_expansion(app, init_database):
+    with app.app_context():
+        subscription = _create_subscription(renewal_period_type='custom', renewal_period_value=3)
+        today = date.today()
+
+        in_horizon = renewal_index.renewals_in_window(today, today + timedelta(days=30))
+        assert [d for d, _ in in_horizon] == list(subscription.renewals_between(today, today + timedelta(days=30)))
+
+        # Beyond the materialized horizon the schedule is expanded directly
+        far_start = today + timedelta(days=365 * 5)
+        far_end = far_start + timedelta(days=30)
+        beyond = renewal_index.renewals_in_window(far_start, far_end)
+        assert [d for d, _ in beyond] == list(subscription.renewals_between(far_start, far_end))
+
+        months, totals = renewal_index.monthly_totals(today.replace(day=1), today + timedelta(days=90))
+        expected = {}
+        for renewal in subscription.renewals_between(today.replace(day=1), today + timedelta(days=90)):
+            expected[renewal.replace(day=1)] = expected.get(renewal.replace(day=1), 0) + 10.0
+        assert dict(zip(months, totals)) == {month: expected.get(month, 0.0) for month in months}
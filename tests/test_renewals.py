@@ -0,0 +1,90 @@
+from datetime import date, timedelta
+from src import db
+from src.models import Subscription, Supplier
+from src.renewals import RenewalSchedule
+
+
+def test_custom_schedule_old_anchor():
+    """A daily schedule anchored years ago resolves directly, without stepping."""
+    schedule = RenewalSchedule(date(2015, 3, 10), 'custom', 1)
+    assert schedule.first_on_or_after(date(2025, 6, 1)) == date(2025, 6, 1)
+
+    schedule = RenewalSchedule(date(2020, 1, 1), 'custom', 10)
+    # 2020-01-01 + 10 * 183 days = 2025-01-04
+    assert schedule.first_on_or_after(date(2025, 1, 1)) == date(2025, 1, 4)
+    assert schedule.first_on_or_after(date(2025, 1, 4)) == date(2025, 1, 4)
+
+
+def test_anchor_in_future_is_first_occurrence():
+    schedule = RenewalSchedule(date(2030, 5, 20), 'monthly', 1, 'last')
+    assert schedule.first_on_or_after(date(2025, 1, 1)) == date(2030, 5, 20)
+
+
+def test_monthly_day_rules():
+    first = RenewalSchedule(date(2024, 1, 15), 'monthly', 1, 'first')
+    assert first.first_on_or_after(date(2024, 1, 16)) == date(2024, 2, 1)
+
+    last = RenewalSchedule(date(2024, 1, 15), 'monthly', 1, 'last')
+    assert last.first_on_or_after(date(2024, 2, 1)) == date(2024, 2, 29)
+    assert last.first_on_or_after(date(2025, 2, 1)) == date(2025, 2, 28)
+
+    specific = RenewalSchedule(date(2024, 1, 31), 'monthly', 1, '30')
+    assert specific.first_on_or_after(date(2024, 2, 1)) == date(2024, 2, 29)
+    assert specific.first_on_or_after(date(2024, 3, 1)) == date(2024, 3, 30)
+
+
+def test_monthly_day_is_kept_after_short_months():
+    schedule = RenewalSchedule(date(2024, 1, 31), 'monthly', 1)
+    assert list(schedule.between(date(2024, 2, 1), date(2024, 4, 30))) == [
+        date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30)
+    ]
+
+
+def test_quarterly_and_yearly_schedules():
+    quarterly = RenewalSchedule(date(2023, 11, 5), 'monthly', 3)
+    assert quarterly.first_on_or_after(date(2024, 5, 6)) == date(2024, 8, 5)
+
+    biennial = RenewalSchedule(date(2016, 2, 29), 'yearly', 2)
+    assert biennial.first_on_or_after(date(2019, 1, 1)) == date(2020, 2, 29)
+    assert biennial.first_on_or_after(date(2020, 3, 1)) == date(2022, 2, 28)
+
+
+def test_matches_step_by_step_walk():
+    """The closed form agrees with walking one period at a time."""
+    for monthly_day in ['first', 'last', '15', '31']:
+        schedule = RenewalSchedule(date(2019, 7, 9), 'monthly', 2, monthly_day)
+        walked, renewal = [], schedule.anchor
+        while renewal <= date(2026, 1, 1):
+            if renewal >= date(2021, 1, 1):
+                walked.append(renewal)
+            renewal = schedule.next_after(renewal)
+        assert list(schedule.between(date(2021, 1, 1), date(2026, 1, 1))) == walked
+
+
+def test_between_is_lazy():
+    schedule = RenewalSchedule(date(2000, 1, 1), 'custom', 1)
+    occurrences = schedule.between(date(2000, 1, 1), date(9999, 1, 1))
+    assert next(occurrences) == date(2000, 1, 1)
+    assert next(occurrences) == date(2000, 1, 2)
+
+
+def test_calendar_events_use_schedule(auth_client, app):
+    today = date.today()
+    with app.app_context():
+        supplier = Supplier(name='Calendar Supplier')
+        db.session.add(supplier)
+        db.session.flush()
+        db.session.add(Subscription(
+            name='Daily Backup', subscription_type='SaaS', renewal_date=today - timedelta(days=3000),
+            renewal_period_type='custom', renewal_period_value=1, cost=1.0, currency='EUR',
+            supplier_id=supplier.id
+        ))
+        db.session.commit()
+
+    start = today - timedelta(days=5)
+    end = today + timedelta(days=7)
+    response = auth_client.get(f'/subscriptions/api/calendar-events?start={start.isoformat()}&end={end.isoformat()}')
+    assert response.status_code == 200
+    starts = [event['start'] for event in response.get_json()]
+    # Past renewals are hidden and the end bound is exclusive
+    assert starts == [(today + timedelta(days=i)).isoformat() for i in range(7)]
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+from src import db, scheduler
+from src.models import JobRun, SchedulerLease
+
+
+def test_only_one_holder_gets_the_lease(app, init_database):
+    with app.app_context():
+        now = datetime.utcnow()
+        assert scheduler.acquire_lease('worker-a', now)
+        assert not scheduler.acquire_lease('worker-b', now)
+        # El líder renueva su lease
+        assert scheduler.acquire_lease('worker-a', now + timedelta(seconds=60))
+        assert not scheduler.acquire_lease('worker-b', now + timedelta(seconds=120))
+
+        # Si deja de renovar, otro proceso toma el relevo al expirar
+        later = now + timedelta(seconds=60) + scheduler.LEASE_TTL + timedelta(seconds=1)
+        assert scheduler.acquire_lease('worker-b', later)
+        assert not scheduler.acquire_lease('worker-a', later)
+
+        scheduler.release_lease('worker-b')
+        assert scheduler.acquire_lease('worker-a')
+        assert SchedulerLease.query.count() == 1
+
+
+def test_jobs_run_once_and_are_recorded(app, init_database):
+    calls = []
+
+    def job(app):
+        calls.append(1)
+        return 42
+
+    def broken_job(app):
+        raise RuntimeError('boom')
+
+    with app.app_context():
+        run = scheduler.run_job(app, 'demo', job, holder='worker-a')
+        assert scheduler.run_job(app, 'demo', job, holder='worker-b') is None
+        assert len(calls) == 1
+        assert (run.status, run.items_processed) == ('success', 42)
+        assert run.duration_ms is not None and run.finished_at is not None
+
+        failed = scheduler.run_job(app, 'broken', broken_job, holder='worker-a')
+        assert failed.status == 'failed'
+        assert 'boom' in failed.error
+        assert JobRun.query.count() == 2
+
+
+def test_job_history_page(auth_client, app):
+    with app.app_context():
+        scheduler.run_job(app, 'demo', lambda app: 3, holder='worker-a')
+
+    response = auth_client.get('/admin/jobs')
+    assert response.status_code == 200
+    assert b'worker-a' in response.data
+    assert b'check-upcoming-expiries' in response.data
+
+
+def test_daily_jobs_run_once_a_day(app, init_database, monkeypatch):
+    calls = []
+    monkeypatch.setattr(scheduler, 'DAILY_JOBS', {'daily'})
+
+    with app.app_context():
+        assert scheduler.run_job(app, 'daily', lambda app: calls.append(1) or 1, holder='worker-a').status == 'success'
+        # Otro proceso que toma el relevo el mismo día no vuelve a ejecutarlo
+        scheduler.release_lease('worker-a')
+        assert scheduler.run_job(app, 'daily', lambda app: calls.append(1) or 1, holder='worker-b') is None
+        assert len(calls) == 1
+
+        # Una ejecución fallida no cuenta
+        JobRun.query.update({'status': 'failed'})
+        db.session.commit()
+        assert scheduler.run_job(app, 'daily', lambda app: 1, holder='worker-b').status == 'success'
+
+
+def test_job_history_is_bounded(app, init_database, monkeypatch):
+    monkeypatch.setattr(scheduler, 'QUIET_JOBS', {'quiet'})
+    monkeypatch.setattr(scheduler, 'JOB_HISTORY_RUNS', 3)
+
+    with app.app_context():
+        # Las ejecuciones sin trabajo de los jobs frecuentes no se guardan
+        assert scheduler.run_job(app, 'quiet', lambda app: 0, holder='worker-a') is None
+        assert scheduler.run_job(app, 'quiet', lambda app: 2, holder='worker-a').items_processed == 2
+        assert JobRun.query.filter_by(job_name='quiet').count() == 1
+
+        runs = [scheduler.run_job(app, 'demo', lambda app: 1, holder='worker-a').id for _ in range(5)]
+        assert [run.id for run in JobRun.query.filter_by(job_name='demo').order_by(JobRun.id)] == runs[-3:]
+        assert JobRun.query.filter_by(job_name='quiet').count() == 1
+
+
+def test_missed_daily_jobs_are_caught_up(app, init_database, monkeypatch):
+    calls = []
+    monkeypatch.setattr(scheduler, 'DAILY_JOBS', {'early', 'late'})
+    monkeypatch.setattr(scheduler, 'JOBS', (
+        ('early', lambda app: calls.append('early') or 1, dict(trigger='cron', hour=2)),
+        ('late', lambda app: calls.append('late') or 1, dict(trigger='cron', hour=23)),
+    ))
+
+    with app.app_context():
+        # Otro proceso tenía el lease a la hora del cron y se reinició
+        assert scheduler.acquire_lease('worker-a')
+        assert scheduler.catch_up_daily_jobs(app, now=datetime.now().replace(hour=10)) == []
+        scheduler.release_lease('worker-a')
+
+        # Pasada su hora, el job que no se ejecutó hoy se recupera una sola vez
+        now = datetime.now().replace(hour=10)
+        assert scheduler.catch_up_daily_jobs(app, now=now) == ['early']
+        assert scheduler.catch_up_daily_jobs(app, now=now) == []
+        assert calls == ['early']
+
+
+def test_a_job_does_not_run_twice_at_once_in_a_process(app, init_database):
+    def job(app):
+        # El disparo del cron y la recuperación coinciden
+        assert scheduler.run_job(app, 'demo', job, holder='worker-a') is None
+        return 1
+
+    with app.app_context():
+        assert scheduler.run_job(app, 'demo', job, holder='worker-a').status == 'success'
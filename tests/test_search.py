@@ -0,0 +1,85 @@
+from src import db
+from src.models import Supplier, Contact, Asset, Risk, SecurityIncident, SearchDocument
+
+
+def _search(auth_client, query):
+    response = auth_client.get(f'/api/search?q={query}')
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_search_is_prefix_matched_across_entities(auth_client, app):
+    with app.app_context():
+        supplier = Supplier(name='Globex Corporation')
+        db.session.add(supplier)
+        db.session.flush()
+        db.session.add_all([
+            Contact(name='Hank Scorpio', supplier_id=supplier.id),
+            Asset(name='Globex Laptop', serial_number='GLX-4411', status='In Use'),
+            Risk(risk_description='Globex data centre outage'),
+            SecurityIncident(title='Phishing wave', description='Targeted Globex finance team',
+                             severity='SEV-2', status='Investigating'),
+        ])
+        db.session.commit()
+
+    results = _search(auth_client, 'glob')
+    assert {item['type'] for item in results} == {'Supplier', 'Asset', 'Risk', 'Incident'}
+    # Title hits outrank body-only hits
+    assert results[-1]['type'] == 'Incident'
+
+    # Serial numbers are tokenized, every term must match
+    assert [item['name'] for item in _search(auth_client, 'GLX-44')] == ['Globex Laptop']
+    assert _search(auth_client, 'glob nothing') == []
+
+    contact = _search(auth_client, 'scorp')
+    assert contact == [{'name': 'Hank Scorpio (Globex Corporation)', 'type': 'Contact', 'url': '/contacts/1'}]
+
+
+def test_index_follows_updates_archiving_and_deletes(auth_client, app):
+    with app.app_context():
+        supplier = Supplier(name='Initech')
+        db.session.add(supplier)
+        db.session.flush()
+        db.session.add(Contact(name='Bill Lumbergh', supplier_id=supplier.id))
+        db.session.commit()
+
+        supplier.name = 'Initrode'
+        db.session.commit()
+    assert [item['name'] for item in _search(auth_client, 'lumb')] == ['Bill Lumbergh (Initrode)']
+    assert _search(auth_client, 'initech') == []
+
+    with app.app_context():
+        Contact.query.first().is_archived = True
+        db.session.commit()
+    assert _search(auth_client, 'lumb') == []
+
+    with app.app_context():
+        db.session.delete(Contact.query.first())
+        db.session.delete(Supplier.query.first())
+        db.session.commit()
+        assert SearchDocument.query.count() == 0
+
+
+def test_results_are_capped_per_type(auth_client, app):
+    with app.app_context():
+        db.session.add_all([Supplier(name=f'Acme {i}') for i in range(8)])
+        db.session.add_all([Asset(name=f'Acme Server {i}', status='In Use') for i in range(3)])
+        db.session.commit()
+
+    results = _search(auth_client, 'acme')
+    assert [item['type'] for item in results].count('Supplier') == 5
+    assert [item['type'] for item in results].count('Asset') == 3
+
+
+def test_rebuild_restores_index(auth_client, app):
+    with app.app_context():
+        db.session.add(Supplier(name='Vandelay Industries'))
+        db.session.commit()
+        SearchDocument.query.delete()
+        db.session.commit()
+    assert _search(auth_client, 'vandelay') == []
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['rebuild-search-index'])
+    assert 'Indexed 1 records' in result.output
+    assert [item['name'] for item in _search(auth_client, 'vandelay')] == ['Vandelay Industries']
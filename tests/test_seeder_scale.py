@@ -0,0 +1,44 @@
+from sqlalchemy import func
+from src import db
+from src.models import (
+    User, Asset, Peripheral, Subscription, CostHistory, License, CourseAssignment,
+    RenewalOccurrence, SearchDocument, compute_warranty_end_date
+)
+from src.seeder_scale import PER_FACTOR, seed_scale
+
+
+def test_seed_scale_command(app, init_database):
+    result = app.test_cli_runner().invoke(args=['seed-scale', '--factor', '1'])
+    assert result.exit_code == 0, result.output
+    assert 'Inserted' in result.output
+
+    with app.app_context():
+        assert User.query.count() == PER_FACTOR['users']
+        assert Asset.query.count() == PER_FACTOR['assets']
+        # Las tablas derivadas se reconstruyen al final
+        assert RenewalOccurrence.query.count() > 0
+        active_assets = Asset.query.filter_by(is_archived=False).count()
+        assert SearchDocument.query.filter_by(entity_type='Asset').count() == active_assets
+
+
+def test_seeded_data_is_consistent(app, init_database):
+    with app.app_context():
+        first = seed_scale(1, seed=1)
+        # Una segunda ejecución añade datos nuevos sin chocar con los ids existentes
+        second = seed_scale(1, seed=2)
+        assert first['asset'] == second['asset'] == PER_FACTOR['assets']
+        assert Asset.query.count() == 2 * PER_FACTOR['assets']
+
+        user_ids = {user_id for user_id, in db.session.query(User.id)}
+        assert {user_id for user_id, in db.session.query(License.user_id).filter(License.user_id.isnot(None))} <= user_ids
+        assert {user_id for user_id, in db.session.query(CourseAssignment.user_id)} <= user_ids
+
+        for asset in Asset.query.limit(50):
+            assert asset.warranty_end_date == compute_warranty_end_date(asset.purchase_date, asset.warranty_length)
+        for peripheral in Peripheral.query.filter(Peripheral.asset_id.isnot(None)).limit(50):
+            assert peripheral.user_id == peripheral.asset.user_id
+
+        # El coste actual es la última entrada del historial
+        for subscription in Subscription.query.limit(50):
+            assert subscription.cost_history[-1].cost == subscription.cost
+        assert db.session.query(func.count(CostHistory.id)).scalar() >= Subscription.query.count()
@@ -0,0 +1,72 @@
+import re
+from src import db
+from src.models import Asset, User, Location
+
+
+def _add_assets(count):
+    office = Location(name='Office')
+    warehouse = Location(name='Warehouse')
+    owner = User(name='Owner', email='owner@test.com')
+    db.session.add_all([office, warehouse, owner])
+    db.session.flush()
+    for i in range(count):
+        db.session.add(Asset(
+            name=f'Asset {i:03d}', serial_number=f'SN-{i:03d}', status='In Use' if i % 2 else 'In Stock',
+            location_id=office.id if i % 3 else warehouse.id, user_id=owner.id if i % 5 == 0 else None
+        ))
+    db.session.add(Asset(name='Archived asset', is_archived=True))
+    db.session.commit()
+
+
+def test_list_view_renders_first_page_only(auth_client, app):
+    with app.app_context():
+        _add_assets(30)
+
+    response = auth_client.get('/assets/')
+    assert response.status_code == 200
+    assert b'data-server-table=' in response.data
+    assert b'Asset 024' in response.data
+    assert b'Asset 025' not in response.data
+    assert b'Archived asset' not in response.data
+    assert b'data-total="30"' in response.data
+
+
+def test_keyset_pages_cover_all_rows(auth_client, app):
+    with app.app_context():
+        _add_assets(23)
+
+    names = []
+    cursor = None
+    while True:
+        url = '/assets/api/table?per_page=10&sort=name&direction=desc'
+        if cursor:
+            url += f'&cursor={cursor}'
+        data = auth_client.get(url).get_json()
+        assert data['total'] == 23
+        names += re.findall(r'>(Asset \d+)</a>', data['rows_html'])
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+    assert len(names) == 23
+    assert names == sorted(names, reverse=True)
+
+
+def test_search_and_filters(auth_client, app):
+    with app.app_context():
+        _add_assets(30)
+
+    data = auth_client.get('/assets/api/table?q=sn-01').get_json()
+    assert data['filtered'] == 10
+    assert data['total'] == 30
+
+    data = auth_client.get('/assets/api/table?filter[status]=In+Use&filter[location]=Warehouse').get_json()
+    assert data['filtered'] == 5
+
+    # Rows without a user sort as an empty name
+    data = auth_client.get('/assets/api/table?sort=user&direction=desc&per_page=6').get_json()
+    assert data['count'] == 6
+    assert data['rows_html'].count('Owner') == 6
+
+    # Unknown columns and directions fall back to the defaults
+    data = auth_client.get('/assets/api/table?sort=secret&direction=sideways&per_page=500').get_json()
+    assert (data['sort'], data['direction'], data['per_page']) == ('name', 'asc', 100)
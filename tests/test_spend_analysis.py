@@ -0,0 +1,96 @@
+import csv
+import io
+import re
+from datetime import date
+from src import db
+from src.models import Asset, Peripheral, License, Software, Supplier, Purchase, User, Group, Location
+
+
+def _add_items():
+    dell = Supplier(name='Dell')
+    acme = Supplier(name='Acme')
+    office = Location(name='Office')
+    alice = User(name='Alice', email='alice@test.com')
+    bob = User(name='Bob', email='bob@test.com')
+    team = Group(name='Team', users=[alice])
+    db.session.add_all([dell, acme, office, alice, bob, team])
+    db.session.flush()
+    for i in range(12):
+        db.session.add(Asset(
+            name=f'Laptop {i:02d}', brand='Dell', cost=1000, currency='EUR', purchase_date=date(2024, 1, i + 1),
+            supplier_id=dell.id, location_id=office.id if i < 4 else None, user_id=alice.id if i % 2 else bob.id
+        ))
+    db.session.add(Asset(name='Archived laptop', cost=999, purchase_date=date(2024, 2, 1), is_archived=True))
+    db.session.add(Peripheral(name='Mouse', brand='Logi', cost=20, currency='USD', purchase_date=date(2024, 3, 1), supplier_id=acme.id))
+    purchase = Purchase(description='Design tools', purchase_date=date(2024, 4, 1), supplier_id=acme.id)
+    software = Software(name='Designer')
+    db.session.add_all([purchase, software])
+    db.session.flush()
+    db.session.add(License(name='Designer seat', cost=300, currency='EUR', purchase_date=date(2024, 4, 1),
+                           purchase_id=purchase.id, software_id=software.id, user_id=alice.id))
+    db.session.add(License(name='Free seat', purchase_date=date(2024, 4, 1)))  # Sin coste, no cuenta
+    db.session.commit()
+    return dell.id, acme.id, office.id, team.id
+
+
+def test_totals_and_first_page_come_from_sql(auth_client, app, query_counter):
+    with app.app_context():
+        _add_items()
+
+    query_counter.reset()
+    response = auth_client.get('/reports/spend-analysis?per_page=10')
+    assert response.status_code == 200
+    # 12 portátiles + 1 periférico + 1 licencia
+    assert b'data-total="14"' in response.data
+    assert b'EUR 12300.00' in response.data
+    assert b'USD 20.00' in response.data
+    assert b'Archived laptop' not in response.data
+    # La primera página va por fecha de compra descendente
+    names = re.findall(r'>(Designer seat|Mouse|Laptop \d+)</a>', response.get_data(as_text=True))
+    assert names[:3] == ['Designer seat', 'Mouse', 'Laptop 11']
+    assert len(names) == 10
+    # Las consultas no dependen del número de filas
+    assert len(query_counter.statements) < 15
+
+
+def test_filters_apply_per_item_type(auth_client, app):
+    with app.app_context():
+        dell_id, acme_id, office_id, team_id = _add_items()
+
+    data = auth_client.get(f'/reports/spend-analysis/api/table?supplier_id={acme_id}').get_json()
+    assert data['total'] == 2
+    assert 'Designer seat' in data['rows_html'] and 'Mouse' in data['rows_html']
+
+    # La ubicación solo filtra activos
+    data = auth_client.get(f'/reports/spend-analysis/api/table?location_id={office_id}').get_json()
+    assert data['total'] == 6
+
+    data = auth_client.get(f'/reports/spend-analysis/api/table?group_id={team_id}&item_type=assets').get_json()
+    assert data['total'] == 6
+
+    data = auth_client.get('/reports/spend-analysis/api/table?start_date=2024-01-10&end_date=2024-03-31').get_json()
+    assert data['total'] == 4
+
+
+def test_keyset_pages_and_export_cover_all_items(auth_client, app):
+    with app.app_context():
+        _add_items()
+
+    names, cursor = [], None
+    while True:
+        url = '/reports/spend-analysis/api/table?per_page=5&sort=cost&direction=asc'
+        if cursor:
+            url += f'&cursor={cursor}'
+        data = auth_client.get(url).get_json()
+        names += re.findall(r'>([^<]+)</a>', data['rows_html'])
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+    assert len(names) == len(set(names)) == 14
+    assert names[:2] == ['Mouse', 'Designer seat']
+
+    response = auth_client.get('/exports/spend-analysis.csv?item_type=assets&location_id=1')
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0][:3] == ['Type', 'ID', 'Name']
+    assert len(rows) == 5
+    assert {row[9] for row in rows[1:]} == {'Office'}
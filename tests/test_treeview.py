@@ -0,0 +1,89 @@
+from src import db
+from src.models import Location, User, Supplier, Asset, Peripheral, License, Purchase, Subscription
+from datetime import date
+
+
+def _add_org(size):
+    location = Location(name=f'Office {size}')
+    supplier = Supplier(name=f'Vendor {size}')
+    db.session.add_all([location, supplier])
+    db.session.flush()
+    for i in range(size):
+        user = User(name=f'Employee {size}-{i}', email=f'employee{size}-{i}@test.com')
+        db.session.add(user)
+        db.session.flush()
+        asset = Asset(name=f'Laptop {size}-{i}', location_id=location.id, user_id=user.id, supplier_id=supplier.id)
+        db.session.add(asset)
+        db.session.flush()
+        db.session.add(Peripheral(name=f'Dock {size}-{i}', asset_id=asset.id, user_id=user.id, supplier_id=supplier.id))
+        db.session.add(License(name=f'Office Suite {size}-{i}', user_id=user.id))
+        purchase = Purchase(description=f'Order {size}-{i}', purchase_date=date.today(), supplier_id=supplier.id)
+        purchase.users.append(user)
+        db.session.add(purchase)
+        db.session.add(Subscription(name=f'SaaS {size}-{i}', subscription_type='SaaS', renewal_date=date.today(),
+                                    renewal_period_type='yearly', cost=1.0, supplier_id=supplier.id))
+    db.session.commit()
+
+
+def test_initial_page_renders_roots_only(auth_client, app):
+    with app.app_context():
+        _add_org(2)
+        db.session.add(Location(name='Empty Room'))
+        db.session.commit()
+
+    response = auth_client.get('/tree-view/?root=locations')
+    assert response.status_code == 200
+    assert b'Office 2' in response.data
+    assert b'Laptop 2-0' not in response.data
+    # Only locations with assets get a lazy children URL
+    assert response.data.count(b'data-children-url=') == 1
+
+    response = auth_client.get('/tree-view/?root=locations&expand=all')
+    assert b'Laptop 2-0' in response.data
+    assert b'Dock 2-1' in response.data
+
+
+def test_node_children_endpoint(auth_client, app):
+    with app.app_context():
+        _add_org(2)
+        location_id = Location.query.filter_by(name='Office 2').first().id
+        user_id = User.query.filter_by(name='Employee 2-0').first().id
+        supplier_id = Supplier.query.filter_by(name='Vendor 2').first().id
+
+    children = auth_client.get(f'/tree-view/api/nodes/location/{location_id}').get_json()
+    assert [node['name'] for node in children] == ['Laptop 2-0', 'Laptop 2-1']
+    assert [node['name'] for node in children[0]['children']] == ['Dock 2-0']
+
+    children = auth_client.get(f'/tree-view/api/nodes/user/{user_id}').get_json()
+    assert [group['name'] for group in children] == ['Assets', 'Peripherals', 'Licenses', 'Purchases']
+    assert children[3]['children'][0]['name'] == 'Order 2-0'
+
+    children = auth_client.get(f'/tree-view/api/nodes/supplier/{supplier_id}').get_json()
+    assert [(group['name'], len(group['children'])) for group in children] == [
+        ('Subscriptions', 2), ('Assets', 2), ('Peripherals', 2)
+    ]
+
+    assert auth_client.get('/tree-view/api/nodes/location/999').status_code == 404
+    assert auth_client.get('/tree-view/api/nodes/budget/1').status_code == 404
+
+
+def test_expanded_tree_query_count_is_constant(auth_client, app, query_counter):
+    with app.app_context():
+        _add_org(2)
+
+    counts = {}
+    for root in ('locations', 'users', 'suppliers'):
+        query_counter.reset()
+        assert auth_client.get(f'/tree-view/?root={root}&expand=all').status_code == 200
+        counts[root] = query_counter.count
+
+    with app.app_context():
+        _add_org(25)
+
+    for root in ('locations', 'users', 'suppliers'):
+        query_counter.reset()
+        assert auth_client.get(f'/tree-view/?root={root}&expand=all').status_code == 200
+        assert query_counter.count == counts[root]
+        query_counter.reset()
+        assert auth_client.get(f'/tree-view/?root={root}').status_code == 200
+        assert query_counter.count <= counts[root] + 2